@@ -0,0 +1,337 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing.util
+import concurrent.futures
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+from profiler import PARSE_STAGE, get_profiler
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output; one is sent per downstream worker
+_DONE = object()
+
+# Seconds a blocked put/get waits before re-checking for cancellation
+_POLL_INTERVAL = 0.1
+
+# Per-process cache manager, created once by the pool initializer
+_worker_cache_manager = None
+
+def _init_process_worker(cache_config) -> None:
+    """Give each worker process its own cache manager, closed when it exits."""
+    global _worker_cache_manager
+    if cache_config is None:
+        return
+    from cache_manager import CacheManager
+    _worker_cache_manager = CacheManager(cache_config)
+    # Pool workers leave through os._exit, which skips atexit; this commits
+    # the worker's queued cache writes before it goes
+    multiprocessing.util.Finalize(None, _worker_cache_manager.close, exitpriority=10)
+
+def _analyze_chunk(file_paths: List[str], analyze_func) -> Dict[str, Any]:
+    """Look up, parse and cache a chunk of files inside a worker process.
+
+    Cache lookups and writes happen here, so file contents are only read in
+    the worker and fresh metadata is not sent to the parent just to be
+    cached. Results come back as nested tuples, with each parsed file's time
+    in nanoseconds (spans recorded in the worker would never reach the
+    parent's profiler) and the worker's cache hit/miss counts.
+    """
+    cache = _worker_cache_manager
+    before = cache.get_stats() if cache is not None else None
+    cached = {}
+    if cache is not None:
+        try:
+            cached = cache.get_cached_metadata_many(file_paths)
+        except Exception as e:
+            logger.debug(f"Cache lookup failed: {e}")
+
+    results = []
+    errors = []
+    timings = []
+    fresh = []
+    for file_path in file_paths:
+        metadata = cached.get(file_path)
+        if metadata is None:
+            start = time.perf_counter_ns()
+            try:
+                metadata = analyze_func(file_path)
+            except Exception as e:
+                errors.append((file_path, str(e)))
+                continue
+            finally:
+                timings.append((file_path, time.perf_counter_ns() - start))
+            if metadata:
+                fresh.append((file_path, metadata))
+        if metadata:
+            results.append((file_path, tuple((name, tuple(deps)) for name, deps in metadata.items())))
+
+    cache_stats = {}
+    if cache is not None:
+        if fresh:
+            cache.cache_metadata_many(fresh)
+        after = cache.get_stats()
+        cache_stats = {'hits': after['hits'] - before['hits'], 'misses': after['misses'] - before['misses']}
+    return {
+        'results': results,
+        'cache_hits': len(cached),
+        'errors': errors,
+        'timings': timings,
+        'cache_writes': len(fresh) if cache is not None else 0,
+        'cache_stats': cache_stats
+    }
+
+class AnalysisPipeline:
+    """Staged, streaming file analysis connected by bounded queues.
+
+    discover -> read -> parse -> cache-write -> merge
+
+    - discover: one thread drains the file iterable (usually a generator)
+    - read: ``readers`` threads look files up in the cache in small batches,
+      which hashes their contents; hits skip parsing entirely
+    - parse: ``parsers`` threads run the extractor
+    - cache-write: one thread stores fresh results in batches
+    - merge: the caller iterating ``run()`` receives (path, metadata) pairs
+
+    With ``backend`` "process", ``parsers`` threads hand chunks of
+    discovered paths to a process pool instead, and each worker process
+    does the read, parse and cache-write stages for its chunk with its own
+    CacheManager built from ``cache_config`` (no caching when it is None).
+    The parent then only merges, and uses ``cache_manager`` just to fold in
+    the workers' hit and miss counts.
+
+    Each queue holds at most ``queue_size`` items, so a slow stage blocks the
+    ones before it and the number of paths and results in flight stays
+    constant no matter how many files the repository has.
+    """
+
+    def __init__(self, cache_manager, analyze_func: Callable[[str], Dict[str, List[str]]],
+                 readers: int = 2, parsers: int = 4, queue_size: int = 256,
+                 backend: str = 'thread', chunk_size: int = 64, read_batch: int = 32,
+                 cache_config=None):
+        self.cache_manager = cache_manager
+        self.cache_config = cache_config
+        self.analyze_func = analyze_func
+        self.readers = max(1, readers)
+        self.parsers = max(1, parsers)
+        self.queue_size = max(1, queue_size)
+        self.backend = backend
+        self.chunk_size = max(1, chunk_size)
+        self.read_batch = max(1, read_batch)
+
+        self.stats = {'discovered': 0, 'cache_hits': 0, 'parsed': 0, 'errors': 0, 'cache_writes': 0}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._failures: List[BaseException] = []
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is cancelled."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns _DONE once the pipeline is cancelled."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _get_batch(self, q: queue.Queue, limit: int) -> Tuple[List[Any], bool]:
+        """Wait for one item, then take up to ``limit`` that are already queued.
+
+        Returns the batch and whether the end-of-stream marker was reached.
+        """
+        first = self._get(q)
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        while len(batch) < limit:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _stage(self, target, *args) -> threading.Thread:
+        def run():
+            try:
+                target(*args)
+            except BaseException as e:
+                logger.error(f"Analysis pipeline stage {target.__name__} failed: {str(e)}", exc_info=True)
+                self._failures.append(e)
+                self._stop.set()
+        thread = threading.Thread(target=run, name=f"pipeline-{target.__name__}", daemon=True)
+        thread.start()
+        return thread
+
+    def _finish(self, q: queue.Queue, workers: int) -> None:
+        for _ in range(workers):
+            self._put(q, _DONE)
+
+    def _discover(self, files: Iterable[str], paths: queue.Queue, consumers: int) -> None:
+        try:
+            for file_path in files:
+                if not self._put(paths, file_path):
+                    return
+                self._count('discovered')
+        finally:
+            self._finish(paths, consumers)
+
+    def _read(self, paths: queue.Queue, to_parse: queue.Queue, results: queue.Queue) -> None:
+        done = False
+        while not done:
+            batch, done = self._get_batch(paths, self.read_batch)
+            if not batch:
+                continue
+            try:
+                cached = self.cache_manager.get_cached_metadata_many(batch)
+            except Exception as e:
+                logger.debug(f"Cache lookup failed: {e}")
+                cached = {}
+            for file_path in batch:
+                metadata = cached.get(file_path)
+                if metadata is not None:
+                    self._count('cache_hits')
+                    if metadata and not self._put(results, (file_path, metadata)):
+                        return
+                elif not self._put(to_parse, file_path):
+                    return
+
+    def _parse(self, to_parse: queue.Queue, to_cache: queue.Queue, results: queue.Queue) -> None:
+        profiler = get_profiler()
+        while True:
+            file_path = self._get(to_parse)
+            if file_path is _DONE:
+                return
+            try:
+                with profiler.span(PARSE_STAGE, file_path):
+                    metadata = self.analyze_func(file_path)
+            except Exception as e:
+                logger.error(f"Error analyzing {file_path}: {str(e)}")
+                self._count('errors')
+                continue
+            self._count('parsed')
+            if not metadata:
+                continue
+            if not self._put(to_cache, (file_path, metadata)) or not self._put(results, (file_path, metadata)):
+                return
+
+    def _parse_in_workers(self, paths: queue.Queue, results: queue.Queue,
+                          executor: concurrent.futures.Executor) -> None:
+        profiler = get_profiler()
+        done = False
+        while not done:
+            batch, done = self._get_batch(paths, self.chunk_size)
+            if not batch:
+                continue
+            try:
+                chunk = executor.submit(_analyze_chunk, batch, self.analyze_func).result()
+            except Exception as e:
+                # The whole chunk is lost (a crashed worker, a result that
+                # cannot be pickled); count its files and keep going
+                logger.error(f"Error analyzing a chunk of {len(batch)} files: {str(e)}")
+                self._count('errors', len(batch))
+                continue
+
+            if profiler.enabled:
+                for file_path, duration in chunk['timings']:
+                    profiler.record(PARSE_STAGE, duration, file_path)
+            for file_path, error in chunk['errors']:
+                logger.error(f"Error analyzing {file_path}: {error}")
+            if chunk['cache_stats']:
+                self.cache_manager.merge_stats(chunk['cache_stats'])
+            self._count('cache_hits', chunk['cache_hits'])
+            self._count('errors', len(chunk['errors']))
+            self._count('parsed', len(chunk['timings']) - len(chunk['errors']))
+            self._count('cache_writes', chunk['cache_writes'])
+            for file_path, functions in chunk['results']:
+                if not self._put(results, (file_path, {name: list(deps) for name, deps in functions})):
+                    return
+
+    def _write_cache(self, to_cache: queue.Queue) -> None:
+        done = False
+        while not done:
+            batch, done = self._get_batch(to_cache, self.read_batch)
+            if batch:
+                self.cache_manager.cache_metadata_many(batch)
+                self._count('cache_writes', len(batch))
+
+    def run(self, files: Iterable[str]) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """Analyze ``files``, yielding (path, metadata) as each file completes.
+
+        Files without metadata are skipped. Stopping the iteration early
+        cancels the remaining stages.
+        """
+        paths = queue.Queue(self.queue_size)
+        to_parse = queue.Queue(self.queue_size)
+        to_cache = queue.Queue(self.queue_size)
+        results = queue.Queue(self.queue_size)
+
+        executor = None
+        writer = None
+        if self.backend == 'process':
+            # Workers read, parse and cache their own chunks
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.parsers,
+                                                              initializer=_init_process_worker,
+                                                              initargs=(self.cache_config,))
+            readers = []
+            parsers = [self._stage(self._parse_in_workers, paths, results, executor)
+                       for _ in range(self.parsers)]
+        else:
+            readers = [self._stage(self._read, paths, to_parse, results) for _ in range(self.readers)]
+            parsers = [self._stage(self._parse, to_parse, to_cache, results) for _ in range(self.parsers)]
+            writer = self._stage(self._write_cache, to_cache)
+        discoverer = self._stage(self._discover, files, paths, len(readers or parsers))
+
+        # Each stage's end marker goes out once every worker before it is done
+        def close_stages():
+            if readers:
+                for worker in readers:
+                    worker.join()
+                self._finish(to_parse, self.parsers)
+            for worker in parsers:
+                worker.join()
+            if writer is not None:
+                self._put(to_cache, _DONE)
+            self._put(results, _DONE)
+        closer = threading.Thread(target=close_stages, name="pipeline-closer", daemon=True)
+        closer.start()
+
+        completed = False
+        try:
+            while True:
+                item = self._get(results)
+                if item is _DONE:
+                    completed = True
+                    break
+                yield item
+        finally:
+            if not completed:
+                # The consumer stopped early: cancel every stage
+                self._stop.set()
+            # Let the writer flush what it was given, then release all stages
+            if writer is not None:
+                writer.join()
+            self._stop.set()
+            for thread in [discoverer, closer] + readers + parsers:
+                thread.join()
+            if executor is not None:
+                # Workers commit their cache writes as they exit
+                executor.shutdown()
+        if self._failures:
+            raise self._failures[0]
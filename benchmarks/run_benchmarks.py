@@ -0,0 +1,257 @@
+"""Time every analysis stage on a synthetic project and gate on regressions.
+
+Examples:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.25
+
+Timings depend on the machine, so record the baseline on the machine that
+runs the comparison (e.g. from the main branch before a change).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_project import ProjectSpec, generate_project
+from config import load_config
+from main import extract_function_metadata
+from cache_manager import CacheManager
+from parallel_analyzer import ParallelAnalyzer
+from metadata_extractor import extract_metadata
+from project_analyzer import merge_project_metadata
+from visualizer import DependencyVisualizer, ARTIFACTS
+
+STAGES = ('extract', 'cache', 'parallel', 'render')
+
+def measure(run: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> float:
+    """Best wall time of ``repeat`` runs; ``setup`` runs untimed before each."""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def rate(seconds: float, count: int, unit: str) -> Dict[str, float]:
+    return {'seconds': seconds, f'{unit}_per_sec': count / seconds if seconds else float('inf')}
+
+def bench_config(workdir: str, args):
+    config = load_config(os.path.join(workdir, 'no_config.yaml'))
+    config.supported_languages = list(args.language_mix)
+    config.output_directory = os.path.join(workdir, 'output')
+    config.viz_directory = os.path.join(config.output_directory, 'visualizations')
+    os.makedirs(config.viz_directory, exist_ok=True)
+    config.cache_directory = os.path.join(workdir, 'cache')
+    config.parallel_backend = args.backend
+    config.log_level = 'WARNING'
+    return config
+
+def bench_extract(paths: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    seconds = measure(lambda: [extract_function_metadata(path) for path in paths], repeat)
+    return {'extract': rate(seconds, len(paths), 'files')}
+
+def bench_cache(config, paths: List[str], items: List[Tuple[str, Dict]], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Cold: miss every file, then store all results. Warm: a new manager finds them all."""
+    state = {}
+
+    def fresh():
+        shutil.rmtree(config.cache_directory, ignore_errors=True)
+        state['cache'] = CacheManager(config)
+
+    def cold():
+        cache = state['cache']
+        cache.get_cached_metadata_many(paths)
+        cache.cache_metadata_many(items)
+        cache.close()
+
+    def reopen():
+        state['cache'] = CacheManager(config)
+
+    def warm():
+        found = state['cache'].get_cached_metadata_many(paths)
+        assert len(found) == len(items), "warm cache missed entries"
+
+    results = {'cache_cold': rate(measure(cold, repeat, setup=fresh), len(paths), 'files')}
+    results['cache_warm'] = rate(measure(warm, repeat, setup=reopen), len(paths), 'files')
+    state['cache'].close()
+    return results
+
+def bench_parallel(config, paths: List[str], workers: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Uncached end-to-end analysis at several worker counts."""
+    config.cache_enabled = False
+    results = {}
+    try:
+        for count in workers:
+            config.max_workers = count
+            cache = CacheManager(config)
+            analyzer = ParallelAnalyzer(config, cache)
+            seconds = measure(lambda: analyzer.analyze_files_parallel(iter(paths), extract_metadata), repeat)
+            cache.close()
+            results[f'parallel_{config.parallel_backend}_{count}'] = rate(seconds, len(paths), 'files')
+    finally:
+        config.cache_enabled = True
+    return results
+
+def bench_render(config, metadata: Dict[str, List[str]], renderers: List[str],
+                 repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Time graph metrics once, then each renderer on its own."""
+    visualizer = DependencyVisualizer(config)
+    output_base = os.path.join(config.viz_directory, 'bench')
+    results = {'graph_metrics': rate(measure(lambda: visualizer._get_graph_metrics(dict(metadata)), repeat),
+                                     len(metadata), 'functions')}
+    visualizer._get_graph_metrics(metadata)
+
+    runs = {
+        'static': lambda: visualizer.create_static_graph(metadata, output_base),
+        'interactive': lambda: visualizer.create_interactive_graph(metadata, output_base),
+        'animation': lambda: visualizer.create_animated_flow(metadata, output_base),
+        'metrics': lambda: visualizer.export_metrics(output_base)
+    }
+    for name in renderers:
+        try:
+            seconds = measure(runs[name], repeat)
+        except Exception as e:
+            # e.g. Graphviz not installed; recorded so comparisons skip it
+            results[f'render_{name}'] = {'skipped': str(e).splitlines()[0][:200]}
+            continue
+        results[f'render_{name}'] = rate(seconds, len(metadata), 'functions')
+    visualizer.close()
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Describe every benchmark that got slower than ``baseline`` by more than ``threshold``.
+
+    A benchmark timed in the baseline but missing or skipped in ``current``
+    counts as a regression too, so the gate cannot pass by not measuring.
+    """
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        if 'seconds' not in base:
+            continue
+        result = current.get('results', {}).get(name)
+        if not result:
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> missing from this run")
+            continue
+        if 'seconds' not in result:
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> skipped ({result.get('skipped', 'no timing')})")
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> {result['seconds']:.4f}s "
+                               f"({(ratio - 1) * 100:+.1f}%)")
+    return regressions
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse ``python=3,java=1`` into language weights."""
+    mix = {}
+    for part in value.split(','):
+        language, _, weight = part.partition('=')
+        mix[language.strip()] = float(weight) if weight else 1.0
+    return mix
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark analysis stages on a synthetic project')
+    parser.add_argument('--files', type=int, default=200, help='Number of synthetic files')
+    parser.add_argument('--functions', type=int, default=20, help='Functions per file')
+    parser.add_argument('--density', type=float, default=2.0, help='Mean dependencies per function')
+    parser.add_argument('--locality', type=float, default=0.7, help='Share of same-file dependencies')
+    parser.add_argument('--recursion', type=float, default=0.05, help='Share of recursive functions')
+    parser.add_argument('--languages', dest='language_mix', type=parse_mix, default={'python': 1.0},
+                        help='Language weights, e.g. python=3,java=1,c=1,cpp=1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma-separated stages to run')
+    parser.add_argument('--workers', default='1,2,4', help='Worker counts for the parallel stage')
+    parser.add_argument('--backend', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--renderers', default=','.join(ARTIFACTS), help='Renderers for the render stage')
+    parser.add_argument('--render-functions', type=int, default=300,
+                        help='Functions in the graph handed to the renderers')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the best is kept')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Fail if slower than this results file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown before --compare fails (0.25 = 25%%)')
+    return parser.parse_args(argv)
+
+def run(args) -> Dict[str, Any]:
+    spec = ProjectSpec(files=args.files, functions_per_file=args.functions,
+                       dependency_density=args.density, locality=args.locality,
+                       recursion_rate=args.recursion, language_mix=args.language_mix, seed=args.seed)
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    workdir = tempfile.mkdtemp(prefix='codeviz_bench_')
+    try:
+        project = os.path.join(workdir, 'project')
+        expected = generate_project(project, spec)
+        paths = sorted(expected)
+        items = [(path, expected[path]) for path in paths]
+        config = bench_config(workdir, args)
+
+        results: Dict[str, Any] = {}
+        if 'extract' in stages:
+            results.update(bench_extract(paths, args.repeat))
+        if 'cache' in stages:
+            results.update(bench_cache(config, paths, items, args.repeat))
+        if 'parallel' in stages:
+            workers = [int(count) for count in args.workers.split(',') if count.strip()]
+            results.update(bench_parallel(config, paths, workers, args.repeat))
+        if 'render' in stages:
+            merged = merge_project_metadata(items, project)
+            functions = list(merged)[:args.render_functions]
+            metadata = {func: merged[func] for func in functions}
+            renderers = [name.strip() for name in args.renderers.split(',') if name.strip()]
+            results.update(bench_render(config, metadata, renderers, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'spec': asdict(spec),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'results': results
+    }
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run(args)
+    for name, result in report['results'].items():
+        if 'skipped' in result:
+            print(f"{name:28s} skipped: {result['skipped']}")
+        else:
+            throughput = ', '.join(f"{value:,.1f} {key.replace('_per_sec', '')}/s"
+                                   for key, value in result.items() if key.endswith('_per_sec'))
+            print(f"{name:28s} {result['seconds'] * 1000:10.2f} ms  {throughput}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('spec') != report['spec']:
+            print("Warning: baseline was recorded for a different project spec")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
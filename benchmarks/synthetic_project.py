@@ -0,0 +1,124 @@
+"""Generate synthetic multi-language projects with known dependency graphs."""
+import os
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+PYTHON_FUNCTION = '''
+def {name}(value):
+    """
+    Metadata:
+    name: {name}
+    dependencies: [{deps}]
+    """
+    return value + {index}
+'''
+
+# Java, C and C++ share the javadoc-style metadata block
+NATIVE_FUNCTION = '''
+/**
+ * Metadata:
+ * name: {name}
+ * dependencies: [{deps}]
+ */
+{signature} {{
+    return value + {index};
+}}
+'''
+
+NATIVE_SIGNATURES = {
+    'java': 'public int {name}(int value)',
+    'c': 'int {name}(int value)',
+    'cpp': 'int {name}(int value)'
+}
+
+EXTENSIONS = {'python': '.py', 'java': '.java', 'c': '.c', 'cpp': '.cpp'}
+
+@dataclass
+class ProjectSpec:
+    """Shape of a synthetic project.
+
+    ``dependency_density`` is the mean number of dependencies per function,
+    ``locality`` the share of them that stay within the same file, and
+    ``recursion_rate`` the share of functions that call themselves.
+    ``language_mix`` maps languages to relative weights.
+    """
+    files: int = 200
+    functions_per_file: int = 20
+    dependency_density: float = 2.0
+    locality: float = 0.7
+    recursion_rate: float = 0.05
+    language_mix: Dict[str, float] = field(default_factory=lambda: {'python': 1.0})
+    directories: int = 8
+    seed: int = 0
+
+def _assign_languages(files: int, mix: Dict[str, float], rng: random.Random) -> List[str]:
+    """Languages for each file, matching the weights as closely as the count allows."""
+    total = sum(mix.values())
+    shares = {language: files * weight / total for language, weight in mix.items()}
+    counts = {language: int(share) for language, share in shares.items()}
+    # Largest remainders get the files lost to rounding down
+    by_remainder = sorted(mix, key=lambda language: shares[language] - counts[language], reverse=True)
+    for language in by_remainder[:files - sum(counts.values())]:
+        counts[language] += 1
+    assigned = [language for language, count in counts.items() for _ in range(count)]
+    rng.shuffle(assigned)
+    return assigned
+
+def _render_file(language: str, functions: List[tuple]) -> str:
+    parts = []
+    if language == 'java':
+        parts.append('public class Generated {\n')
+    for index, (name, deps) in enumerate(functions):
+        dep_list = ', '.join(deps)
+        if language == 'python':
+            parts.append(PYTHON_FUNCTION.format(name=name, deps=dep_list, index=index))
+        else:
+            signature = NATIVE_SIGNATURES[language].format(name=name)
+            parts.append(NATIVE_FUNCTION.format(name=name, deps=dep_list, signature=signature, index=index))
+    if language == 'java':
+        parts.append('}\n')
+    return ''.join(parts)
+
+def generate_project(directory: str, spec: ProjectSpec) -> Dict[str, Dict[str, List[str]]]:
+    """Write the project under ``directory``; return the expected metadata per file.
+
+    Function names are unique across the project, so every cross-file
+    dependency resolves to exactly one definition when the project is merged.
+    """
+    rng = random.Random(spec.seed)
+    languages = _assign_languages(spec.files, spec.language_mix, rng)
+    names = [[f"f{file_index}_{func_index}" for func_index in range(spec.functions_per_file)]
+             for file_index in range(spec.files)]
+
+    trials = max(1, math.ceil(spec.dependency_density * 2))
+    chance = min(1.0, spec.dependency_density / trials)
+
+    expected = {}
+    for file_index in range(spec.files):
+        language = languages[file_index]
+        functions = []
+        for func_index, name in enumerate(names[file_index]):
+            deps = []
+            # Binomial count with the requested mean
+            count = sum(1 for _ in range(trials) if rng.random() < chance)
+            for _ in range(count):
+                if rng.random() < spec.locality or spec.files == 1:
+                    target_file = file_index
+                else:
+                    target_file = rng.randrange(spec.files)
+                dep = names[target_file][rng.randrange(spec.functions_per_file)]
+                if dep != name and dep not in deps:
+                    deps.append(dep)
+            if rng.random() < spec.recursion_rate:
+                deps.append(name)
+            functions.append((name, deps))
+
+        subdir = os.path.join(directory, f"pkg{file_index % max(1, spec.directories)}")
+        os.makedirs(subdir, exist_ok=True)
+        path = os.path.join(subdir, f"module_{file_index}{EXTENSIONS[language]}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(_render_file(language, functions))
+        expected[path] = dict(functions)
+    return expected
@@ -1,9 +1,94 @@
 import os
-import json
+import time
 import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from cachetools import TTLCache
+from typing import Any, Dict, List, Optional, Tuple
+from metadata_extractor import EXTRACTOR_VERSION, scanner_kind
+from cache_store import create_cache_store
+from profiler import get_profiler
+
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing file contents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def estimate_metadata_size(metadata: Dict[str, List[str]]) -> int:
+    """Approximate the in-memory footprint of a metadata dict in bytes."""
+    # Rough CPython costs: ~50 bytes per str object plus its characters,
+    # ~64 bytes per list and ~100 bytes per dict slot.
+    size = 64
+    for name, deps in metadata.items():
+        size += 150 + len(name) + 64
+        for dep in deps:
+            size += 50 + len(dep)
+    return size
+
+class MemoryCache:
+    """Thread-safe LRU cache bounded by approximate bytes, with a TTL.
+
+    Workers of the thread backend share one instance, so every operation
+    takes the lock. Hit, miss, eviction and expiry counts are kept for
+    reporting through ``MetricsCollector``.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._size -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        if size is None:
+            size = estimate_metadata_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
 
 class CacheManager:
     def __init__(self, config):
@@ -11,65 +96,183 @@ class CacheManager:
         self.cache_dir = config.cache_directory
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # Persistent tier (single SQLite file by default)
+        self.store = create_cache_store(config)
+        
         # In-memory cache for frequently accessed items
-        self.memory_cache = TTLCache(maxsize=100, ttl=300)  # 5 minutes TTL
+        self.memory_cache = MemoryCache(
+            max_bytes=int(config.memory_cache_max_mb * 1024 * 1024),
+            ttl=config.memory_cache_ttl
+        )
+        
+        # Lookups answered by either tier vs. by neither; guarded by _stats_lock
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._reported = {'cache_hits': 0, 'cache_misses': 0, 'cache_evictions': 0}
+        
+        # path -> ((size, mtime_ns, inode), key) so unchanged files are hashed once per run
+        self._key_by_path: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
     
     def _get_cache_key(self, file_path: str) -> str:
-        """Generate a cache key based on file path and modification time."""
-        mtime = os.path.getmtime(file_path)
-        content = f"{file_path}:{mtime}"
-        return hashlib.md5(content.encode()).hexdigest()
+        """Generate a content-addressed cache key for a file.
+
+        The key hashes the extractor version, the scanner the file's
+        extension selects and the file bytes, so it is stable across clones,
+        checkouts and paths, while identical bytes in a ``.py`` and a ``.c``
+        file still get separate entries. A stat signature lets
+        repeated lookups within a run skip rehashing unchanged files.
+        """
+        st = os.stat(file_path)
+        signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+        known = self._key_by_path.get(file_path)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"extractor-{EXTRACTOR_VERSION}\0{scanner_kind(file_path)}\0".encode())
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        key = digest.hexdigest()
+        self._key_by_path[file_path] = (signature, key)
+        return key
     
     def get_cached_metadata(self, file_path: str) -> Optional[Dict]:
         """Retrieve metadata from cache if available and valid."""
         if not self.config.cache_enabled:
             return None
-            
+        
+        with get_profiler().span('cache_get', file_path):
+            return self._get_cached_metadata(file_path)
+    
+    def _get_cached_metadata(self, file_path: str) -> Optional[Dict]:
         cache_key = self._get_cache_key(file_path)
         
         # Try memory cache first
-        if cache_key in self.memory_cache:
-            return self.memory_cache[cache_key]
+        cached_data = self.memory_cache.get(cache_key)
+        if cached_data is not None:
+            self._count(hits=1)
+            return cached_data
         
-        # Try file cache
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        if os.path.exists(cache_file):
+        # Try the persistent store
+        try:
+            cached_data = self.store.get(cache_key)
+        except Exception as e:
+            logger.debug(f"Cache read failed for {file_path}: {e}")
+            cached_data = None
+        if cached_data is not None:
+            self.memory_cache.put(cache_key, cached_data)
+            self._count(hits=1)
+        else:
+            self._count(misses=1)
+        return cached_data
+    
+    def get_cached_metadata_many(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """Retrieve cached metadata for several files with one store lookup."""
+        if not self.config.cache_enabled:
+            return {}
+        
+        with get_profiler().span('cache_get'):
+            return self._get_cached_metadata_many(file_paths)
+    
+    def _get_cached_metadata_many(self, file_paths: List[str]) -> Dict[str, Dict]:
+        found = {}
+        missing = {}
+        for file_path in file_paths:
+            cache_key = self._get_cache_key(file_path)
+            cached_data = self.memory_cache.get(cache_key)
+            if cached_data is not None:
+                found[file_path] = cached_data
+            else:
+                missing.setdefault(cache_key, []).append(file_path)
+        
+        if missing:
             try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                    self.memory_cache[cache_key] = cached_data
-                    return cached_data
-            except Exception:
-                return None
-        return None
+                stored = self.store.get_many(missing)
+            except Exception as e:
+                logger.debug(f"Batched cache read failed: {e}")
+                stored = {}
+            for cache_key, cached_data in stored.items():
+                self.memory_cache.put(cache_key, cached_data)
+                for file_path in missing[cache_key]:
+                    found[file_path] = cached_data
+        
+        self._count(hits=len(found), misses=len(file_paths) - len(found))
+        return found
     
     def cache_metadata(self, file_path: str, metadata: Dict) -> None:
         """Cache metadata for future use."""
+        self.cache_metadata_many([(file_path, metadata)])
+    
+    def cache_metadata_many(self, items: List[Tuple[str, Dict]]) -> None:
+        """Cache metadata for several files in one store write."""
         if not self.config.cache_enabled:
             return
-            
-        cache_key = self._get_cache_key(file_path)
-        
-        # Update memory cache
-        self.memory_cache[cache_key] = metadata
         
-        # Update file cache
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(metadata, f)
-        except Exception:
-            pass
+        with get_profiler().span('cache_put'):
+            entries = []
+            for file_path, metadata in items:
+                cache_key = self._get_cache_key(file_path)
+                self.memory_cache.put(cache_key, metadata)
+                entries.append((cache_key, metadata))
+            
+            try:
+                self.store.put_many(entries)
+            except Exception as e:
+                logger.debug(f"Cache write failed: {e}")
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued cache writes to reach disk; False if ``timeout`` passed first."""
+        return self.store.flush(timeout)
+    
+    def close(self) -> None:
+        """Flush queued writes (within cache_flush_timeout) and close the store."""
+        self.store.close()
     
     def clear_cache(self, older_than_days: Optional[int] = None) -> None:
         """Clear cached data."""
         if older_than_days is not None:
             cutoff = datetime.now() - timedelta(days=older_than_days)
-            for cache_file in os.listdir(self.cache_dir):
-                file_path = os.path.join(self.cache_dir, cache_file)
-                if os.path.getctime(file_path) < cutoff.timestamp():
-                    os.remove(file_path)
+            self.store.prune(cutoff.timestamp())
         else:
-            for cache_file in os.listdir(self.cache_dir):
-                os.remove(os.path.join(self.cache_dir, cache_file))
-        self.memory_cache.clear()
\ No newline at end of file
+            self.store.clear()
+        self.memory_cache.clear()
+    
+    def _count(self, hits: int = 0, misses: int = 0) -> None:
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+    
+    def merge_stats(self, stats: Dict[str, int]) -> None:
+        """Fold in hit/miss counts gathered by another process."""
+        self._count(hits=stats.get('hits', 0), misses=stats.get('misses', 0))
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Return lookup and memory-tier counters."""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'memory_hits': self.memory_cache.hits,
+            'memory_misses': self.memory_cache.misses,
+            'evictions': self.memory_cache.evictions,
+            'expirations': self.memory_cache.expirations,
+            'memory_entries': len(self.memory_cache),
+            'memory_bytes': self.memory_cache.size_bytes
+        }
+    
+    def report_metrics(self, metrics_collector) -> None:
+        """Record counts accumulated since the last report in a MetricsCollector."""
+        stats = self.get_stats()
+        current = {
+            'cache_hits': stats['hits'],
+            'cache_misses': stats['misses'],
+            'cache_evictions': stats['evictions']
+        }
+        for name, value in current.items():
+            delta = value - self._reported[name]
+            if delta:
+                metrics_collector.record_metric(name, delta)
+        self._reported = current
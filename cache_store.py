@@ -0,0 +1,404 @@
+import os
+import json
+import time
+import atexit
+import logging
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH_SIZE = 500
+
+# Buffered access times written by a read once this many are pending
+_TOUCH_BATCH_SIZE = 1000
+
+class CacheStore(ABC):
+    """Interface for the persistent tier behind CacheManager."""
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for every key that is present."""
+
+    @abstractmethod
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Store several key/value pairs in one batch."""
+
+    @abstractmethod
+    def prune(self, older_than: float) -> int:
+        """Remove entries created before the given timestamp; return how many."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for buffered writes to be stored; False if ``timeout`` passed first."""
+        return True
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+class JsonFileStore(CacheStore):
+    """One ``<key>.json`` file per entry; kept for small projects and debugging."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            try:
+                with open(self._path(key), 'r') as f:
+                    found[key] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Write each entry to a temp file and rename it into place.
+
+        ``os.replace`` is atomic, so concurrent readers and writers (threads or
+        processes) see either the old entry or the new one, never a torn file.
+        """
+        for key, value in items:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, self._path(key))
+            except (OSError, TypeError, ValueError) as e:
+                logger.debug(f"Cache write failed for {key}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def prune(self, older_than: float) -> int:
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json') and entry.stat().st_ctime < older_than:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.cache_dir):
+            # Also sweep temp files left behind by interrupted writes
+            if entry.name.endswith('.json') or entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+
+class SQLiteCacheStore(CacheStore):
+    """Single-file store in SQLite WAL mode.
+
+    Reads and writes are batched into single statements/transactions, age
+    pruning and LRU eviction walk indexes, and running entry/byte totals are
+    kept by triggers so size checks never scan the table. SQLite's own locking
+    makes the file safe to share between threads and processes; each thread
+    (and each forked process) opens its own connection.
+
+    Reads stay read-only: access times of hits are buffered in memory and
+    written with the next write transaction (or once ``_TOUCH_BATCH_SIZE``
+    are pending), so concurrent readers do not contend for the write lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_created_at ON entries(created_at);
+        CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries(accessed_at);
+        CREATE TABLE IF NOT EXISTS totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO totals VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+            UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+            UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+        END;
+    """
+
+    def __init__(self, db_path: str, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._touched: Dict[str, float] = {}
+        self._touch_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = {}
+        conn = self._connection()
+        for start in range(0, len(keys), _SQL_BATCH_SIZE):
+            batch = keys[start:start + _SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, value in rows:
+                found[key] = json.loads(value)
+        if found:
+            now = time.time()
+            with self._touch_lock:
+                self._touched.update((key, now) for key in found)
+                full = len(self._touched) >= _TOUCH_BATCH_SIZE
+            if full:
+                with conn:
+                    self._write_touches(conn)
+        return found
+
+    def _write_touches(self, conn: sqlite3.Connection) -> None:
+        """Store buffered access times inside the caller's transaction."""
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                             [(accessed_at, key) for key, accessed_at in touched.items()])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = time.time()
+        rows = []
+        for key, value in items:
+            payload = json.dumps(value, separators=(',', ':'))
+            rows.append((key, payload, len(payload), now, now))
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            # Before eviction, so entries read since the last write count as recent
+            self._write_touches(conn)
+            conn.executemany(
+                "INSERT INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                rows
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries until the size bounds hold."""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        entries, total_bytes = conn.execute("SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+        excess = 0
+        if self.max_entries is not None and entries > self.max_entries:
+            excess = entries - self.max_entries
+        if self.max_bytes is not None and total_bytes > self.max_bytes and entries:
+            # Estimate how many entries to drop from the average entry size
+            average = total_bytes / entries
+            excess = max(excess, int((total_bytes - self.max_bytes) / average) + 1)
+        if excess:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at, rowid LIMIT ?)", (excess,)
+            )
+
+    def prune(self, older_than: float) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM entries WHERE created_at < ?", (older_than,)).rowcount
+
+    def clear(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries and total payload bytes."""
+        entries, total_bytes = self._connection().execute(
+            "SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+        return {'entries': entries, 'bytes': total_bytes}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            try:
+                with conn:
+                    self._write_touches(conn)
+            except sqlite3.Error as e:
+                logger.debug(f"Could not store cache access times: {e}")
+            conn.close()
+        # Only this thread's connection; other threads close their own
+        self._local.conn = None
+
+class WriteBehindStore(CacheStore):
+    """Queues writes in memory and commits them to ``store`` from one thread.
+
+    ``put_many`` only records the entries (a later write of a key replaces an
+    earlier pending one) and returns at once, so callers never wait on disk.
+    The writer thread commits everything pending as one batch, at most every
+    ``flush_interval`` seconds. Reads see pending entries, including the
+    batch being committed, before they reach the store. ``flush`` and ``close`` wait for pending writes up to a
+    deadline; whatever is still pending after it is dropped, which only
+    costs future cache misses.
+    """
+
+    def __init__(self, store: CacheStore, flush_interval: float = 0.5, flush_timeout: float = 10.0):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.flush_timeout = flush_timeout
+        self._pending: Dict[str, Any] = {}
+        # The batch the writer thread is committing, readable until it is stored
+        self._inflight: Dict[str, Any] = {}
+        self._writing = False
+        self._closed = False
+        self._flush_waiters = 0
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="cache-write-behind", daemon=True)
+        self._thread.start()
+        # Flush on interpreter exit when nobody closed the store explicitly
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    break
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+                self._writing = True
+            try:
+                self.store.put_many(batch.items())
+            except Exception as e:
+                logger.warning(f"Write-behind cache flush of {len(batch)} entries failed: {e}")
+            with self._condition:
+                self._inflight = {}
+                self._writing = False
+                self._condition.notify_all()
+                # Let further writes accumulate into the next batch unless
+                # someone is waiting for them
+                self._condition.wait_for(lambda: self._closed or self._flush_waiters > 0,
+                                         timeout=self.flush_interval)
+        # Stores may hold per-thread resources such as SQLite connections
+        self.store.close()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        with self._condition:
+            found = {}
+            for key in keys:
+                if key in self._pending:
+                    found[key] = self._pending[key]
+                elif key in self._inflight:
+                    found[key] = self._inflight[key]
+        rest = [key for key in keys if key not in found]
+        if rest:
+            found.update(self.store.get_many(rest))
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cache store is closed")
+            self._pending.update(items)
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every pending write is committed; False if the deadline passed."""
+        deadline = time.monotonic() + (self.flush_timeout if timeout is None else timeout)
+        with self._condition:
+            self._flush_waiters += 1
+            self._condition.notify_all()
+            try:
+                while self._pending or self._writing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._thread.is_alive():
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flush_waiters -= 1
+        return True
+
+    def prune(self, older_than: float) -> int:
+        self.flush()
+        return self.store.prune(older_than)
+
+    def clear(self) -> None:
+        with self._condition:
+            self._pending.clear()
+        self.flush()
+        self.store.clear()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush with a deadline, then stop the writer thread."""
+        if self._closed:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        deadline = time.monotonic() + (self.flush_timeout if timeout is None else timeout)
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            with self._condition:
+                dropped = len(self._pending)
+            logger.warning(f"Cache flush did not finish within its deadline; {dropped} pending entries dropped")
+        # The writer thread closed its own share of the store on the way out
+        self.store.close()
+        atexit.unregister(self.close)
+
+def create_cache_store(config) -> CacheStore:
+    """Build the persistent cache store selected by ``cache_backend``.
+
+    With ``cache_write_behind`` the store is wrapped in a WriteBehindStore.
+    """
+    backend = config.cache_backend
+    if backend == 'sqlite':
+        max_bytes = config.cache_max_size_mb * 1024 * 1024 if config.cache_max_size_mb else None
+        store = SQLiteCacheStore(
+            os.path.join(config.cache_directory, 'metadata.sqlite3'),
+            max_entries=config.cache_max_entries or None,
+            max_bytes=max_bytes
+        )
+    elif backend == 'json':
+        store = JsonFileStore(config.cache_directory)
+    else:
+        raise ValueError(f"Unknown cache_backend '{backend}', expected 'sqlite' or 'json'")
+    if getattr(config, 'cache_write_behind', False):
+        return WriteBehindStore(store,
+                                flush_interval=getattr(config, 'cache_flush_interval', 0.5),
+                                flush_timeout=getattr(config, 'cache_flush_timeout', 10.0))
+    return store
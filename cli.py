@@ -2,6 +2,10 @@ import argparse
 from typing import List, Optional
 import os
 import sys
+from function_index import FunctionIndex
+
+# Longest list the interactive menu prints before asking for a filter
+MENU_PAGE_SIZE = 50
 
 def get_file_path() -> str:
     """Prompt for and validate file path."""
@@ -28,69 +32,150 @@ def get_file_path() -> str:
             print("\nOperation cancelled.")
             sys.exit(1)
 
+def parse_formats(value: str) -> List[str]:
+    """Parse a comma-separated --formats value."""
+    from visualizer import ARTIFACTS
+    formats = [name.strip().lower() for name in value.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in ARTIFACTS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"invalid formats {value!r}; choose from {', '.join(ARTIFACTS)}")
+    return formats
+
 def parse_args():
     parser = argparse.ArgumentParser(description='Analyze code dependencies and generate visualizations')
     parser.add_argument('file_path', nargs='?', help='Path to the file to analyze')
+    parser.add_argument('--dir', '-d', dest='directory',
+                       help='Analyze every supported file under this directory as one project')
     parser.add_argument('--config', default='config.yaml', help='Path to configuration file')
     parser.add_argument('--interactive', '-i', action='store_true', default=True,
                        help='Enable interactive function selection (enabled by default)')
     parser.add_argument('--all', '-a', action='store_true',
                        help='Analyze all functions (overrides interactive mode)')
+    parser.add_argument('--depth', type=int, default=1,
+                       help='Include functions up to this many calls away from the selection '
+                            '(default: 1, direct dependencies only; -1 for no limit)')
+    parser.add_argument('--direction', choices=['callees', 'callers', 'both'], default='callees',
+                       help='Follow dependencies (callees), the functions calling the selection '
+                            '(callers), or both when expanding by --depth')
+    parser.add_argument('--select-glob', action='append', default=[], metavar='PATTERN',
+                       help='Select functions whose qualified name (file#function) matches a '
+                            'shell-style pattern; may be repeated')
+    parser.add_argument('--select-regex', action='append', default=[], metavar='REGEX',
+                       help='Select functions whose qualified name contains a regex match; may be repeated')
+    parser.add_argument('--select-file', action='append', default=[], metavar='PATH',
+                       help='Select the functions of a file, directory or dotted module; may be repeated')
+    parser.add_argument('--top-k', type=int, metavar='K',
+                       help='Keep the K most important functions (by PageRank) of the selection, '
+                            'or of the whole graph when no other selector is given')
+    parser.add_argument('--watch', '-w', action='store_true',
+                       help='Keep running with --dir and update the visualizations whenever '
+                            'source files change')
+    parser.add_argument('--formats', type=parse_formats,
+                       help='Comma-separated artifacts to generate: static, interactive, animation, metrics '
+                            '(default: output_formats from the config)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time discovery, parsing, cache access and rendering, and write a '
+                            'per-stage latency report next to the metrics JSON')
+    parser.add_argument('--profile-cpu', action='store_true',
+                       help='With --profile, also record a cProfile dump of the main and worker threads; '
+                            'process-backend workers are not included (implies --profile)')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='With --profile, also record a tracemalloc allocation snapshot (implies --profile)')
     
     args = parser.parse_args()
-    
-    # If file_path is not provided, prompt for it
-    if not args.file_path:
+
+    if args.directory and not os.path.isdir(args.directory):
+        parser.error(f"Directory '{args.directory}' not found")
+    if args.watch and not args.directory:
+        parser.error("--watch requires --dir")
+    if args.top_k is not None and args.top_k <= 0:
+        parser.error("--top-k must be a positive number")
+
+    # If neither a file nor a project directory is provided, prompt for a file
+    if not args.file_path and not args.directory:
         args.file_path = get_file_path()
     
     return args
 
-def print_menu(functions: List[str]) -> None:
-    """Print the function selection menu."""
+def has_selectors(args) -> bool:
+    """Whether the command line selects functions without the menu."""
+    return bool(args.select_glob or args.select_regex or args.select_file or args.top_k)
+
+def select_matching(index: FunctionIndex, args) -> List[str]:
+    """Non-interactive selection from the --select-* and --top-k flags."""
+    return index.select(globs=args.select_glob, regexes=args.select_regex,
+                        files=args.select_file, top_k=args.top_k)
+
+def print_menu(functions: List[str], total: Optional[int] = None) -> None:
+    """Print the function selection menu.
+
+    Long lists show only the first MENU_PAGE_SIZE entries; typing text
+    narrows the list instead.
+    """
     print("\n" + "="*50)
     print("Function Dependency Analyzer - Interactive Selection")
     print("="*50 + "\n")
     
-    print("Available functions:")
-    for i, func in enumerate(functions, 1):
+    if total is not None and total != len(functions):
+        print(f"Matching functions ({len(functions)} of {total}):")
+    else:
+        print("Available functions:")
+    for i, func in enumerate(functions[:MENU_PAGE_SIZE], 1):
         print(f"{i:2d}. {func}")
+    if len(functions) > MENU_PAGE_SIZE:
+        print(f"... and {len(functions) - MENU_PAGE_SIZE} more; type text to narrow the list")
     
     print("\nOptions:")
     print("- Enter numbers (e.g., 1 2 3) to select specific functions")
-    print("- Type 'a' to select all functions")
+    print("- Type text to filter by name (globs like *parse* also work), '/' to clear the filter")
+    print("- Type 'a' to select all listed functions")
     print("- Type 'q' to quit")
 
-def get_user_selection(functions: List[str]) -> Optional[List[str]]:
-    """Get user's function selection."""
+def get_user_selection(functions: List[str], index: Optional[FunctionIndex] = None) -> Optional[List[str]]:
+    """Get user's function selection, filtering the list as the user types."""
+    index = index or FunctionIndex(functions)
+    shown = functions
     while True:
         try:
-            choice = input("\nYour selection: ").strip().lower()
+            raw = input("\nYour selection: ").strip()
+            choice = raw.lower()
             
             if choice == 'q':
                 print("\nOperation cancelled.")
                 return None
             elif choice == 'a':
-                print("\nAll functions selected.")
-                return functions
+                print(f"\n{len(shown)} functions selected.")
+                return shown
+            elif choice == '/':
+                shown = functions
+                print_menu(shown)
+                continue
                 
             try:
                 indices = [int(x) - 1 for x in choice.split()]
-                selected = [functions[i] for i in indices if 0 <= i < len(functions)]
-                
-                if not selected:
-                    print("No valid functions selected. Please try again.")
+            except ValueError:
+                # Anything that is not a list of numbers filters the menu
+                matches = index.match_glob(raw) if set('*?[') & set(raw) else index.search(raw)
+                if not matches:
+                    print(f"No functions match '{raw}'.")
                     continue
-                    
-                return selected
+                shown = sorted(matches)
+                print_menu(shown, total=len(functions))
+                continue
                 
-            except (ValueError, IndexError):
-                print("Invalid input. Please enter valid function numbers.")
+            listed = shown[:MENU_PAGE_SIZE]
+            selected = [listed[i] for i in indices if 0 <= i < len(listed)]
+            if not selected:
+                print("No valid functions selected. Please try again.")
+                continue
+            return selected
                 
         except KeyboardInterrupt:
             print("\nOperation cancelled.")
             return None
 
-def select_functions(functions: List[str]) -> Optional[List[str]]:
+def select_functions(functions: List[str], index: Optional[FunctionIndex] = None) -> Optional[List[str]]:
     """Present an interactive selection of functions to the user."""
     if not functions:
         print("\nNo functions found in the file.")
@@ -98,19 +183,22 @@ def select_functions(functions: List[str]) -> Optional[List[str]]:
 
     # Sort functions for consistent display
     functions = sorted(functions)
+    index = index or FunctionIndex(functions)
     
     # Print initial menu
     print_menu(functions)
     
     # Get user selection
-    selected = get_user_selection(functions)
+    selected = get_user_selection(functions, index)
     if not selected:
         return None
         
     # Show selection summary and confirm
     print("\nSelected functions:")
-    for func in selected:
+    for func in selected[:MENU_PAGE_SIZE]:
         print(f"• {func}")
+    if len(selected) > MENU_PAGE_SIZE:
+        print(f"... and {len(selected) - MENU_PAGE_SIZE} more")
         
     while True:
         confirm = input("\nProceed with these functions? (y/n): ").strip().lower()
@@ -119,6 +207,6 @@ def select_functions(functions: List[str]) -> Optional[List[str]]:
         elif confirm == 'n':
             print("\nSelection cancelled. Please try again.")
             print_menu(functions)
-            return get_user_selection(functions)
+            return get_user_selection(functions, index)
         else:
-            print("Please enter 'y' for yes or 'n' for no.")
\ No newline at end of file
+            print("Please enter 'y' for yes or 'n' for no.")
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import yaml
 
 @dataclass
@@ -9,14 +9,39 @@ class AnalyzerConfig:
     output_directory: str
     cache_enabled: bool
     cache_directory: str
+    cache_backend: str
+    cache_max_size_mb: int
+    cache_max_entries: int
+    cache_write_behind: bool
+    cache_flush_interval: float
+    cache_flush_timeout: float
+    memory_cache_max_mb: float
+    memory_cache_ttl: int
     log_level: str
     max_file_size_mb: int
     parallel_processing: bool
+    parallel_backend: str
     max_workers: int
+    chunk_size: int
+    pipeline_readers: int
+    pipeline_queue_size: int
     ollama_model: str
     graph_dpi: int
     graph_format: str
+    graph_layout_mode: str
+    render_processes: int
+    render_batch_size: int
+    interactive_layout: str
+    animation_mode: str
+    animation_max_frames: int
+    output_formats: List[str]
+    metrics_export_format: str
+    retry_policies: Dict[str, Dict[str, Any]]
+    circuit_breaker_threshold: int
+    circuit_breaker_reset_seconds: float
     excluded_directories: List[str]
+    respect_gitignore: bool
+    watch_interval: float
 
     def __post_init__(self):
         # Ensure output directory is absolute path
@@ -34,14 +59,43 @@ def load_config(config_path: str = "config.yaml") -> AnalyzerConfig:
         "output_directory": "output",
         "cache_enabled": True,
         "cache_directory": ".cache",
+        "cache_backend": "sqlite",
+        "cache_max_size_mb": 512,
+        "cache_max_entries": 0,
+        "cache_write_behind": True,
+        "cache_flush_interval": 0.5,
+        "cache_flush_timeout": 10,
+        "memory_cache_max_mb": 64,
+        "memory_cache_ttl": 300,
         "log_level": "INFO",
         "max_file_size_mb": 10,
         "parallel_processing": True,
+        "parallel_backend": "thread",
         "max_workers": os.cpu_count() or 4,
+        "chunk_size": 64,
+        "pipeline_readers": 2,
+        "pipeline_queue_size": 256,
         "ollama_model": "codellama",
         "graph_dpi": 300,
         "graph_format": "png",
-        "excluded_directories": [".git", "__pycache__", "venv", ".venv"]
+        "graph_layout_mode": "single",
+        "render_processes": os.cpu_count() or 4,
+        "render_batch_size": 16,
+        "interactive_layout": "auto",
+        "animation_mode": "level",
+        "animation_max_frames": 60,
+        "output_formats": ["static", "interactive", "animation", "metrics"],
+        "metrics_export_format": "auto",
+        "retry_policies": {
+            "default": {"max_attempts": 3, "initial_delay": 0.5, "max_delay": 4.0},
+            "static_graph": {"max_attempts": 2},
+            "interactive_graph": {"max_attempts": 2}
+        },
+        "circuit_breaker_threshold": 5,
+        "circuit_breaker_reset_seconds": 30,
+        "excluded_directories": [".git", "__pycache__", "venv", ".venv"],
+        "respect_gitignore": True,
+        "watch_interval": 1.0
     }
 
     try:
@@ -1,7 +1,9 @@
 from functools import wraps
-from tenacity import retry, stop_after_attempt, wait_exponential
+from dataclasses import replace
+from tenacity import Retrying, stop_after_attempt, retry_if_exception
 import logging
 from typing import Type, Tuple, Optional, Callable
+from retry_policy import get_policy, get_circuit_breaker, is_transient
 
 class AnalyzerError(Exception):
     """Base exception class for analyzer errors."""
@@ -21,16 +23,20 @@ class VisualizationError(AnalyzerError):
 
 def with_error_handling(error_types: Tuple[Type[Exception], ...],
                        max_retries: int = 3,
-                       logger: Optional[logging.Logger] = None):
-    """Decorator for handling errors with retry logic."""
+                       logger: Optional[logging.Logger] = None,
+                       operation: Optional[str] = None):
+    """Decorator for handling errors with retry logic.
+
+    Only transient errors of ``error_types`` are retried (see
+    retry_policy.classify_error); missing executables and invalid input fail
+    on the first attempt. With ``operation`` set, backoff comes from that
+    operation's configured policy and calls pass through its circuit breaker.
+    """
     def decorator(func: Callable):
-        @retry(
-            stop=stop_after_attempt(max_retries),
-            wait=wait_exponential(multiplier=1, min=4, max=10),
-            retry=lambda e: isinstance(e, error_types)
-        )
+        name = operation or func.__name__
+
         @wraps(func)
-        def wrapper(*args, **kwargs):
+        def attempt(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except error_types as e:
@@ -40,7 +46,29 @@ def with_error_handling(error_types: Tuple[Type[Exception], ...],
             except Exception as e:
                 if logger:
                     logger.critical(f"Unexpected error in {func.__name__}: {str(e)}")
-                raise AnalyzerError(f"Unexpected error: {str(e)}")
+                raise AnalyzerError(f"Unexpected error: {str(e)}") from e
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            policy = get_policy(name) if operation else replace(get_policy(name), max_attempts=max_retries)
+            breaker = get_circuit_breaker(name) if operation else None
+            if breaker:
+                breaker.before_call()
+            retrying = Retrying(
+                stop=stop_after_attempt(policy.max_attempts),
+                wait=lambda state: policy.delay(state.attempt_number),
+                retry=retry_if_exception(lambda e: isinstance(e, error_types) and is_transient(e)),
+                reraise=True
+            )
+            try:
+                result = retrying(attempt, *args, **kwargs)
+            except Exception as e:
+                if breaker:
+                    breaker.record_failure(e)
+                raise
+            if breaker:
+                breaker.record_success()
+            return result
         return wrapper
     return decorator
 
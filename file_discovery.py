@@ -0,0 +1,183 @@
+import os
+import re
+import time
+import logging
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from metadata_extractor import supported_extensions
+from profiler import get_profiler
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE = '.gitignore'
+
+# (regex over the path relative to the .gitignore's directory, negated, directory only)
+IgnoreRule = Tuple['re.Pattern[str]', bool, bool]
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body; ``*`` never crosses ``/``."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            close = pattern.find(']', i + 2)
+            if close < 0:
+                out.append(re.escape('['))
+                i += 1
+                continue
+            body = pattern[i + 1:close]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append(f'[{body}]')
+            i = close + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+def parse_gitignore(lines: Iterable[str]) -> List[IgnoreRule]:
+    """Compile the patterns of one .gitignore file, in file order."""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate or line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to this directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        rules.append((re.compile(f'{prefix}{_translate_glob(line)}$'), negate, dir_only))
+    return rules
+
+class IgnoreStack:
+    """The .gitignore rules in effect for one directory and its ancestors."""
+
+    def __init__(self, frames: Tuple[Tuple[str, List[IgnoreRule]], ...] = ()):
+        # (directory relative to the walk root, rules), outermost first
+        self.frames = frames
+
+    def descend(self, rel_dir: str, abs_dir: str) -> 'IgnoreStack':
+        """Rules for ``abs_dir``, adding its own .gitignore if it has one."""
+        try:
+            with open(os.path.join(abs_dir, GITIGNORE), encoding='utf-8', errors='replace') as f:
+                rules = parse_gitignore(f)
+        except OSError:
+            return self
+        return IgnoreStack(self.frames + ((rel_dir, rules),)) if rules else self
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether ``rel_path`` is ignored; the last matching rule wins."""
+        result = False
+        for base, rules in self.frames:
+            local = rel_path[len(base) + 1:] if base else rel_path
+            for regex, negate, dir_only in rules:
+                if dir_only and not is_dir:
+                    continue
+                if regex.match(local):
+                    result = not negate
+        return result
+
+def iter_source_entries(root: str, extensions: Set[str], excluded: Iterable[str] = (),
+                        max_size: Optional[int] = None,
+                        respect_gitignore: bool = True) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield ``(path, stat)`` for each source file under ``root`` as it is found.
+
+    Excluded directory names and ignored directories are pruned before they
+    are opened, files are filtered by extension before they are stat'ed, and
+    paths are yielded as soon as their directory has been read, so callers
+    can start working while the walk continues.
+    """
+    excluded = set(excluded)
+    root = os.path.abspath(root)
+    stack = [(root, '', IgnoreStack().descend('', root) if respect_gitignore else IgnoreStack())]
+    profiler = get_profiler()
+    timed = profiler.enabled
+    while stack:
+        directory, rel_dir, ignore = stack.pop()
+        subdirs = []
+        if timed:
+            elapsed = 0
+            start = time.perf_counter_ns()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in excluded and not ignore.ignored(rel_path, True):
+                                subdirs.append((entry.path, rel_path))
+                            continue
+                        if os.path.splitext(entry.name)[1].lower() not in extensions:
+                            continue
+                        if ignore.frames and ignore.ignored(rel_path, False):
+                            continue
+                        st = entry.stat()
+                    except OSError as e:
+                        logger.debug(f"Skipping {entry.path}: {e}")
+                        continue
+                    if max_size is not None and st.st_size > max_size:
+                        logger.warning(f"Skipping {entry.path}: exceeds size limit")
+                        continue
+                    if timed:
+                        # The consumer's work while suspended is not discovery
+                        elapsed += time.perf_counter_ns() - start
+                        yield entry.path, st
+                        start = time.perf_counter_ns()
+                    else:
+                        yield entry.path, st
+        except OSError as e:
+            logger.error(f"Error scanning {directory}: {str(e)}")
+            subdirs = None
+        if timed:
+            profiler.record('discover', elapsed + time.perf_counter_ns() - start, directory)
+        if subdirs is None:
+            continue
+        # Reverse so directories are visited in listing order
+        for path, rel_path in reversed(subdirs):
+            child = ignore.descend(rel_path, path) if respect_gitignore else ignore
+            stack.append((path, rel_path, child))
+
+def iter_source_files(root: str, extensions: Set[str], excluded: Iterable[str] = (),
+                      max_size: Optional[int] = None, respect_gitignore: bool = True) -> Iterator[str]:
+    """Yield the paths of source files under ``root``; see iter_source_entries."""
+    for path, _ in iter_source_entries(root, extensions, excluded, max_size, respect_gitignore):
+        yield path
+
+def discover_files(directory: str, config) -> Iterator[str]:
+    """Source files under ``directory`` for the languages and limits in ``config``."""
+    return iter_source_files(
+        directory,
+        supported_extensions(config.supported_languages),
+        excluded=config.excluded_directories,
+        max_size=config.max_file_size_mb * 1024 * 1024,
+        respect_gitignore=getattr(config, 'respect_gitignore', True)
+    )
@@ -0,0 +1,281 @@
+import io
+import shlex
+import struct
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Tuple, Optional, Sequence
+from PIL import Image, ImageDraw, ImageFont
+from render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+Edge = Tuple[str, str]
+Point = Tuple[float, float]
+
+@dataclass
+class NodeBox:
+    x: float
+    y: float
+    width: float
+    height: float
+    label: str
+    fillcolor: str
+
+@dataclass
+class GraphLayout:
+    """Node boxes and edge splines from one Graphviz layout, in inches."""
+    width: float
+    height: float
+    nodes: Dict[str, NodeBox] = field(default_factory=dict)
+    edges: Dict[Edge, List[List[Point]]] = field(default_factory=dict)
+
+def parse_plain_layout(text: str) -> GraphLayout:
+    """Parse Graphviz ``-Tplain`` output into a GraphLayout."""
+    layout = GraphLayout(0.0, 0.0)
+    pending = ''
+    for line in text.splitlines():
+        pending = f"{pending}\n{line}" if pending else line
+        if not pending.strip():
+            pending = ''
+            continue
+        try:
+            parts = shlex.split(pending, posix=True)
+        except ValueError:
+            # A quoted multi-line label continues on the next line
+            continue
+        pending = ''
+        kind = parts[0]
+        if kind == 'graph':
+            layout.width, layout.height = float(parts[2]), float(parts[3])
+        elif kind == 'node':
+            name = parts[1]
+            x, y, width, height = (float(v) for v in parts[2:6])
+            label = parts[6].replace('\\n', '\n')
+            fillcolor = parts[10] if len(parts) > 10 else 'white'
+            layout.nodes[name] = NodeBox(x, y, width, height, label, fillcolor)
+        elif kind == 'edge':
+            tail, head, count = parts[1], parts[2], int(parts[3])
+            coords = [float(v) for v in parts[4:4 + 2 * count]]
+            points = list(zip(coords[0::2], coords[1::2]))
+            layout.edges.setdefault((tail, head), []).append(points)
+        elif kind == 'stop':
+            break
+    return layout
+
+def pack_layouts(layouts: Sequence[GraphLayout], padding: float = 0.5) -> GraphLayout:
+    """Combine separately laid out graphs into one layout, row by row.
+
+    Rows are filled left to right up to roughly the width of a square of the
+    same total area, so the combined layout keeps a frame-friendly aspect.
+    """
+    if not layouts:
+        return GraphLayout(0.0, 0.0)
+    area = sum((layout.width + padding) * (layout.height + padding) for layout in layouts)
+    row_width = max(max(layout.width for layout in layouts), area ** 0.5)
+    placed = []
+    x = y = row_height = width = 0.0
+    for layout in layouts:
+        if x > 0 and x + layout.width > row_width:
+            y += row_height + padding
+            x = row_height = 0.0
+        placed.append((layout, x, y))
+        width = max(width, x + layout.width)
+        row_height = max(row_height, layout.height)
+        x += layout.width + padding
+    height = y + row_height
+
+    # Rows grow downwards, but layout y coordinates grow upwards
+    combined = GraphLayout(width, height)
+    for layout, dx, top in placed:
+        dy = height - top - layout.height
+        for name, box in layout.nodes.items():
+            combined.nodes[name] = replace(box, x=box.x + dx, y=box.y + dy)
+        for edge, splines in layout.edges.items():
+            combined.edges.setdefault(edge, []).extend(
+                [(px + dx, py + dy) for px, py in spline] for spline in splines)
+    return combined
+
+class StreamingGifWriter:
+    """Append frames to an animated GIF as they are produced.
+
+    Pillow encodes each frame on its own; only that frame's image block is
+    appended to the open file, so memory holds one frame at a time no matter
+    how long the animation is.
+    """
+
+    def __init__(self, path: str, duration: float = 1.0, loop: int = 0,
+                 reserved_colors: Sequence[str] = ()):
+        self.fp = open(path, 'wb')
+        self.delay = max(1, int(round(duration * 100)))  # hundredths of a second
+        self.loop = loop
+        self.reserved_colors = list(reserved_colors)
+        self.palette_image: Optional[Image.Image] = None
+        self.global_table: Optional[bytes] = None
+        self.frames = 0
+
+    def _encode(self, frame: Image.Image) -> bytes:
+        if self.palette_image is None:
+            # The first frame fixes the palette for the rest of the animation;
+            # colors that only appear later (edge highlights) get reserved slots
+            base = frame.convert('RGB').quantize(colors=256 - len(self.reserved_colors))
+            palette = base.getpalette()[:3 * (256 - len(self.reserved_colors))]
+            for color in self.reserved_colors:
+                palette.extend(Image.new('RGB', (1, 1), color).getpixel((0, 0)))
+            self.palette_image = Image.new('P', (1, 1))
+            self.palette_image.putpalette(palette)
+        indexed = frame.convert('RGB').quantize(palette=self.palette_image, dither=Image.Dither.NONE)
+        buf = io.BytesIO()
+        indexed.save(buf, format='GIF', optimize=False)
+        return buf.getvalue()
+
+    def append(self, frame: Image.Image) -> None:
+        data = self._encode(frame)
+        flags = data[10]
+        table_size = 3 * (2 << (flags & 0x07)) if flags & 0x80 else 0
+        header_end = 13 + table_size
+        table = data[13:header_end]
+
+        if self.frames == 0:
+            self.global_table = table
+            self.fp.write(data[:header_end])
+            # NETSCAPE2.0 application extension for looping
+            self.fp.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\x00')
+
+        # Skip any extensions Pillow emitted and copy the image block
+        pos = header_end
+        while data[pos] == 0x21:
+            pos += 2
+            while data[pos]:
+                pos += data[pos] + 1
+            pos += 1
+        image_block = bytearray(data[pos:-1])  # drop the trailer
+
+        self.fp.write(b'\x21\xf9\x04\x00' + struct.pack('<H', self.delay) + b'\x00\x00')
+        if table != self.global_table:
+            # Carry this frame's colors in a local color table
+            image_block[9] = (image_block[9] & 0x78) | 0x80 | (flags & 0x07)
+            image_block[10:10] = table
+        self.fp.write(image_block)
+        self.frames += 1
+
+    def close(self) -> None:
+        if not self.fp.closed:
+            self.fp.write(b'\x3b')
+            self.fp.close()
+
+class FlowAnimator:
+    """Draws animation frames as overlays on one cached Graphviz layout."""
+
+    def __init__(self, colors: Dict[str, str], target_size: Tuple[int, int] = (800, 500),
+                 margin: int = 10, render_service: Optional[RenderService] = None):
+        self.colors = colors
+        self.render_service = render_service or RenderService(max_processes=1)
+        self.target_size = target_size
+        self.margin = margin
+        self.font = ImageFont.load_default()
+
+    def compute_layout(self, dot) -> GraphLayout:
+        """Run Graphviz once and return node and edge coordinates."""
+        plain = self.render_service.render(dot.source, 'plain', engine=dot.engine).decode('utf-8')
+        return parse_plain_layout(plain)
+
+    def _transform(self, layout: GraphLayout):
+        """Return a function mapping layout inches to frame pixels."""
+        width, height = self.target_size
+        scale = min((width - 2 * self.margin) / max(layout.width, 1e-6),
+                    (height - 2 * self.margin) / max(layout.height, 1e-6))
+        offset_x = (width - layout.width * scale) / 2
+        offset_y = (height - layout.height * scale) / 2
+
+        def to_pixels(point: Point) -> Point:
+            return (offset_x + point[0] * scale, offset_y + (layout.height - point[1]) * scale)
+        return to_pixels
+
+    @staticmethod
+    def _bezier(points: List[Point], steps: int = 8) -> List[Point]:
+        """Sample a piecewise cubic Bezier spline as a polyline."""
+        if len(points) < 4:
+            return points
+        sampled = [points[0]]
+        for i in range(0, len(points) - 3, 3):
+            p0, p1, p2, p3 = points[i:i + 4]
+            for step in range(1, steps + 1):
+                t = step / steps
+                u = 1 - t
+                sampled.append((
+                    u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+                    u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1]
+                ))
+        return sampled
+
+    def _text_color(self, fillcolor: str) -> str:
+        """Pick black or white text for readability on the fill color."""
+        try:
+            r, g, b = Image.new('RGB', (1, 1), fillcolor).getpixel((0, 0))
+        except ValueError:
+            return self.colors['text']
+        return 'white' if (0.299 * r + 0.587 * g + 0.114 * b) < 128 else self.colors['text']
+
+    def draw_base(self, layout: GraphLayout) -> Image.Image:
+        """Render all nodes, without edges, onto the background."""
+        image = Image.new('RGB', self.target_size, self.colors['background'])
+        draw = ImageDraw.Draw(image)
+        to_pixels = self._transform(layout)
+        for node in layout.nodes.values():
+            left, top = to_pixels((node.x - node.width / 2, node.y + node.height / 2))
+            right, bottom = to_pixels((node.x + node.width / 2, node.y - node.height / 2))
+            try:
+                draw.rectangle((left, top, right, bottom), fill=node.fillcolor, outline=self.colors['edge'])
+            except ValueError:
+                draw.rectangle((left, top, right, bottom), fill='white', outline=self.colors['edge'])
+            draw.multiline_text(((left + right) / 2, (top + bottom) / 2), node.label,
+                                fill=self._text_color(node.fillcolor), font=self.font,
+                                anchor='mm', align='center')
+        return image
+
+    def draw_edge(self, image: Image.Image, layout: GraphLayout, edge: Edge,
+                  color: str, width: int = 1) -> None:
+        """Overlay every spline of ``edge`` onto ``image``."""
+        draw = ImageDraw.Draw(image)
+        to_pixels = self._transform(layout)
+        for spline in layout.edges.get(edge, []):
+            points = [to_pixels(p) for p in self._bezier(spline)]
+            if len(points) < 2:
+                continue
+            draw.line(points, fill=color, width=width)
+            # Arrowhead along the final segment
+            (x0, y0), (x1, y1) = points[-2], points[-1]
+            length = max(((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5, 1e-6)
+            dx, dy = (x1 - x0) / length, (y1 - y0) / length
+            size = 4 + 2 * width
+            draw.polygon([
+                (x1 + dx * size, y1 + dy * size),
+                (x1 - dy * size / 2, y1 + dx * size / 2),
+                (x1 + dy * size / 2, y1 - dx * size / 2)
+            ], fill=color)
+
+    def render(self, layout: GraphLayout, steps: Sequence[Sequence[Edge]], output_path: str,
+               duration: float = 1.0, done_color: str = 'gray', active_color: str = 'red') -> int:
+        """Write the animation and return the number of frames.
+
+        Frames are: nodes only, one per step with that step's edges highlighted
+        over the edges of earlier steps, and the complete graph. Each frame is
+        a copy of the accumulated raster plus one overlay, so the total drawing
+        work is proportional to the number of edges.
+        """
+        accumulated = self.draw_base(layout)
+        writer = StreamingGifWriter(output_path, duration=duration,
+                                    reserved_colors=(done_color, active_color))
+        try:
+            writer.append(accumulated)
+            for step in steps:
+                frame = accumulated.copy()
+                for edge in step:
+                    self.draw_edge(frame, layout, edge, active_color, width=2)
+                writer.append(frame)
+                for edge in step:
+                    self.draw_edge(accumulated, layout, edge, done_color)
+            writer.append(accumulated)
+        finally:
+            writer.close()
+        return writer.frames
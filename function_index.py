@@ -0,0 +1,197 @@
+import re
+import bisect
+import fnmatch
+import posixpath
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from graph_core import QUALIFIER, split_qualified_name
+
+# Regex syntax that makes literal extraction unsafe (alternation, groups)
+_UNSAFE_REGEX = set('|()')
+_REGEX_SPECIAL = set('.^$*+?{}[]\\|()')
+_GLOB_SPECIAL = set('*?[')
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _glob_literals(pattern: str) -> List[str]:
+    """Literal runs a name must contain to match the glob ``pattern``."""
+    literals = []
+    run = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char in _GLOB_SPECIAL:
+            literals.append(''.join(run))
+            run = []
+            if char == '[':
+                close = pattern.find(']', i + 2)
+                i = close if close >= 0 else len(pattern)
+        else:
+            run.append(char)
+        i += 1
+    literals.append(''.join(run))
+    return [literal for literal in literals if literal]
+
+def _regex_literals(pattern: str) -> List[str]:
+    """Literal runs a match of ``pattern`` must contain, or [] if unsure."""
+    if _UNSAFE_REGEX & set(pattern):
+        return []
+    literals = []
+    run: List[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if escaped.isalnum():
+                # Character classes like \d or anchors like \b
+                literals.append(''.join(run))
+                run = []
+            else:
+                run.append(escaped)
+            i += 2
+            continue
+        if char in '?*{':
+            # The previous character is optional
+            if run:
+                run.pop()
+            literals.append(''.join(run))
+            run = []
+            if char == '{':
+                close = pattern.find('}', i)
+                i = close if close >= 0 else len(pattern)
+        elif char == '[':
+            literals.append(''.join(run))
+            run = []
+            close = pattern.find(']', i + 2)
+            i = close if close >= 0 else len(pattern)
+        elif char in _REGEX_SPECIAL:
+            literals.append(''.join(run))
+            run = []
+        else:
+            run.append(char)
+        i += 1
+    literals.append(''.join(run))
+    return [literal for literal in literals if literal]
+
+class FunctionIndex:
+    """Fast lookup of function names by pattern, file or importance.
+
+    A trigram index over lower-cased names narrows glob, regex and substring
+    queries to a few candidates before the exact pattern is checked, and a
+    sorted copy of the names answers prefix and file queries by bisection.
+    """
+
+    def __init__(self, names: Iterable[str], importance: Optional[Dict[str, float]] = None):
+        self.names = list(names)
+        self.importance = importance or {}
+
+        postings: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            for gram in _trigrams(name.lower()):
+                postings.setdefault(gram, []).append(i)
+        self.trigrams = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        self.sorted_ids = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.sorted_names = [self.names[i] for i in self.sorted_ids]
+
+    @classmethod
+    def from_metadata(cls, metadata, with_importance: bool = False) -> 'FunctionIndex':
+        """Index the functions of ``metadata``, ranked by PageRank if requested."""
+        if not with_importance:
+            return cls(metadata.keys())
+        from graph_metrics import GraphMetrics
+        metrics = GraphMetrics(metadata, betweenness_samples=0)
+        return cls(metrics.nodes, dict(zip(metrics.nodes, metrics.pagerank.tolist())))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _candidates(self, literals: Iterable[str]) -> Optional[np.ndarray]:
+        """Ids of names containing every literal's trigrams, or None for all names."""
+        result = None
+        for literal in literals:
+            for gram in _trigrams(literal.lower()):
+                ids = self.trigrams.get(gram)
+                if ids is None:
+                    return np.zeros(0, dtype=np.int32)
+                result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def _filter(self, literals: List[str], predicate) -> List[str]:
+        candidates = self._candidates(literals)
+        ids = range(len(self.names)) if candidates is None else candidates.tolist()
+        return [self.names[i] for i in ids if predicate(self.names[i])]
+
+    def match_glob(self, pattern: str) -> List[str]:
+        """Names matching a shell-style pattern (case-sensitive)."""
+        regex = re.compile(fnmatch.translate(pattern))
+        return self._filter(_glob_literals(pattern), lambda name: regex.match(name) is not None)
+
+    def match_regex(self, pattern: str) -> List[str]:
+        """Names containing a match of the regular expression ``pattern``."""
+        regex = re.compile(pattern)
+        return self._filter(_regex_literals(pattern), lambda name: regex.search(name) is not None)
+
+    def search(self, text: str) -> List[str]:
+        """Names containing ``text``, ignoring case."""
+        needle = text.lower()
+        return self._filter([text], lambda name: needle in name.lower())
+
+    def prefix(self, text: str) -> List[str]:
+        """Names starting with ``text``, in sorted order."""
+        start = bisect.bisect_left(self.sorted_names, text)
+        end = bisect.bisect_left(self.sorted_names, text + '\U0010ffff')
+        return self.sorted_names[start:end]
+
+    def match_file(self, path: str) -> List[str]:
+        """Functions defined in a file, a directory, or a dotted module.
+
+        ``path`` is compared with the project-relative file label of each
+        qualified name: ``pkg/util.py``, ``pkg`` and ``pkg.util`` all work.
+        """
+        path = path.replace('\\', '/').strip('/')
+        matches = set(self.prefix(f"{path}{QUALIFIER}"))
+        matches.update(self.prefix(f"{path}/"))
+        if '.' in path and '/' not in path:
+            # Dotted module: pkg.util -> pkg/util.<ext>
+            module = path.replace('.', '/')
+            for name in self.prefix(f"{module}."):
+                label = split_qualified_name(name)[0]
+                if posixpath.splitext(label)[0] == module:
+                    matches.add(name)
+        return [name for name in self.sorted_names if name in matches] if matches else []
+
+    def top_k(self, k: int, names: Optional[Iterable[str]] = None) -> List[str]:
+        """The ``k`` most important names, optionally among ``names``."""
+        pool = self.names if names is None else list(names)
+        if k <= 0 or not pool:
+            return []
+        scores = np.fromiter((self.importance.get(name, 0.0) for name in pool), dtype=np.float64, count=len(pool))
+        k = min(k, len(pool))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [pool[i] for i in top.tolist()]
+
+    def select(self, globs: Iterable[str] = (), regexes: Iterable[str] = (),
+               files: Iterable[str] = (), top_k: Optional[int] = None) -> List[str]:
+        """Union of all pattern, regex and file matches, then the top-K of them.
+
+        With only ``top_k`` given, the K most important functions overall.
+        """
+        selected: Set[str] = set()
+        filtered = False
+        for pattern in globs:
+            selected.update(self.match_glob(pattern))
+            filtered = True
+        for pattern in regexes:
+            selected.update(self.match_regex(pattern))
+            filtered = True
+        for path in files:
+            selected.update(self.match_file(path))
+            filtered = True
+        ordered = [name for name in self.sorted_names if name in selected] if filtered else None
+        if top_k is not None:
+            return self.top_k(top_k, ordered)
+        return ordered or []
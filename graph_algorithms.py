@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+def weakly_connected_components(metadata: Dict[str, List[str]]) -> List[Set[str]]:
+    """Group functions linked by dependencies in either direction.
+
+    Iterative union-find with path halving and union by size, so it runs in
+    near-linear time and never recurses. Dependencies that are not keys of
+    ``metadata`` are ignored. Components are returned in order of their first
+    function in ``metadata``.
+    """
+    parent = {func: func for func in metadata}
+    size = dict.fromkeys(metadata, 1)
+
+    def find(func: str) -> str:
+        while parent[func] != func:
+            parent[func] = parent[parent[func]]
+            func = parent[func]
+        return func
+
+    for func, deps in metadata.items():
+        for dep in deps:
+            if dep not in parent:
+                continue
+            a, b = find(func), find(dep)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+
+    groups: Dict[str, Set[str]] = {}
+    for func in metadata:
+        groups.setdefault(find(func), set()).add(func)
+    return list(groups.values())
+
+def strongly_connected_components(metadata: Dict[str, List[str]]) -> List[List[str]]:
+    """Find cycles of mutually dependent functions.
+
+    Iterative Tarjan over call edges (function -> dependency). Components are
+    returned in reverse topological order: a component appears before every
+    component that calls into it.
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in metadata:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(metadata[root]))]
+        while work:
+            func, deps = work[-1]
+            for dep in deps:
+                if dep not in metadata:
+                    continue
+                if dep not in index:
+                    index[dep] = lowlink[dep] = counter
+                    counter += 1
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(metadata[dep])))
+                    break
+                if dep in on_stack:
+                    lowlink[func] = min(lowlink[func], index[dep])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[func])
+                if lowlink[func] == index[func]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == func:
+                            break
+                    components.append(component)
+    return components
+
+def call_levels(metadata: Dict[str, List[str]]) -> Dict[str, int]:
+    """Assign each function its depth below the root functions.
+
+    Cycles are collapsed into one node, then levels are longest paths from
+    the functions nobody calls, so every caller sits above its callees.
+    Functions in the same cycle share a level.
+    """
+    components = strongly_connected_components(metadata)
+    component_of = {func: i for i, members in enumerate(components) for func in members}
+
+    # Walk the condensation in topological order (callers first)
+    level = [0] * len(components)
+    for i in range(len(components) - 1, -1, -1):
+        for func in components[i]:
+            for dep in metadata[func]:
+                j = component_of.get(dep)
+                if j is not None and j != i:
+                    level[j] = max(level[j], level[i] + 1)
+    return {func: level[component_of[func]] for func in metadata}
+
+def group_edges_by_level(metadata: Dict[str, List[str]],
+                         max_groups: Optional[int] = None) -> List[List[Tuple[str, str]]]:
+    """Group (dependency, caller) edges by the caller's level.
+
+    With ``max_groups`` set, consecutive levels are merged so that no more
+    than ``max_groups`` groups are returned.
+    """
+    levels = call_levels(metadata)
+    by_level: Dict[int, List[Tuple[str, str]]] = {}
+    seen: Set[Tuple[str, str]] = set()
+    for func, deps in metadata.items():
+        for dep in deps:
+            if dep in metadata and (dep, func) not in seen:
+                seen.add((dep, func))
+                by_level.setdefault(levels[func], []).append((dep, func))
+    groups = [by_level[level] for level in sorted(by_level)]
+
+    if max_groups is not None and 0 < max_groups < len(groups):
+        per_group = -(-len(groups) // max_groups)
+        groups = [[edge for group in groups[i:i + per_group] for edge in group]
+                  for i in range(0, len(groups), per_group)]
+    return groups
@@ -0,0 +1,223 @@
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Separator between the file label and the function name. A colon would be
+# read as a node:port reference by Graphviz, so use the javadoc-style hash.
+QUALIFIER = "#"
+
+def qualify_name(file_label: str, func: str) -> str:
+    """Build a file-qualified function name."""
+    return f"{file_label}{QUALIFIER}{func}"
+
+def split_qualified_name(name: str) -> Tuple[str, str]:
+    """Split a qualified name into (file_label, function); file_label may be empty."""
+    file_label, sep, func = name.rpartition(QUALIFIER)
+    return (file_label, func) if sep else ("", name)
+
+class CompactGraph:
+    """Dependency graph with interned names and CSR adjacency.
+
+    Defined functions get ids ``0 .. num_functions - 1`` in definition order;
+    dependencies that are not defined (library calls, ambiguous names) are
+    interned after them so their mentions are kept. Each dependency mention
+    costs one int32 in the forward arrays and one in the reverse arrays,
+    instead of a str reference and list slot per mention.
+    """
+
+    def __init__(self, names: List[str], num_functions: int, indptr: np.ndarray, indices: np.ndarray):
+        self.names = names
+        self.num_functions = num_functions
+        self.index = {name: i for i, name in enumerate(names)}
+        self.indptr = indptr
+        self.indices = indices
+
+        # Reverse CSR over every interned name: who mentions each id
+        rows = np.repeat(np.arange(num_functions, dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        self.rev_indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(names)), out=self.rev_indptr[1:])
+        self.rev_indices = rows[order]
+
+    @classmethod
+    def from_metadata(cls, metadata) -> 'CompactGraph':
+        """Build from a mapping of function name to dependency names."""
+        if isinstance(metadata, GraphMapping):
+            return metadata.graph
+        builder = CompactGraphBuilder(metadata)
+        for func, deps in metadata.items():
+            builder.add(func, deps)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return self.num_functions
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @property
+    def functions(self) -> List[str]:
+        """Names of the defined functions, in id order."""
+        return self.names[:self.num_functions]
+
+    def successors(self, node: int) -> np.ndarray:
+        """Ids mentioned as dependencies of ``node`` (a view, in mention order)."""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        """Ids of the functions that mention ``node`` (a view)."""
+        return self.rev_indices[self.rev_indptr[node]:self.rev_indptr[node + 1]]
+
+    @property
+    def out_degree(self) -> np.ndarray:
+        """Dependency mentions per function, including undefined ones."""
+        return np.diff(self.indptr)
+
+    @property
+    def in_degree(self) -> np.ndarray:
+        """Mentions of each interned name."""
+        return np.diff(self.rev_indptr)
+
+    def internal_edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct (function, dependency) id pairs between defined functions."""
+        src = np.repeat(np.arange(self.num_functions, dtype=np.int64), np.diff(self.indptr))
+        dst = self.indices.astype(np.int64)
+        internal = dst < self.num_functions
+        n = max(self.num_functions, 1)
+        pairs = np.unique(src[internal] * n + dst[internal])
+        return (pairs // n).astype(np.int32), (pairs % n).astype(np.int32)
+
+    def neighborhood(self, seeds: Iterable[str], depth: Optional[int] = 1,
+                     direction: str = 'callees') -> List[str]:
+        """Functions reachable from ``seeds`` within ``depth`` calls.
+
+        ``direction`` is "callees" (follow dependencies), "callers" (follow
+        the reverse index) or "both"; ``depth`` None means no limit. Only the
+        visited subgraph is touched, so the cost is independent of graph size.
+        Seeds come first, then functions in breadth-first order.
+        """
+        if direction not in ('callees', 'callers', 'both'):
+            raise ValueError(f"Unknown direction {direction!r}")
+        forward = direction in ('callees', 'both')
+        backward = direction in ('callers', 'both')
+
+        visited = []
+        seen = set()
+        for name in seeds:
+            node = self.index.get(name)
+            if node is not None and node < self.num_functions and node not in seen:
+                seen.add(node)
+                visited.append(node)
+
+        frontier = list(visited)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            next_frontier = []
+            for node in frontier:
+                neighbours = []
+                if forward:
+                    neighbours.extend(self.successors(node).tolist())
+                if backward:
+                    neighbours.extend(self.predecessors(node).tolist())
+                for other in neighbours:
+                    if other < self.num_functions and other not in seen:
+                        seen.add(other)
+                        visited.append(other)
+                        next_frontier.append(other)
+            frontier = next_frontier
+            level += 1
+        return [self.names[node] for node in visited]
+
+    def dependencies(self, func: str) -> List[str]:
+        """Dependency names of ``func``, as in the original metadata."""
+        names = self.names
+        return [names[j] for j in self.successors(self.index[func]).tolist()]
+
+    def nbytes(self) -> int:
+        """Bytes held by the adjacency arrays."""
+        return self.indptr.nbytes + self.indices.nbytes + self.rev_indptr.nbytes + self.rev_indices.nbytes
+
+class CompactGraphBuilder:
+    """Builds a CompactGraph row by row without materializing a dict of lists.
+
+    ``functions`` fixes the defined names (and their ids) up front; rows must
+    then be added in the same order.
+    """
+
+    def __init__(self, functions: Iterable[str]):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        for func in functions:
+            if func in self.index:
+                raise ValueError(f"Function defined twice: {func}")
+            self.index[func] = len(self.names)
+            self.names.append(func)
+        self.num_functions = len(self.names)
+        self._row_lengths = array('q')
+        self._indices = array('i')
+
+    def _intern(self, name: str) -> int:
+        node = self.index.get(name)
+        if node is None:
+            node = self.index[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+    def add(self, func: str, deps: Iterable[str]) -> None:
+        """Add the dependency row of the next defined function."""
+        expected = len(self._row_lengths)
+        if expected >= self.num_functions or self.names[expected] != func:
+            raise ValueError(f"Rows must follow definition order; got {func}")
+        start = len(self._indices)
+        self._indices.extend(self._intern(dep) for dep in deps)
+        self._row_lengths.append(len(self._indices) - start)
+
+    def build(self) -> CompactGraph:
+        if len(self._row_lengths) != self.num_functions:
+            raise ValueError(f"Missing rows for {self.num_functions - len(self._row_lengths)} functions")
+        indptr = np.zeros(self.num_functions + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(self._row_lengths, dtype=np.int64), out=indptr[1:])
+        indices = np.frombuffer(self._indices, dtype=np.int32).copy()
+        return CompactGraph(self.names, self.num_functions, indptr, indices)
+
+class GraphMapping(Mapping):
+    """Read-only ``Dict[str, List[str]]`` view of a CompactGraph.
+
+    Lets existing callers keep using ``metadata[func]``, ``func in metadata``
+    and ``metadata.items()``; dependency lists are built on access.
+    """
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+
+    @classmethod
+    def from_metadata(cls, metadata) -> 'GraphMapping':
+        return cls(CompactGraph.from_metadata(metadata))
+
+    def __getitem__(self, func: str) -> List[str]:
+        node = self.graph.index.get(func)
+        if node is None or node >= self.graph.num_functions:
+            raise KeyError(func)
+        names = self.graph.names
+        return [names[j] for j in self.graph.successors(node).tolist()]
+
+    def __contains__(self, func) -> bool:
+        node = self.graph.index.get(func)
+        return node is not None and node < self.graph.num_functions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.graph.functions)
+
+    def __len__(self) -> int:
+        return self.graph.num_functions
+
+    def __repr__(self) -> str:
+        return f"GraphMapping({self.graph.num_functions} functions, {self.graph.num_edges} dependencies)"
+
+def as_compact_graph(metadata) -> CompactGraph:
+    """Return the CompactGraph behind ``metadata``, building one for plain dicts."""
+    if isinstance(metadata, CompactGraph):
+        return metadata
+    return CompactGraph.from_metadata(metadata)
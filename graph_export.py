@@ -0,0 +1,106 @@
+import json
+import logging
+from typing import Dict, List
+import numpy as np
+from graph_metrics import GraphMetrics
+from graph_core import split_qualified_name
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # Arrow export is optional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('auto', 'arrow', 'npz', 'ndjson', 'json')
+
+# Numeric node columns, in export order
+NODE_METRIC_COLUMNS = ('in_degree', 'out_degree', 'fan_in', 'fan_out',
+                       'is_recursive', 'pagerank', 'betweenness')
+
+def node_columns(metrics: GraphMetrics) -> Dict[str, np.ndarray]:
+    """Full node table as columns, straight from the metric arrays."""
+    names = metrics.nodes
+    columns = {
+        'name': np.array(names, dtype=str),
+        'file': np.array([split_qualified_name(name)[0] for name in names], dtype=str)
+    }
+    for column in NODE_METRIC_COLUMNS:
+        columns[column] = np.asarray(getattr(metrics, column))
+    return columns
+
+def edge_columns(metrics: GraphMetrics) -> Dict[str, np.ndarray]:
+    """Distinct call edges as (caller id, dependency id) columns into the node table."""
+    return {'src': metrics.src, 'dst': metrics.dst}
+
+def export_npz(metrics: GraphMetrics, output_base: str) -> List[str]:
+    """Write nodes and edges into one compressed ``.npz`` archive."""
+    path = f"{output_base}_graph.npz"
+    nodes = node_columns(metrics)
+    edges = edge_columns(metrics)
+    np.savez_compressed(path, **{f"node_{k}": v for k, v in nodes.items()},
+                        **{f"edge_{k}": v for k, v in edges.items()})
+    return [path]
+
+def export_arrow(metrics: GraphMetrics, output_base: str) -> List[str]:
+    """Write nodes and edges as Arrow IPC files."""
+    paths = []
+    for suffix, columns in (('nodes', node_columns(metrics)), ('edges', edge_columns(metrics))):
+        table = pa.table({name: pa.array(values) for name, values in columns.items()})
+        path = f"{output_base}_{suffix}.arrow"
+        with pa.OSFile(path, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        paths.append(path)
+    return paths
+
+def export_ndjson(metrics: GraphMetrics, output_base: str, chunk_size: int = 10000) -> List[str]:
+    """Stream nodes and edges as newline-delimited JSON, one record per line.
+
+    Rows are formatted from the metric arrays a chunk at a time, so no
+    per-row dict is built and memory stays flat as the graph grows.
+    """
+    names = metrics.nodes
+    nodes_path = f"{output_base}_nodes.ndjson"
+    with open(nodes_path, 'w', encoding='utf-8') as f:
+        arrays = [np.asarray(getattr(metrics, column)) for column in NODE_METRIC_COLUMNS]
+        for start in range(0, len(names), chunk_size):
+            chunk = [array[start:start + chunk_size].tolist() for array in arrays]
+            for name, values in zip(names[start:start + chunk_size], zip(*chunk)):
+                fields = ', '.join(f'"{column}": {json.dumps(value)}'
+                                   for column, value in zip(NODE_METRIC_COLUMNS, values))
+                f.write(f'{{"name": {json.dumps(name)}, '
+                        f'"file": {json.dumps(split_qualified_name(name)[0])}, {fields}}}\n')
+
+    edges_path = f"{output_base}_edges.ndjson"
+    with open(edges_path, 'w', encoding='utf-8') as f:
+        for start in range(0, len(metrics.src), chunk_size):
+            pairs = zip(metrics.src[start:start + chunk_size].tolist(),
+                        metrics.dst[start:start + chunk_size].tolist())
+            f.writelines(f'{{"src": {json.dumps(names[src])}, "dst": {json.dumps(names[dst])}}}\n'
+                         for src, dst in pairs)
+    return [nodes_path, edges_path]
+
+def export_json(metrics: GraphMetrics, output_base: str) -> List[str]:
+    """Legacy per-node JSON object keyed by function name."""
+    path = f"{output_base}_metrics.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metrics.as_dict(), f, indent=2)
+    return [path]
+
+def export_graph(metrics: GraphMetrics, output_base: str, fmt: str = 'auto') -> List[str]:
+    """Export the node table and edge list; returns the files written.
+
+    ``auto`` picks Arrow IPC when pyarrow is installed and ``.npz``
+    otherwise. Asking for ``arrow`` without pyarrow falls back to NDJSON.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'auto':
+        fmt = 'arrow' if pa is not None else 'npz'
+    if fmt == 'arrow' and pa is None:
+        logger.warning("pyarrow is not installed; exporting NDJSON instead of Arrow")
+        fmt = 'ndjson'
+    exporters = {'arrow': export_arrow, 'npz': export_npz, 'ndjson': export_ndjson, 'json': export_json}
+    return exporters[fmt](metrics, output_base)
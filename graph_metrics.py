@@ -0,0 +1,262 @@
+import random
+from typing import Dict, Iterable, List, Any, Optional, Set
+import numpy as np
+from graph_core import as_compact_graph
+
+def component_labels(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Label every node with the smallest node id of its weakly connected component.
+
+    Vectorized hook-and-jump: each round points every root at the smallest
+    root it shares an edge with, then flattens the pointers, so the number
+    of roots per unfinished component at least halves every round.
+    """
+    label = np.arange(n)
+    while True:
+        low = np.minimum(label[src], label[dst])
+        np.minimum.at(label, label[src], low)
+        np.minimum.at(label, label[dst], low)
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+        if np.array_equal(label[src], label[dst]):
+            return label
+
+class GraphMetrics:
+    """Per-node metrics for a dependency graph, computed once in O(V+E).
+
+    Accepts a metadata mapping or a CompactGraph. Edges point from a function
+    to each dependency that is itself in the graph (call direction). Forward
+    and reverse adjacency are stored as CSR arrays; degrees come from
+    ``np.bincount`` and PageRank is a vectorized power iteration. Betweenness
+    is estimated from a sample of BFS sources.
+
+    With ``by_component`` the centralities are computed per weakly connected
+    component instead: PageRank exactly (each component's share only depends
+    on the component, up to one global scale factor) and betweenness from up
+    to ``betweenness_samples`` sources per component. A ``previous`` result
+    computed that way is then reused for every component that contains none
+    of the ``changed`` functions and has the same members and edge count as
+    before, so an incremental update only pays for the components it touched.
+    """
+
+    def __init__(self, metadata, damping: float = 0.85,
+                 betweenness_samples: int = 64, seed: int = 0, by_component: bool = False,
+                 previous: Optional['GraphMetrics'] = None, changed: Optional[Iterable[str]] = None):
+        graph = as_compact_graph(metadata)
+        self.graph = graph
+        self.nodes = graph.functions
+        self.index = {name: i for i, name in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        # Distinct call edges between defined functions
+        self.src, self.dst = graph.internal_edges()
+
+        self.indptr, self.indices = self._csr(self.src, self.dst, n)
+        self.rev_indptr, self.rev_indices = self._csr(self.dst, self.src, n)
+
+        # Raw dependency counts, including dependencies outside the graph
+        self.out_degree = graph.out_degree
+        self.fan_out = np.diff(self.indptr)
+        self.fan_in = np.diff(self.rev_indptr)
+        self.is_recursive = np.zeros(n, dtype=bool)
+        self.is_recursive[self.src[self.src == self.dst]] = True
+
+        # Set in by_component mode: component label per node, and PageRank
+        # before the global scale factor is applied
+        self.component: Optional[np.ndarray] = None
+        self.local_rank: Optional[np.ndarray] = None
+        self.reused = 0
+        if by_component or previous is not None:
+            self._compute_by_component(damping, betweenness_samples, seed, previous, changed)
+        else:
+            self.pagerank = self._pagerank(damping)
+            self.betweenness = self._approximate_betweenness(betweenness_samples, seed)
+
+    @staticmethod
+    def _csr(rows: np.ndarray, cols: np.ndarray, n: int):
+        """Build CSR (indptr, indices) arrays for the given edge list."""
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order]
+
+    def _pagerank(self, damping: float, tol: float = 1e-8, max_iter: int = 100) -> np.ndarray:
+        """PageRank over call edges; heavily used functions rank highest."""
+        n = len(self.nodes)
+        if n == 0:
+            return np.zeros(0)
+        out = self.fan_out.astype(np.float64)
+        dangling = out == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = np.divide(rank, out, out=np.zeros(n), where=~dangling)
+            new_rank = np.bincount(self.dst, weights=share[self.src], minlength=n)
+            new_rank = damping * (new_rank + rank[dangling].sum() / n) + (1.0 - damping) / n
+            if np.abs(new_rank - rank).sum() < tol:
+                return new_rank
+            rank = new_rank
+        return rank
+
+    def _approximate_betweenness(self, samples: int, seed: int) -> np.ndarray:
+        """Brandes betweenness accumulated from up to ``samples`` BFS sources."""
+        n = len(self.nodes)
+        centrality = np.zeros(n)
+        if n == 0 or len(self.src) == 0 or samples <= 0:
+            return centrality
+
+        sources = range(n) if samples >= n else random.Random(seed).sample(range(n), samples)
+        self._accumulate_betweenness(sources, centrality)
+        if samples < n:
+            centrality *= n / samples
+        return centrality
+
+    def _accumulate_betweenness(self, sources: Iterable[int], centrality: np.ndarray) -> None:
+        """Add the Brandes dependencies of BFS from each of ``sources``."""
+        successors = self.indices
+        indptr = self.indptr
+        for s in sources:
+            order = []
+            preds: Dict[int, List[int]] = {s: []}
+            sigma = {s: 1}
+            dist = {s: 0}
+            frontier = [s]
+            while frontier:
+                next_frontier = []
+                for v in frontier:
+                    order.append(v)
+                    for w in successors[indptr[v]:indptr[v + 1]].tolist():
+                        if w not in dist:
+                            dist[w] = dist[v] + 1
+                            sigma[w] = 0
+                            preds[w] = []
+                            next_frontier.append(w)
+                        if dist[w] == dist[v] + 1:
+                            sigma[w] += sigma[v]
+                            preds[w].append(v)
+                frontier = next_frontier
+            delta = dict.fromkeys(order, 0.0)
+            for w in reversed(order):
+                for v in preds[w]:
+                    delta[v] += sigma[v] / sigma[w] * (1.0 + delta[w])
+                if w != s:
+                    centrality[w] += delta[w]
+
+    def _compute_by_component(self, damping: float, samples: int, seed: int,
+                              previous: Optional['GraphMetrics'], changed: Optional[Iterable[str]],
+                              tol: float = 1e-10, max_iter: int = 200) -> None:
+        n = len(self.nodes)
+        self.component = component_labels(n, self.src, self.dst)
+        local_rank = np.zeros(n)
+        betweenness = np.zeros(n)
+
+        dirty = np.ones(n, dtype=bool)
+        if previous is not None and previous.component is not None and changed is not None and n:
+            prev_index = np.array([previous.index.get(name, -1) for name in self.nodes])
+            dirty = self._dirty_components(previous, prev_index, set(changed))
+            clean = ~dirty
+            local_rank[clean] = previous.local_rank[prev_index[clean]]
+            betweenness[clean] = previous.betweenness[prev_index[clean]]
+            self.reused = int(clean.sum())
+
+        # u = 1 + damping * P^T u on the dirty components; edges never leave a component
+        inner = dirty[self.src]
+        src, dst = self.src[inner], self.dst[inner]
+        out = self.fan_out.astype(np.float64)
+        rank = np.where(dirty, 1.0, 0.0)
+        for _ in range(max_iter):
+            share = np.divide(rank, out, out=np.zeros(n), where=out > 0)
+            new_rank = np.where(dirty, 1.0 + damping * np.bincount(dst, weights=share[src], minlength=n), 0.0)
+            if np.abs(new_rank - rank).sum() < tol * max(1, int(dirty.sum())):
+                rank = new_rank
+                break
+            rank = new_rank
+        local_rank[dirty] = rank[dirty]
+
+        # Dangling nodes spread their rank over every node: one global scale
+        dangling_mass = local_rank[self.fan_out == 0].sum()
+        self.rank_scale = (1.0 - damping) / (n - damping * dangling_mass) if n else 0.0
+        self.local_rank = local_rank
+        self.pagerank = local_rank * self.rank_scale
+
+        if samples > 0 and len(src):
+            # BFS never leaves a component, so one array serves every component
+            rng = random.Random(seed)
+            centrality = np.zeros(n)
+            order = np.argsort(self.component[dirty], kind='stable')
+            members = np.flatnonzero(dirty)[order]
+            bounds = np.flatnonzero(np.diff(self.component[members])) + 1
+            for group in np.split(members, bounds):
+                if len(group) < 3:
+                    continue
+                group = group.tolist()
+                sources = group if len(group) <= samples else rng.sample(group, samples)
+                self._accumulate_betweenness(sources, centrality)
+                centrality[group] *= len(group) / len(sources)
+            betweenness[dirty] = centrality[dirty]
+        self.betweenness = betweenness
+
+    def _dirty_components(self, previous: 'GraphMetrics', prev_index: np.ndarray,
+                          changed: Set[str]) -> np.ndarray:
+        """Nodes whose component cannot reuse ``previous``, as a boolean mask.
+
+        ``prev_index`` holds each node's index in ``previous``, or -1.
+        """
+        n = len(self.nodes)
+        bad = np.zeros(n, dtype=bool)
+        bad[[self.index[name] for name in changed if name in self.index]] = True
+        bad |= prev_index < 0
+
+        # Every member must come from one previous component of the same size and edge count
+        prev_label = np.where(prev_index >= 0, previous.component[np.maximum(prev_index, 0)], -1)
+        low = np.full(n, n + len(previous.nodes))
+        high = np.full(n, -1)
+        np.minimum.at(low, self.component, prev_label)
+        np.maximum.at(high, self.component, prev_label)
+        size = np.bincount(self.component, minlength=n)
+        edges = np.bincount(self.component[self.src], minlength=n)
+        prev_n = len(previous.nodes)
+        prev_size = np.bincount(previous.component, minlength=prev_n)
+        prev_edges = np.bincount(previous.component[previous.src], minlength=prev_n)
+        roots = np.flatnonzero(size)
+        same = (low[roots] == high[roots]) & (low[roots] >= 0)
+        match = np.zeros(n, dtype=bool)
+        candidates = roots[same]
+        previous_roots = low[candidates]
+        match[candidates] = ((prev_size[previous_roots] == size[candidates])
+                             & (prev_edges[previous_roots] == edges[candidates]))
+
+        dirty_root = ~match
+        dirty_root[np.unique(self.component[bad])] = True
+        return dirty_root[self.component]
+
+    @property
+    def in_degree(self) -> np.ndarray:
+        """Number of distinct callers, including the function itself if recursive."""
+        return self.fan_in
+
+    def importance(self, func: str) -> float:
+        """Centrality used for node sizing and coloring."""
+        return float(self.pagerank[self.index[func]])
+
+    @property
+    def max_importance(self) -> float:
+        return float(self.pagerank.max()) if len(self.pagerank) else 0.0
+
+    def node_metrics(self, func: str) -> Dict[str, Any]:
+        """Return the metrics of one node as plain Python values."""
+        i = self.index[func]
+        return {
+            'in_degree': int(self.fan_in[i]),
+            'out_degree': int(self.out_degree[i]),
+            'is_recursive': bool(self.is_recursive[i]),
+            'fan_in': int(self.fan_in[i]),
+            'fan_out': int(self.fan_out[i]),
+            'pagerank': float(self.pagerank[i]),
+            'betweenness': float(self.betweenness[i])
+        }
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return metrics for every node, keyed by function name."""
+        return {func: self.node_metrics(func) for func in self.nodes}
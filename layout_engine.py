@@ -0,0 +1,211 @@
+import logging
+import subprocess
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import graphviz
+from flow_animator import parse_plain_layout
+from render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+# Pixels per unit of layout distance in the returned coordinates
+PIXELS_PER_UNIT = 120.0
+POINTS_PER_INCH = 72.0
+
+def _push_from(points: np.ndarray, sources: np.ndarray, weight: Optional[np.ndarray],
+               k: float) -> np.ndarray:
+    """Sum of k^2/d repulsion on ``points`` from weighted ``sources``.
+
+    With w = weight / d^2, the force on p is k^2 * (p * sum(w) - w @ s),
+    so each chunk costs two matrix-vector products instead of a 3-D array.
+    """
+    dx = points[:, 0, None] - sources[None, :, 0]
+    dy = points[:, 1, None] - sources[None, :, 1]
+    inverse = 1.0 / (dx * dx + dy * dy + 1e-9)
+    if weight is not None:
+        inverse *= weight
+    total = inverse.sum(axis=1)
+    return k * k * (points * total[:, None] - inverse @ sources)
+
+def _repulsion_exact(pos: np.ndarray, k: float, max_pairs: int) -> np.ndarray:
+    """Pairwise repulsion, computed in row chunks of at most ``max_pairs`` pairs."""
+    n = len(pos)
+    disp = np.zeros_like(pos)
+    step = max(1, max_pairs // max(n, 1))
+    for start in range(0, n, step):
+        rows = slice(start, start + step)
+        weight = np.ones((len(pos[rows]), n))
+        weight[np.arange(len(pos[rows])), np.arange(start, start + len(pos[rows]))] = 0.0
+        disp[rows] = _push_from(pos[rows], pos, weight, k)
+    return disp
+
+def _repulsion_grid(pos: np.ndarray, k: float, grid_size: int, max_pairs: int) -> np.ndarray:
+    """Barnes-Hut style repulsion from the centres of mass of grid cells.
+
+    Every node is pushed away from each occupied cell as if the cell's nodes
+    sat at their centroid. A node's own cell is taken without the node
+    itself, so cost is O(n * cells) instead of O(n^2).
+    """
+    n = len(pos)
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-9)
+    coords = np.minimum((pos - low) / span * grid_size, grid_size - 1).astype(np.int64)
+    cell = coords[:, 0] * grid_size + coords[:, 1]
+
+    occupied, cell_index = np.unique(cell, return_inverse=True)
+    counts = np.bincount(cell_index).astype(np.float64)
+    sums = np.stack([np.bincount(cell_index, weights=pos[:, axis]) for axis in (0, 1)], axis=1)
+    centroids = sums / counts[:, None]
+
+    disp = np.zeros_like(pos)
+    step = max(1, max_pairs // max(len(occupied), 1))
+    for start in range(0, n, step):
+        rows = slice(start, start + step)
+        own = cell_index[rows]
+        weight = np.broadcast_to(counts, (len(own), len(counts))).copy()
+        weight[np.arange(len(own)), own] = 0.0
+        disp[rows] = _push_from(pos[rows], centroids, weight, k)
+
+        # Own cell without this node
+        own_count = counts[own] - 1
+        peer_centroid = (sums[own] - pos[rows]) / np.maximum(own_count, 1)[:, None]
+        delta = pos[rows] - peer_centroid
+        dist2 = np.einsum('ij,ij->i', delta, delta) + 1e-9
+        disp[rows] += (k * k * own_count / dist2)[:, None] * delta
+    return disp
+
+def force_directed_layout(n: int, src: np.ndarray, dst: np.ndarray, iterations: int = 100,
+                          seed: int = 0, exact_limit: int = 1500, grid_size: int = 32,
+                          max_pairs: int = 1 << 20) -> np.ndarray:
+    """Fruchterman-Reingold layout vectorized with NumPy.
+
+    Repulsion is exact up to ``exact_limit`` nodes and grid-approximated
+    above it; attraction runs along the (undirected) edges ``src``-``dst``.
+    Returns an (n, 2) array with an ideal edge length of 1.
+    """
+    if n == 0:
+        return np.zeros((0, 2))
+    rng = np.random.default_rng(seed)
+    k = 1.0
+    pos = rng.uniform(-0.5, 0.5, size=(n, 2)) * np.sqrt(n) * k
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    gravity = 0.5 * k
+
+    temperature = np.sqrt(n) * k / 4
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        if n <= exact_limit:
+            disp = _repulsion_exact(pos, k, max_pairs)
+        else:
+            disp = _repulsion_grid(pos, k, grid_size, max_pairs)
+
+        # Attraction d^2/k along each edge, applied to both ends
+        delta = pos[src] - pos[dst]
+        dist = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+        pull = delta * (dist / k)[:, None]
+        for axis in (0, 1):
+            disp[:, axis] += (np.bincount(dst, weights=pull[:, axis], minlength=n)
+                              - np.bincount(src, weights=pull[:, axis], minlength=n))
+
+        # Weak pull to the centre keeps disconnected components together
+        disp -= gravity * pos
+
+        length = np.sqrt(np.einsum('ij,ij->i', disp, disp)) + 1e-9
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return pos - pos.mean(axis=0)
+
+def graphviz_layout(n: int, src: np.ndarray, dst: np.ndarray, render_service: RenderService,
+                    engine: str = 'sfdp') -> np.ndarray:
+    """Node positions from a Graphviz engine such as sfdp, in points."""
+    lines = ['graph layout {', 'graph [overlap=false, splines=false];', 'node [shape=point];']
+    lines.extend(f'{i};' for i in range(n))
+    lines.extend(f'{s} -- {d};' for s, d in zip(src.tolist(), dst.tolist()) if s != d)
+    lines.append('}')
+    plain = render_service.render('\n'.join(lines), 'plain', engine=engine).decode('utf-8')
+    layout = parse_plain_layout(plain)
+    pos = np.zeros((n, 2))
+    for name, node in layout.nodes.items():
+        pos[int(name)] = (node.x, node.y)
+    return pos * POINTS_PER_INCH
+
+def compute_layout(nodes: List[str], src: np.ndarray, dst: np.ndarray, method: str = 'auto',
+                   render_service: Optional[RenderService] = None,
+                   seed: int = 0) -> Dict[str, Tuple[float, float]]:
+    """Compute fixed screen coordinates for every node.
+
+    ``method`` is "sfdp", "numpy", or "auto" (sfdp, falling back to the
+    NumPy layout when Graphviz is missing or fails). Coordinates are in
+    pixels with y growing downwards, as vis.js expects.
+    """
+    n = len(nodes)
+    pos = None
+    if method in ('auto', 'sfdp') and n > 1:
+        try:
+            pos = graphviz_layout(n, src, dst, render_service or RenderService(max_processes=1))
+            pos[:, 1] = -pos[:, 1]
+        except (graphviz.ExecutableNotFound, subprocess.CalledProcessError, ValueError) as e:
+            if method == 'sfdp':
+                raise
+            logger.info(f"sfdp layout unavailable ({e}); using the NumPy force-directed layout")
+    if pos is None:
+        pos = force_directed_layout(n, src, dst, seed=seed) * PIXELS_PER_UNIT
+    pos = pos - pos.mean(axis=0) if n else pos
+    return {name: (float(x), float(y)) for name, (x, y) in zip(nodes, pos)}
+
+def extend_layout(previous: Dict[str, Tuple[float, float]], nodes: List[str], src: np.ndarray,
+                  dst: np.ndarray, spacing: float = PIXELS_PER_UNIT) -> Dict[str, Tuple[float, float]]:
+    """Reuse ``previous`` coordinates and place only the nodes it lacks.
+
+    A new node goes on a small spiral around the centroid of its already
+    placed neighbours; new nodes with no placed neighbour are stacked in a
+    column right of the existing drawing. Unchanged parts of the graph keep
+    their exact positions, so an incremental update does not reshuffle the
+    picture and costs time proportional to the new nodes only.
+    """
+    n = len(nodes)
+    pos = np.zeros((n, 2))
+    placed = np.zeros(n, dtype=bool)
+    for i, name in enumerate(nodes):
+        point = previous.get(name)
+        if point is not None:
+            pos[i] = point
+            placed[i] = True
+    missing = np.flatnonzero(~placed).tolist()
+    if missing:
+        neighbours: Dict[int, List[int]] = {i: [] for i in missing}
+        for s, d in zip(src.tolist(), dst.tolist()):
+            if s in neighbours:
+                neighbours[s].append(d)
+            if d in neighbours:
+                neighbours[d].append(s)
+
+        crowd: Dict[Tuple[float, float], int] = {}
+        golden_angle = np.pi * (3 - np.sqrt(5))
+        progress = True
+        while missing and progress:
+            progress = False
+            pending = []
+            for i in missing:
+                anchors = [j for j in neighbours[i] if placed[j]]
+                if not anchors:
+                    pending.append(i)
+                    continue
+                centre = pos[anchors].mean(axis=0)
+                key = (round(centre[0], 3), round(centre[1], 3))
+                slot = crowd.get(key, 0) + 1
+                crowd[key] = slot
+                radius = spacing * np.sqrt(slot)
+                angle = slot * golden_angle
+                pos[i] = centre + radius * np.array([np.cos(angle), np.sin(angle)])
+                placed[i] = True
+                progress = True
+            missing = pending
+
+        # Nodes with no placed neighbour at all
+        right = pos[placed, 0].max() + spacing if placed.any() else 0.0
+        top = pos[placed, 1].min() if placed.any() else 0.0
+        for row, i in enumerate(missing):
+            pos[i] = (right, top + row * spacing)
+    return {name: (float(x), float(y)) for name, (x, y) in zip(nodes, pos)}
@@ -2,46 +2,31 @@
 
 import os
 import sys
+import time
 from config import load_config
 from logger import setup_logger
 from error_handler import setup_error_handlers
+from retry_policy import configure_retry_policies
 from visualizer import DependencyVisualizer
-from cli import parse_args, select_functions
-import ast
-from typing import Dict, List, Any
+from cli import parse_args, select_functions, has_selectors, select_matching
+from metadata_extractor import extract_metadata
+from project_analyzer import analyze_project
+from monitoring import MetricsCollector
+from profiler import PARSE_STAGE, Profiler, configure_profiler, get_profiler
+from graph_core import as_compact_graph
+from function_index import FunctionIndex
+from watcher import ProjectWatcher
+from typing import Dict, List, Any, Mapping
 
 def print_flush(*args, **kwargs):
     """Print with immediate flush."""
     print(*args, **kwargs, flush=True)
 
 def extract_function_metadata(file_path: str) -> Dict[str, List[str]]:
-    """Extract function metadata from Python file."""
+    """Extract function metadata from a source file."""
     metadata = {}
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read(), filename=file_path)
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                docstring = ast.get_docstring(node)
-                if docstring and "Metadata:" in docstring:
-                    lines = [line.strip() for line in docstring.splitlines()]
-                    name = node.name
-                    dependencies = []
-                    
-                    for line in lines:
-                        if "dependencies:" in line.lower():
-                            try:
-                                deps_str = line.split("dependencies:")[1].strip()
-                                if deps_str == "[]":
-                                    dependencies = []
-                                else:
-                                    deps_list = deps_str.strip("[]").split(",")
-                                    dependencies = [d.strip().strip("'\"") for d in deps_list if d.strip()]
-                            except Exception as e:
-                                print_flush(f"Warning: Could not parse dependencies for {node.name}: {e}")
-                    
-                    metadata[name] = dependencies
+        metadata = extract_metadata(file_path)
     except Exception as e:
         print_flush(f"Error extracting metadata from {file_path}: {e}")
     return metadata
@@ -51,59 +36,134 @@ def analyze_file(file_path: str) -> Dict[str, List[str]]:
     print_flush(f"\nAnalyzing {file_path}...")
     return extract_function_metadata(file_path)
 
+def analyze_directory(directory: str, config, metrics_collector=None) -> Mapping[str, List[str]]:
+    """Analyze all supported files under a directory as one project."""
+    print_flush(f"\nAnalyzing project {directory}...")
+    return analyze_project(directory, config, metrics_collector)
+
+def filter_to_neighborhood(metadata: Mapping[str, List[str]], seeds: List[str], args) -> Dict[str, List[str]]:
+    """Keep the selected functions and their --depth/--direction neighborhood."""
+    depth = None if args.depth < 0 else args.depth
+    selected = as_compact_graph(metadata).neighborhood(seeds, depth=depth, direction=args.direction)
+    return {func: metadata[func] for func in selected}
+
+def select_headless(metadata: Mapping[str, List[str]], args) -> List[str]:
+    """Functions chosen by the --select-* and --top-k flags."""
+    index = FunctionIndex.from_metadata(metadata, with_importance=args.top_k is not None)
+    return select_matching(index, args)
+
+def watch_directory(args, config, metrics) -> int:
+    """Render the project once, then keep the visualizations in sync with the sources."""
+    base_name = os.path.basename(os.path.normpath(os.path.abspath(args.directory)))
+
+    def select(metadata: Mapping[str, List[str]]) -> Dict[str, List[str]]:
+        return filter_to_neighborhood(metadata, select_headless(metadata, args), args)
+
+    watcher = ProjectWatcher(args.directory, config, DependencyVisualizer(config), base_name,
+                             select=select if has_selectors(args) else None,
+                             metrics_collector=metrics)
+    try:
+        print_flush(f"\nAnalyzing project {args.directory}...")
+        metadata = watcher.start()
+        print_flush(f"\nFound {len(metadata)} functions; watching {args.directory} for changes (Ctrl+C to stop)")
+        watcher.run()
+    except KeyboardInterrupt:
+        print_flush("\nStopped watching.")
+    finally:
+        watcher.close()
+    return 0
+
+def write_profile(profiler: Profiler, metrics) -> None:
+    """Print the stage report and save it, with any CPU/memory profiles, beside the metrics."""
+    profiler.stop()
+    profiler.dump(metrics.metrics_dir)
+    metrics.generate_performance_report()
+    print_flush(f"\nProfile:\n{profiler.summary()}")
+
+def run(args, config, metrics) -> int:
+    """Analyze, select and visualize according to ``args``; return the exit code."""
+    if args.watch:
+        return watch_directory(args, config, metrics)
+    
+    headless = has_selectors(args)
+    
+    # Analyze the project directory or the single file
+    if args.directory:
+        analyze = metrics.track_execution_time('analysis')(analyze_directory)
+        metadata = analyze(args.directory, config, metrics)
+        base_name = os.path.basename(os.path.normpath(os.path.abspath(args.directory)))
+        scope = "project"
+    else:
+        with get_profiler().span(PARSE_STAGE, args.file_path):
+            metadata = analyze_file(args.file_path)
+        metrics.record_metric('files_processed', 1)
+        base_name = os.path.splitext(os.path.basename(args.file_path))[0]
+        scope = "file"
+    metrics.record_metric('functions_found', len(metadata))
+    
+    if not metadata:
+        print_flush(f"\nNo functions with metadata found in the {scope}")
+        return 1
+    
+    print_flush(f"\nFound {len(metadata)} functions in the {scope}")
+    
+    # Select by the command-line patterns, or interactively unless --all is specified
+    if headless:
+        selected_functions = select_headless(metadata, args)
+        print_flush(f"\nSelected {len(selected_functions)} functions matching the command-line selectors")
+    elif not args.all:
+        selected_functions = select_functions(list(metadata.keys()))
+    if headless or not args.all:
+        if not selected_functions:
+            print_flush("\nNo functions selected for analysis")
+            return 1
+            
+        # Filter metadata to the selected functions and their neighborhood
+        print_flush("\nProcessing selected functions and their dependencies...")
+        metadata = filter_to_neighborhood(metadata, selected_functions, args)
+        
+        print_flush(f"Analyzing {len(metadata)} functions (including dependencies)")
+    
+    # Generate visualizations
+    visualizer = DependencyVisualizer(config)
+    
+    try:
+        print_flush("\nGenerating visualizations...")
+        visualizer.visualize_dependencies(metadata, base_name, metrics_collector=metrics)
+        print_flush(f"\nAnalysis complete! Check the visualizations in: {config.viz_directory}")
+        return 0
+    except Exception as viz_error:
+        print_flush(f"\nError during visualization: {str(viz_error)}")
+        return 1
+    finally:
+        visualizer.close()
+
 def main():
     try:
-        # Parse command line arguments and force interactive mode unless --all is specified
+        # Parse command line arguments; interactive mode unless --all or a selector is given
         args = parse_args()
-        if not args.all:
+        if not args.all and not has_selectors(args):
             args.interactive = True
         
         # Load configuration and setup components
         config = load_config(args.config)
         logger = setup_logger(config)
         setup_error_handlers(logger)
+        configure_retry_policies(config)
+        if args.formats:
+            config.output_formats = args.formats
+        metrics = MetricsCollector(config)
+        profiler = configure_profiler(args.profile, cpu=args.profile_cpu, memory=args.profile_memory)
         
-        # Analyze the file
-        metadata = analyze_file(args.file_path)
-        
-        if metadata:
-            print_flush(f"\nFound {len(metadata)} functions in the file")
-            
-            # Always show interactive selection unless --all is specified
-            if not args.all:
-                selected_functions = select_functions(list(metadata.keys()))
-                if not selected_functions:
-                    print_flush("\nNo functions selected for analysis")
-                    return 1
-                    
-                # Filter metadata to include only selected functions and their dependencies
-                filtered_metadata = {}
-                print_flush("\nProcessing selected functions and their dependencies...")
-                for func in selected_functions:
-                    filtered_metadata[func] = metadata[func]
-                    # Include functions that are dependencies
-                    for dep in metadata[func]:
-                        if dep in metadata:
-                            filtered_metadata[dep] = metadata[dep]
-                metadata = filtered_metadata
-                
-                print_flush(f"Analyzing {len(metadata)} functions (including dependencies)")
-            
-            # Generate visualizations
-            base_name = os.path.splitext(os.path.basename(args.file_path))[0]
-            visualizer = DependencyVisualizer(config)
-            
-            try:
-                print_flush("\nGenerating visualizations...")
-                visualizer.visualize_dependencies(metadata, base_name)
-                print_flush(f"\nAnalysis complete! Check the visualizations in: {config.viz_directory}")
-                return 0
-            except Exception as viz_error:
-                print_flush(f"\nError during visualization: {str(viz_error)}")
-                return 1
-        else:
-            print_flush("\nNo functions with metadata found in the file")
-            return 1
+        profiler.start()
+        start = time.perf_counter()
+        try:
+            return run(args, config, metrics)
+        finally:
+            metrics.record_metric('total_execution_time', time.perf_counter() - start)
+            metrics.export_metrics()
+            if profiler.enabled:
+                write_profile(profiler, metrics)
             
     except KeyboardInterrupt:
         print_flush("\nOperation cancelled by user.")
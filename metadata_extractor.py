@@ -0,0 +1,285 @@
+import ast
+import bisect
+import logging
+import mmap
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extraction output can change for identical input, so that
+# content-addressed cache entries written by older extractors are not reused.
+EXTRACTOR_VERSION = "2"
+
+METADATA_MARKER = "Metadata:"
+_MARKER_BYTES = METADATA_MARKER.encode("ascii")
+
+# File extensions handled by each entry of ``supported_languages``
+LANGUAGE_EXTENSIONS = {
+    "python": (".py",),
+    "java": (".java",),
+    "c": (".c", ".h"),
+    "cpp": (".cpp", ".cc", ".cxx", ".hpp", ".hh", ".hxx"),
+}
+
+# Extensions scanned as C-family sources rather than parsed as Python
+NATIVE_EXTENSIONS = frozenset(
+    LANGUAGE_EXTENSIONS["java"] + LANGUAGE_EXTENSIONS["c"] + LANGUAGE_EXTENSIONS["cpp"]
+)
+
+# Upper bounds that keep the native scanner's memory independent of file size
+MAX_COMMENT_LINES = 200
+MAX_SIGNATURE_LINES = 10
+
+# Identifier directly followed by "(" in a C-family signature
+_CALLABLE_NAME_RE = re.compile(r"([A-Za-z_~]\w*)\s*\(")
+# Explicit "name:" entry of a metadata block
+_METADATA_NAME_RE = re.compile(r"^name:\s*(\S+)")
+
+# Matches a plain (non-async) ``def`` at the start of a line, any indentation.
+_DEF_RE = re.compile(r"^([ \t]*)def[ \t]+\w+", re.MULTILINE)
+
+
+def parse_dependencies(docstring: str, func_name: str = "") -> List[str]:
+    """Parse the ``dependencies: [...]`` entry of a metadata docstring."""
+    dependencies: List[str] = []
+    for line in (line.strip() for line in docstring.splitlines()):
+        if "dependencies:" in line.lower():
+            try:
+                deps_str = line.split("dependencies:")[1].strip()
+                if deps_str == "[]":
+                    dependencies = []
+                else:
+                    deps_list = deps_str.strip("[]").split(",")
+                    dependencies = [d.strip().strip("'\"") for d in deps_list if d.strip()]
+            except Exception as e:
+                logger.warning(f"Could not parse dependencies for {func_name}: {e}")
+    return dependencies
+
+
+class NativeFunction(NamedTuple):
+    """A metadata comment block and the signature that follows it."""
+    name: str
+    dependencies: List[str]
+    signature: str
+    line: int
+
+
+def _read_if_marked(file_path: str) -> Optional[bytes]:
+    """Return the file bytes if they contain the metadata marker, else None."""
+    with open(file_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return None
+        with mm:
+            if mm.find(_MARKER_BYTES) == -1:
+                return None
+            return mm[:]
+
+
+def has_metadata_marker(file_path: str) -> bool:
+    """Cheap byte-level check for a ``Metadata:`` marker anywhere in the file."""
+    with open(file_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return False
+        with mm:
+            return mm.find(_MARKER_BYTES) != -1
+
+
+def _metadata_from_tree(tree: ast.AST) -> Dict[str, List[str]]:
+    """Collect metadata from every function definition in a parsed tree."""
+    metadata = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            docstring = ast.get_docstring(node)
+            if docstring and METADATA_MARKER in docstring:
+                metadata[node.name] = parse_dependencies(docstring, node.name)
+    return metadata
+
+
+def extract_metadata_full(file_path: str) -> Dict[str, List[str]]:
+    """Extract metadata by parsing and walking the whole module."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    return _metadata_from_tree(tree)
+
+
+def _find_docstring_end(source: str, start: int) -> int:
+    """Return the offset just past the first triple quote at or after ``start``."""
+    ends = [pos for pos in (source.find('"""', start), source.find("'''", start)) if pos != -1]
+    return min(ends) + 3 if ends else -1
+
+
+def extract_python_metadata(file_path: str) -> Dict[str, List[str]]:
+    """Extract metadata, skipping unmarked files and parsing only marked ``def`` spans.
+
+    Files without the marker are rejected after a single mmap scan. For marked
+    files each marker is mapped back to the closest preceding ``def`` and only
+    the span from that ``def`` to the end of its docstring is compiled. If a
+    span cannot be compiled on its own the whole module is parsed instead.
+    """
+    data = _read_if_marked(file_path)
+    if data is None:
+        return {}
+
+    source = data.decode("utf-8")
+    def_matches = list(_DEF_RE.finditer(source))
+    def_starts = [m.start() for m in def_matches]
+
+    metadata = {}
+    seen_defs = set()
+    pos = source.find(METADATA_MARKER)
+    while pos != -1:
+        index = bisect.bisect_right(def_starts, pos) - 1
+        end = _find_docstring_end(source, pos + len(METADATA_MARKER))
+        if index >= 0 and index not in seen_defs and end != -1:
+            seen_defs.add(index)
+            match = def_matches[index]
+            span = source[match.start() + len(match.group(1)):end]
+            try:
+                node = ast.parse(span).body[0]
+            except (SyntaxError, IndexError):
+                logger.debug(f"Falling back to full parse for {file_path}")
+                return _metadata_from_tree(ast.parse(source, filename=file_path))
+            docstring = ast.get_docstring(node) if isinstance(node, ast.FunctionDef) else None
+            if docstring and METADATA_MARKER in docstring:
+                metadata[node.name] = parse_dependencies(docstring, node.name)
+        pos = source.find(METADATA_MARKER, pos + len(METADATA_MARKER))
+    return metadata
+
+
+def _clean_comment_text(text: str) -> str:
+    """Strip comment delimiters and decoration from one line of comment text."""
+    text = text.strip()
+    if text.startswith("//"):
+        text = text.lstrip("/")
+    elif text.startswith("/*"):
+        text = text[2:]
+    return text.strip().lstrip("*").strip()
+
+
+def _native_function(block: List[str], signature: List[str], line: int) -> Optional[NativeFunction]:
+    """Build a function record from a metadata comment block and its signature."""
+    signature_text = " ".join(" ".join(signature).split())
+    name = None
+    for comment_line in block:
+        match = _METADATA_NAME_RE.match(comment_line)
+        if match:
+            name = match.group(1)
+    if name is None:
+        match = _CALLABLE_NAME_RE.search(signature_text)
+        if not match:
+            return None
+        name = match.group(1)
+    return NativeFunction(name, parse_dependencies("\n".join(block), name), signature_text, line)
+
+
+def scan_native_functions(file_path: str) -> Iterator[NativeFunction]:
+    """Stream metadata blocks and their signatures out of a Java/C/C++ file.
+
+    Both ``/* ... */`` blocks and runs of ``//`` lines that begin a line are
+    recognised. The file is read once, line by line, and the comment and
+    signature buffers are capped, so memory does not grow with file size.
+    """
+    block: List[str] = []       # comment block being read
+    line_run: List[str] = []    # consecutive ``//`` comment lines
+    in_block = False
+    pending: Optional[List[str]] = None  # metadata block awaiting a signature
+    signature: List[str] = []
+    signature_line = 0
+
+    def has_marker(lines: List[str]) -> bool:
+        return any(METADATA_MARKER in l for l in lines)
+
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        for lineno, raw in enumerate(f, 1):
+            stripped = raw.strip()
+
+            if in_block:
+                end = stripped.find("*/")
+                if len(block) < MAX_COMMENT_LINES:
+                    block.append(_clean_comment_text(stripped if end == -1 else stripped[:end]))
+                if end == -1:
+                    continue
+                in_block = False
+                if has_marker(block):
+                    pending, signature = block, []
+                block = []
+                stripped = stripped[end + 2:].strip()
+                if not stripped:
+                    continue
+            elif stripped.startswith("//"):
+                if len(line_run) < MAX_COMMENT_LINES:
+                    line_run.append(_clean_comment_text(stripped))
+                continue
+
+            if line_run:
+                if has_marker(line_run):
+                    pending, signature = line_run, []
+                line_run = []
+
+            if stripped.startswith("/*"):
+                end = stripped.find("*/", 2)
+                if end == -1:
+                    in_block = True
+                    block = [_clean_comment_text(stripped)]
+                    continue
+                comment = [_clean_comment_text(stripped[:end])]
+                if has_marker(comment):
+                    pending, signature = comment, []
+                stripped = stripped[end + 2:].strip()
+
+            # Skip blank lines and standalone annotations between comment and code
+            if pending is None or not stripped or stripped.startswith("@"):
+                continue
+
+            if not signature:
+                signature_line = lineno
+            signature.append(stripped)
+            cuts = [pos for pos in (stripped.find("{"), stripped.find(";")) if pos != -1]
+            if cuts or len(signature) >= MAX_SIGNATURE_LINES:
+                if cuts:
+                    signature[-1] = stripped[:min(cuts)]
+                function = _native_function(pending, signature, signature_line)
+                if function is not None:
+                    yield function
+                pending, signature = None, []
+
+    if pending is not None and signature:
+        function = _native_function(pending, signature, signature_line)
+        if function is not None:
+            yield function
+
+
+def extract_native_metadata(file_path: str) -> Dict[str, List[str]]:
+    """Extract function metadata from a Java, C or C++ source file."""
+    if not has_metadata_marker(file_path):
+        return {}
+    return {func.name: func.dependencies for func in scan_native_functions(file_path)}
+
+
+def supported_extensions(languages: Iterable[str]) -> Set[str]:
+    """Return the file extensions extractable for the given languages."""
+    return {ext for lang in languages for ext in LANGUAGE_EXTENSIONS.get(lang.lower(), ())}
+
+
+def is_supported_file(file_path: str, languages: Iterable[str]) -> bool:
+    """Check whether a file has an extension the extractors understand."""
+    return os.path.splitext(file_path)[1].lower() in supported_extensions(languages)
+
+
+def scanner_kind(file_path: str) -> str:
+    """Name of the scanner ``extract_metadata`` uses for a file: "native" or "python"."""
+    return "native" if os.path.splitext(file_path)[1].lower() in NATIVE_EXTENSIONS else "python"
+
+
+def extract_metadata(file_path: str) -> Dict[str, List[str]]:
+    """Extract function metadata from a source file, dispatching on its extension."""
+    if scanner_kind(file_path) == "native":
+        return extract_native_metadata(file_path)
+    return extract_python_metadata(file_path)
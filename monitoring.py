@@ -34,10 +34,10 @@ class MetricsCollector:
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_time = time.perf_counter()
                 try:
                     result = func(*args, **kwargs)
-                    execution_time = time.time() - start_time
+                    execution_time = time.perf_counter() - start_time
                     self.record_metric(f"{func_name}_execution_time", execution_time)
                     return result
                 except Exception as e:
@@ -84,7 +84,7 @@ class MetricsCollector:
             execution_time=sum(v[1] for v in self._metrics.get('total_execution_time', [])),
             memory_usage=self.get_system_metrics()['memory_usage'],
             cpu_usage=self.get_system_metrics()['cpu_usage'],
-            file_count=len(self._metrics.get('files_processed', [])),
+            file_count=sum(v[1] for v in self._metrics.get('files_processed', [])),
             total_functions=sum(v[1] for v in self._metrics.get('functions_found', [])),
             cache_hits=sum(v[1] for v in self._metrics.get('cache_hits', [])),
             cache_misses=sum(v[1] for v in self._metrics.get('cache_misses', [])),
@@ -1,38 +1,76 @@
-import concurrent.futures
-from typing import List, Dict, Tuple, Any
-import os
+from typing import Iterable, Iterator, List, Dict, Tuple, Any, Sized
 from logger import setup_logger
+from file_discovery import discover_files
+from analysis_pipeline import AnalysisPipeline
+from profiler import PARSE_STAGE, get_profiler
 
 class ParallelAnalyzer:
+    BACKENDS = ('thread', 'process')
+
     def __init__(self, config, cache_manager):
         self.config = config
         self.cache_manager = cache_manager
         self.logger = setup_logger(config)
         self.max_workers = config.max_workers
+        self.backend = config.parallel_backend
+        self.chunk_size = config.chunk_size
+        self.readers = getattr(config, 'pipeline_readers', 2)
+        self.queue_size = getattr(config, 'pipeline_queue_size', 256)
+        # Files handed in, and those that failed to parse, across every call
+        self.files = 0
+        self.errors = 0
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown parallel_backend '{self.backend}', expected one of {self.BACKENDS}")
 
-    def analyze_files_parallel(self, file_list: List[str], analyze_func) -> List[Tuple[str, Dict[str, Any]]]:
-        """Analyze multiple files in parallel."""
-        results = []
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all files for analysis
-            future_to_file = {
-                executor.submit(self._analyze_single_file, file_path, analyze_func): file_path
-                for file_path in file_list
-            }
-            
-            # Process completed analyses as they finish
-            for future in concurrent.futures.as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    metadata = future.result()
-                    if metadata:
-                        results.append((file_path, metadata))
-                        self.logger.info(f"Successfully analyzed {file_path}")
-                except Exception as e:
-                    self.logger.error(f"Error analyzing {file_path}: {str(e)}")
-        
-        return results
+    def analyze_files_parallel(self, file_list: Iterable[str], analyze_func) -> List[Tuple[str, Dict[str, Any]]]:
+        """Analyze multiple files in parallel using the configured backend.
+
+        ``file_list`` may be a generator such as ``iter_file_batch``; work is
+        handed out while it is still producing paths.
+        """
+        return list(self.iter_analyzed(file_list, analyze_func))
+
+    def iter_analyzed(self, file_list: Iterable[str], analyze_func) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (path, metadata) for each file with metadata, as it completes.
+
+        Files flow through an AnalysisPipeline with bounded queues, so memory
+        stays flat however many files ``file_list`` produces. With the
+        process backend ``analyze_func`` must be picklable, i.e. a
+        module-level function.
+        """
+        # A pool costs more to start than a single file takes to parse
+        few_files = isinstance(file_list, Sized) and len(file_list) <= 1
+        if not self.config.parallel_processing or self.max_workers <= 1 or few_files:
+            yield from self._analyze_serial(file_list, analyze_func)
+            return
+
+        pipeline = AnalysisPipeline(
+            self.cache_manager, analyze_func,
+            readers=self.readers,
+            parsers=self.max_workers,
+            queue_size=self.queue_size,
+            backend=self.backend,
+            chunk_size=self.chunk_size,
+            cache_config=self.config if self.backend == 'process' else None
+        )
+        yield from pipeline.run(file_list)
+        stats = pipeline.stats
+        self.files += stats['discovered']
+        self.errors += stats['errors']
+        self.logger.info(f"Analyzed {stats['discovered']} files on {self.max_workers} {self.backend} workers: "
+                         f"{stats['cache_hits']} from cache, {stats['parsed']} parsed, {stats['errors']} errors")
+
+    def _analyze_serial(self, file_list: Iterable[str], analyze_func) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Analyze files one after another in the calling thread."""
+        for file_path in file_list:
+            self.files += 1
+            try:
+                metadata = self._analyze_single_file(file_path, analyze_func)
+                if metadata:
+                    yield file_path, metadata
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"Error analyzing {file_path}: {str(e)}")
 
     def _analyze_single_file(self, file_path: str, analyze_func) -> Dict[str, Any]:
         """Analyze a single file with caching."""
@@ -44,7 +82,8 @@ class ParallelAnalyzer:
                 return cached_result
 
             # Analyze file
-            result = analyze_func(file_path)
+            with get_profiler().span(PARSE_STAGE, file_path):
+                result = analyze_func(file_path)
             
             # Cache the result
             if result:
@@ -55,23 +94,10 @@ class ParallelAnalyzer:
             self.logger.error(f"Error in _analyze_single_file for {file_path}: {str(e)}")
             raise
 
+    def iter_file_batch(self, directory: str) -> Iterator[str]:
+        """Yield supported files under ``directory`` as discovery finds them."""
+        return discover_files(directory, self.config)
+
     def get_file_batch(self, directory: str) -> List[str]:
         """Get a list of files to analyze, respecting size limits."""
-        files_to_process = []
-        max_size = self.config.max_file_size_mb * 1024 * 1024  # Convert to bytes
-        
-        for root, _, files in os.walk(directory):
-            if any(excluded in root for excluded in self.config.excluded_directories):
-                continue
-                
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    if os.path.getsize(file_path) <= max_size:
-                        files_to_process.append(file_path)
-                    else:
-                        self.logger.warning(f"Skipping {file_path}: exceeds size limit")
-                except OSError as e:
-                    self.logger.error(f"Error checking {file_path}: {str(e)}")
-        
-        return files_to_process
\ No newline at end of file
+        return list(self.iter_file_batch(directory))
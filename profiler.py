@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stage whose labelled spans are ranked in the slowest-files report
+PARSE_STAGE = 'parse'
+
+class Profiler:
+    """Opt-in recorder of ``perf_counter_ns`` spans per pipeline stage.
+
+    Disabled profilers make ``span`` a no-op, so instrumented code costs one
+    attribute check when profiling is off. Spans may be recorded from any
+    thread. ``cpu`` adds a cProfile run and ``memory`` a tracemalloc
+    snapshot; both are written by ``dump`` next to the metrics JSON.
+
+    cProfile only sees the thread that enables it, so every thread started
+    after ``start`` gets its own profile and ``dump`` merges them all.
+    Worker processes of the process backend are not profiled.
+    """
+
+    def __init__(self, enabled: bool = False, cpu: bool = False, memory: bool = False, top: int = 10):
+        self.enabled = enabled or cpu or memory
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self._spans: Dict[str, List[int]] = {}
+        self._labelled: Dict[str, List[Tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._snapshot = None
+        self._started_ns = 0
+        self._elapsed_ns = 0
+
+    def start(self) -> None:
+        """Start the wall clock and the optional CPU and allocation profilers."""
+        if not self.enabled:
+            return
+        self._started_ns = time.perf_counter_ns()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        if self.cpu:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+            threading.setprofile(self._profile_thread)
+
+    def _profile_thread(self, frame, event, arg) -> None:
+        """Runs once in each new thread and replaces itself with a cProfile."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from one cProfile and allows
+            # only one at a time, so the main profile already covers this thread
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    def stop(self) -> None:
+        if not self.enabled or not self._started_ns:
+            return
+        if self._cprofile is not None:
+            threading.setprofile(None)
+            self._cprofile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        self._elapsed_ns = time.perf_counter_ns() - self._started_ns
+
+    def record(self, stage: str, duration_ns: int, label: Optional[str] = None) -> None:
+        """Add one span; ``label`` names the file or item it covered."""
+        with self._lock:
+            self._spans.setdefault(stage, []).append(duration_ns)
+            if label is not None:
+                self._labelled.setdefault(stage, []).append((duration_ns, label))
+
+    @contextmanager
+    def span(self, stage: str, label: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as one span of ``stage``."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start, label)
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and p50/p95/p99/max latency per stage, in milliseconds."""
+        with self._lock:
+            spans = {stage: np.array(values, dtype=np.int64) for stage, values in self._spans.items()}
+        stats = {}
+        for stage, values in spans.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) / 1e6
+            stats[stage] = {
+                'count': int(len(values)),
+                'total_ms': float(values.sum()) / 1e6,
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(values.max()) / 1e6
+            }
+        return stats
+
+    def slowest(self, stage: str = PARSE_STAGE, count: Optional[int] = None) -> List[Tuple[str, float]]:
+        """The ``count`` slowest labelled spans of ``stage`` as (label, ms)."""
+        with self._lock:
+            spans = list(self._labelled.get(stage, ()))
+        spans.sort(reverse=True)
+        return [(label, duration / 1e6) for duration, label in spans[:count or self.top]]
+
+    def report(self) -> Dict[str, Any]:
+        stats = self.stage_stats()
+        slowest_stage = max(stats, key=lambda stage: stats[stage]['total_ms']) if stats else None
+        return {
+            'wall_time_ms': self._elapsed_ns / 1e6,
+            'stages': stats,
+            'slowest_stage': slowest_stage,
+            'slowest_files': [{'file': label, 'ms': ms} for label, ms in self.slowest()]
+        }
+
+    def summary(self) -> str:
+        """Human-readable report of the stages and the slowest files."""
+        report = self.report()
+        lines = [f"{'stage':<22}{'count':>8}{'total ms':>12}{'p50':>10}{'p95':>10}{'p99':>10}"]
+        for stage, stats in sorted(report['stages'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{stage:<22}{stats['count']:>8}{stats['total_ms']:>12.1f}"
+                         f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+        if report['slowest_stage']:
+            lines.append(f"Slowest stage: {report['slowest_stage']}")
+        if report['slowest_files']:
+            lines.append("Slowest files:")
+            lines.extend(f"  {entry['ms']:10.2f} ms  {entry['file']}" for entry in report['slowest_files'])
+        return '\n'.join(lines)
+
+    def dump(self, directory: str) -> List[str]:
+        """Write the span report and any CPU/allocation profiles; return the paths."""
+        if not self.enabled:
+            return []
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        paths = []
+
+        report_path = os.path.join(directory, f'profile_{timestamp}.json')
+        with open(report_path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        paths.append(report_path)
+
+        if self._cprofile is not None:
+            with self._lock:
+                thread_profiles = list(self._thread_profiles)
+            stats = pstats.Stats(self._cprofile)
+            for profile in thread_profiles:
+                # Threads still running when ``stop`` was called keep profiling until now
+                stats.add(profile)
+            stats_path = os.path.join(directory, f'cpu_profile_{timestamp}.prof')
+            stats.dump_stats(stats_path)
+            text_path = os.path.join(directory, f'cpu_profile_{timestamp}.txt')
+            with open(text_path, 'w') as f:
+                f.write(f"CPU profile merged from the main thread and {len(thread_profiles)} worker threads\n")
+                stats.stream = f
+                stats.sort_stats('cumulative').print_stats(50)
+            paths.extend([stats_path, text_path])
+
+        if self._snapshot is not None:
+            memory_path = os.path.join(directory, f'allocations_{timestamp}.txt')
+            with open(memory_path, 'w') as f:
+                for stat in self._snapshot.statistics('lineno')[:50]:
+                    f.write(f"{stat}\n")
+            paths.append(memory_path)
+
+        logger.info(f"Profile written to {', '.join(paths)}")
+        return paths
+
+# Process-wide profiler; disabled unless configure_profiler enables it
+_profiler = Profiler()
+
+def configure_profiler(enabled: bool = False, cpu: bool = False, memory: bool = False,
+                       top: int = 10) -> Profiler:
+    """Replace the process-wide profiler; instrumented modules pick it up via get_profiler."""
+    global _profiler
+    _profiler = Profiler(enabled=enabled, cpu=cpu, memory=memory, top=top)
+    return _profiler
+
+def get_profiler() -> Profiler:
+    return _profiler
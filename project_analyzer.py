@@ -0,0 +1,74 @@
+import os
+import logging
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+from cache_manager import CacheManager
+from parallel_analyzer import ParallelAnalyzer
+from metadata_extractor import extract_metadata
+from graph_core import CompactGraphBuilder, GraphMapping, QUALIFIER, qualify_name, split_qualified_name
+
+logger = logging.getLogger(__name__)
+
+def file_label(file_path: str, root: str) -> str:
+    """Return the project-relative, forward-slash label for a file."""
+    return os.path.relpath(file_path, root).replace(os.sep, "/")
+
+def merge_project_metadata(results: List[Tuple[str, Dict[str, List[str]]]],
+                           root: str) -> GraphMapping:
+    """Merge per-file metadata into one graph keyed by file-qualified names.
+
+    Dependencies resolve to a function in the same file first, then to the
+    only function of that name elsewhere in the project. Ambiguous or unknown
+    dependencies are kept as bare names so they still count towards out-degree
+    but produce no edge. The merged graph is built straight into a
+    CompactGraph and returned behind its mapping adapter.
+    """
+    labelled = sorted((file_label(path, root), metadata) for path, metadata in results)
+
+    definitions = defaultdict(list)
+    qualified = []
+    for label, metadata in labelled:
+        for func in metadata:
+            name = qualify_name(label, func)
+            definitions[func].append(name)
+            qualified.append(name)
+
+    builder = CompactGraphBuilder(qualified)
+    for label, metadata in labelled:
+        for func, deps in metadata.items():
+            resolved = []
+            for dep in deps:
+                if dep in metadata:
+                    resolved.append(qualify_name(label, dep))
+                elif len(definitions.get(dep, ())) == 1:
+                    resolved.append(definitions[dep][0])
+                else:
+                    if dep in definitions:
+                        logger.debug(f"Ambiguous dependency {dep} in {label}: {definitions[dep]}")
+                    resolved.append(dep)
+            builder.add(qualify_name(label, func), resolved)
+    return GraphMapping(builder.build())
+
+def discover_source_files(analyzer: ParallelAnalyzer, directory: str) -> Iterator[str]:
+    """Yield files under ``directory`` that an extractor can handle."""
+    return analyzer.iter_file_batch(directory)
+
+def analyze_project(directory: str, config, metrics_collector=None) -> GraphMapping:
+    """Analyze every supported file under ``directory`` into a project-wide graph."""
+    root = os.path.abspath(directory)
+    cache_manager = CacheManager(config)
+    analyzer = ParallelAnalyzer(config, cache_manager)
+
+    try:
+        # Discovery streams into the analyzer, so parsing starts with the first files found
+        results = analyzer.analyze_files_parallel(discover_source_files(analyzer, root), extract_metadata)
+    finally:
+        cache_manager.close()
+    logger.info(f"Found function metadata in {len(results)} source files under {root}")
+    if metrics_collector is not None:
+        cache_manager.report_metrics(metrics_collector)
+        # Every analyzed file, including those without function metadata
+        metrics_collector.record_metric('files_processed', analyzer.files)
+        if analyzer.errors:
+            metrics_collector.record_metric('total_errors', analyzer.errors)
+    return merge_project_metadata(results, root)
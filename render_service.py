@@ -0,0 +1,119 @@
+import os
+import logging
+import threading
+import subprocess
+import concurrent.futures
+from typing import Callable, Dict, List, Optional
+import graphviz
+
+logger = logging.getLogger(__name__)
+
+def _split_after(marker: bytes, extra: int = 0, trailing: bytes = b'') -> Callable[[bytes], List[bytes]]:
+    """Build a splitter that cuts a stream after each ``marker``.
+
+    ``extra`` bytes after the marker belong to the document, as does an
+    optional ``trailing`` line break.
+    """
+    def split(data: bytes) -> List[bytes]:
+        parts = []
+        start = 0
+        while True:
+            index = data.find(marker, start)
+            if index < 0:
+                return parts
+            end = index + len(marker) + extra
+            if trailing and data.startswith(trailing, end):
+                end += len(trailing)
+            parts.append(data[start:end])
+            start = end
+    return split
+
+# Formats whose documents can be told apart when dot writes several of them
+# to one stream. PNG ends with an empty IEND chunk and its 4-byte CRC.
+SPLITTERS: Dict[str, Callable[[bytes], List[bytes]]] = {
+    'png': _split_after(b'\x00\x00\x00\x00IEND', extra=4),
+    'svg': _split_after(b'</svg>', trailing=b'\n'),
+    'plain': _split_after(b'\nstop', trailing=b'\n'),
+    'plain-ext': _split_after(b'\nstop', trailing=b'\n'),
+}
+
+class RenderService:
+    """Renders DOT source through Graphviz without temporary files.
+
+    Sources are piped to ``dot`` on stdin and the output is read back from
+    stdout. ``render_many`` packs several graphs into one ``dot`` run when the
+    output format can be split again (see SPLITTERS), and runs at most
+    ``max_processes`` Graphviz processes at a time.
+    """
+
+    def __init__(self, max_processes: Optional[int] = None, batch_size: int = 16,
+                 timeout: Optional[float] = None):
+        self.max_processes = max(1, max_processes or os.cpu_count() or 4)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.invocations = 0
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _run(self, source: str, fmt: str, engine: str) -> bytes:
+        """Run one Graphviz process over ``source`` and return its stdout."""
+        cmd = [engine, f'-T{fmt}']
+        with self._lock:
+            self.invocations += 1
+        try:
+            proc = subprocess.run(cmd, input=source.encode('utf-8'), capture_output=True,
+                                  timeout=self.timeout)
+        except FileNotFoundError as e:
+            raise graphviz.ExecutableNotFound(cmd) from e
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=proc.stdout,
+                                                stderr=proc.stderr)
+        return proc.stdout
+
+    def render(self, source: str, fmt: str, engine: str = 'dot') -> bytes:
+        """Render a single graph and return the output bytes."""
+        return self._run(source, fmt, engine)
+
+    def _render_batch(self, sources: List[str], fmt: str, engine: str) -> List[bytes]:
+        """Render ``sources`` in one process, or one by one if that is not possible."""
+        splitter = SPLITTERS.get(fmt)
+        if splitter is not None and len(sources) > 1:
+            try:
+                outputs = splitter(self._run('\n'.join(sources), fmt, engine))
+                if len(outputs) == len(sources):
+                    return outputs
+                logger.debug(f"Batched {fmt} output had {len(outputs)} documents for "
+                             f"{len(sources)} graphs; rendering individually")
+            except subprocess.CalledProcessError as e:
+                # One bad graph fails the whole batch; find it by rendering each
+                logger.debug(f"Batched render failed ({e.returncode}); rendering individually")
+        return [self._run(source, fmt, engine) for source in sources]
+
+    def _pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_processes, thread_name_prefix='graphviz')
+            return self._executor
+
+    def render_many(self, sources: List[str], fmt: str, engine: str = 'dot') -> List[bytes]:
+        """Render several graphs, returning outputs in the order of ``sources``."""
+        if not sources:
+            return []
+        if len(sources) == 1:
+            return [self.render(sources[0], fmt, engine)]
+
+        # Spread the graphs so every worker gets a batch before any batch grows
+        per_batch = min(self.batch_size, -(-len(sources) // self.max_processes))
+        if fmt not in SPLITTERS:
+            per_batch = 1
+        batches = [sources[i:i + per_batch] for i in range(0, len(sources), per_batch)]
+        futures = [self._pool().submit(self._render_batch, batch, fmt, engine) for batch in batches]
+        return [output for future in futures for output in future.result()]
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
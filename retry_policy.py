@@ -0,0 +1,188 @@
+import errno
+import time
+import random
+import logging
+import threading
+import subprocess
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Any
+import graphviz
+
+logger = logging.getLogger(__name__)
+
+# Error kinds
+TRANSIENT = "transient"      # may succeed if tried again
+UNAVAILABLE = "unavailable"  # the backend itself is missing or broken
+INVALID = "invalid"          # the input is bad; retrying cannot help
+
+# OS errors that describe a temporary condition of the system
+TRANSIENT_ERRNOS = {errno.EAGAIN, errno.EBUSY, errno.EINTR, errno.EMFILE, errno.ENFILE,
+                    errno.ENOMEM, errno.ETIMEDOUT, errno.ECONNRESET, errno.ECONNREFUSED}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an operation whose circuit breaker is open."""
+    pass
+
+def _exception_chain(exc: BaseException):
+    """Yield ``exc`` and the errors it was raised from, outermost first."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or (None if exc.__suppress_context__ else exc.__context__)
+
+def _classify_one(exc: BaseException) -> Optional[str]:
+    """Classify a single exception, or return None if its type says nothing."""
+    if isinstance(exc, (CircuitOpenError, graphviz.ExecutableNotFound)):
+        return UNAVAILABLE
+    if isinstance(exc, (subprocess.TimeoutExpired, TimeoutError, ConnectionError,
+                        BlockingIOError, InterruptedError)):
+        return TRANSIENT
+    if isinstance(exc, subprocess.CalledProcessError):
+        # Killed by a signal (e.g. OOM) is worth a retry; an exit status
+        # means the tool rejected its input
+        return TRANSIENT if exc.returncode < 0 else INVALID
+    if isinstance(exc, OSError):
+        return TRANSIENT if exc.errno in TRANSIENT_ERRNOS else INVALID
+    if isinstance(exc, (ValueError, TypeError, LookupError, AttributeError,
+                        NotImplementedError, SyntaxError, graphviz.RequiredArgumentError)):
+        return INVALID
+    return None
+
+def classify_error(exc: BaseException) -> str:
+    """Classify an error as TRANSIENT, UNAVAILABLE or INVALID.
+
+    Generic wrappers such as VisualizationError are classified by the first
+    recognised error they were raised from. Anything unrecognised counts as
+    transient.
+    """
+    for link in _exception_chain(exc):
+        kind = _classify_one(link)
+        if kind is not None:
+            return kind
+    return TRANSIENT
+
+def _describe(exc: BaseException) -> BaseException:
+    """Return the most specific error in the chain for log messages."""
+    for link in _exception_chain(exc):
+        if _classify_one(link) is not None:
+            return link
+    return exc
+
+def is_transient(exc: BaseException) -> bool:
+    """Return whether ``exc`` is worth retrying."""
+    return classify_error(exc) == TRANSIENT
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry and backoff settings for one operation."""
+    max_attempts: int = 3
+    initial_delay: float = 0.5
+    max_delay: float = 4.0
+    multiplier: float = 2.0
+    jitter: float = 0.1
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number ``attempt`` (1-based)."""
+        base = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return base + random.uniform(0, self.jitter * base)
+
+class CircuitBreaker:
+    """Stops calling an operation after it keeps failing.
+
+    The breaker opens after ``failure_threshold`` consecutive backend
+    failures, or immediately when the backend is unavailable. While open,
+    calls fail with CircuitOpenError. After ``reset_timeout`` seconds one
+    trial call is let through; success closes the breaker again.
+    Invalid-input errors are the caller's problem and never open it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[BaseException] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the operation should not be attempted."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise CircuitOpenError(f"{self.name} is unavailable after repeated failures: {self.last_error}")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        kind = classify_error(exc)
+        with self._lock:
+            self._trial_in_flight = False
+            if kind == INVALID:
+                return
+            self.failures += 1
+            self.last_error = _describe(exc)
+            if kind == UNAVAILABLE or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Circuit breaker for {self.name} opened: {self.last_error}")
+                self.opened_at = time.monotonic()
+
+# Per-operation settings, replaced by configure_retry_policies()
+DEFAULT_POLICY = RetryPolicy()
+_policies: Dict[str, RetryPolicy] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_breaker_settings: Dict[str, Any] = {"failure_threshold": 5, "reset_timeout": 30.0}
+_registry_lock = threading.Lock()
+
+def configure_retry_policies(config) -> None:
+    """Load per-operation policies and breaker settings from the config.
+
+    ``config.retry_policies`` maps operation names to RetryPolicy fields;
+    the ``default`` entry applies to operations without their own.
+    """
+    global DEFAULT_POLICY
+    settings = getattr(config, 'retry_policies', None) or {}
+    with _registry_lock:
+        DEFAULT_POLICY = replace(RetryPolicy(), **settings.get('default', {}))
+        _policies.clear()
+        for operation, values in settings.items():
+            if operation != 'default':
+                _policies[operation] = replace(DEFAULT_POLICY, **values)
+        _breaker_settings["failure_threshold"] = getattr(config, 'circuit_breaker_threshold', 5)
+        _breaker_settings["reset_timeout"] = getattr(config, 'circuit_breaker_reset_seconds', 30.0)
+        _breakers.clear()
+
+def get_policy(operation: str) -> RetryPolicy:
+    """Return the retry policy for ``operation``."""
+    with _registry_lock:
+        return _policies.get(operation, DEFAULT_POLICY)
+
+def get_circuit_breaker(operation: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for ``operation``."""
+    with _registry_lock:
+        breaker = _breakers.get(operation)
+        if breaker is None:
+            breaker = _breakers[operation] = CircuitBreaker(operation, **_breaker_settings)
+        return breaker
@@ -0,0 +1,128 @@
+"""Tests for the bounded, staged analysis pipeline."""
+import os
+import sys
+import threading
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from analysis_pipeline import AnalysisPipeline
+from cache_manager import CacheManager
+from config import load_config
+
+def analyze(path):
+    """Module-level so the process backend can pickle it."""
+    if path.endswith('bad'):
+        raise ValueError('cannot parse')
+    if path.endswith('empty'):
+        return {}
+    if path.endswith('unpicklable'):
+        # Fails the whole chunk when the worker sends its results back
+        return {'func': [lambda: None]}
+    return {f"{path}_func": []}
+
+class RecordingCache:
+    """Parent-side cache of the process backend; only receives worker stats."""
+    def __init__(self):
+        self.writes = []
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def cache_metadata_many(self, items):
+        self.writes.extend(items)
+
+    def merge_stats(self, stats):
+        for name, count in stats.items():
+            self.stats[name] += count
+
+class DictCache:
+    """Minimal CacheManager stand-in."""
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.lock = threading.Lock()
+
+    def get_cached_metadata_many(self, paths):
+        with self.lock:
+            return {path: self.entries[path] for path in paths if path in self.entries}
+
+    def cache_metadata_many(self, items):
+        with self.lock:
+            self.entries.update(items)
+
+def test_pipeline_analyzes_caches_and_skips_failures():
+    """Test that hits skip parsing, fresh results are cached and errors are isolated."""
+    cache = DictCache({'f0': {'cached': []}})
+    pipeline = AnalysisPipeline(cache, analyze, parsers=2, queue_size=4, chunk_size=3)
+    files = [f"f{i}" for i in range(20)] + ['x.bad', 'x.empty']
+    results = dict(pipeline.run(iter(files)))
+
+    assert results['f0'] == {'cached': []}
+    assert results['f7'] == {'f7_func': []}
+    assert len(results) == 20
+    assert cache.entries['f7'] == {'f7_func': []}
+    assert pipeline.stats == {'discovered': 22, 'cache_hits': 1, 'parsed': 20, 'errors': 1, 'cache_writes': 19}
+
+def test_process_workers_look_up_and_write_the_cache(temp_workspace):
+    """Test that process workers use their own CacheManager and the parent only merges."""
+    config = load_config(os.path.join(temp_workspace, 'missing.yaml'))
+    config.cache_directory = os.path.join(temp_workspace, '.cache')
+    files = []
+    for name in [f"f{i}" for i in range(20)] + ['x.bad', 'x.empty']:
+        files.append(os.path.join(temp_workspace, name))
+        with open(files[-1], 'w') as f:
+            f.write(name)
+    warm = CacheManager(config)
+    warm.cache_metadata(files[0], {'cached': []})
+    warm.close()
+
+    parent = RecordingCache()
+    pipeline = AnalysisPipeline(parent, analyze, parsers=2, queue_size=4, backend='process',
+                                chunk_size=3, cache_config=config)
+    results = dict(pipeline.run(iter(files)))
+
+    assert results[files[0]] == {'cached': []}
+    assert results[files[7]] == {f"{files[7]}_func": []}
+    assert len(results) == 20
+    assert pipeline.stats == {'discovered': 22, 'cache_hits': 1, 'parsed': 20, 'errors': 1, 'cache_writes': 19}
+    assert parent.writes == [] and parent.stats == {'hits': 1, 'misses': 21}
+
+    # The workers' writes were committed before the run returned
+    cached = CacheManager(config)
+    assert cached.get_cached_metadata(files[7]) == {f"{files[7]}_func": []}
+    cached.close()
+
+def test_failed_chunk_counts_its_files_as_errors():
+    """Test that a chunk that cannot come back from a worker does not stop the run."""
+    pipeline = AnalysisPipeline(DictCache(), analyze, parsers=2, backend='process', chunk_size=3)
+    files = [f"f{i}" for i in range(20)] + ['x.unpicklable']
+    results = dict(pipeline.run(iter(files)))
+
+    assert 'x.unpicklable' not in results
+    assert 1 <= pipeline.stats['errors'] <= 3
+    assert len(results) + pipeline.stats['errors'] == 21
+    assert pipeline.stats['parsed'] == len(results)
+
+def test_backpressure_bounds_discovery():
+    """Test that a slow consumer stops discovery from running ahead."""
+    produced = []
+    def files():
+        for i in range(10000):
+            produced.append(i)
+            yield f"f{i}"
+
+    pipeline = AnalysisPipeline(DictCache(), analyze, readers=1, parsers=1, queue_size=8)
+    stream = pipeline.run(files())
+    next(stream)
+    threading.Event().wait(0.3)
+    # Only a few queues' worth of paths may be in flight
+    assert len(produced) < 100
+    stream.close()
+    assert len(produced) < 10000
+
+def test_failing_discovery_is_raised():
+    """Test that an error in a stage reaches the consumer."""
+    def files():
+        yield 'f1'
+        raise OSError('disk gone')
+
+    with pytest.raises(OSError, match='disk gone'):
+        list(AnalysisPipeline(DictCache(), analyze).run(files()))
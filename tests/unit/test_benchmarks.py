@@ -0,0 +1,33 @@
+"""Tests for the benchmark project generator and regression gate."""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'benchmarks'))
+from synthetic_project import ProjectSpec, generate_project
+from run_benchmarks import compare
+from metadata_extractor import extract_metadata
+
+def test_generated_project_round_trips_through_extractors(temp_workspace):
+    """Test that every language in the mix yields exactly the generated metadata."""
+    spec = ProjectSpec(files=24, functions_per_file=6, recursion_rate=0.5,
+                       language_mix={'python': 1, 'java': 1, 'c': 1, 'cpp': 1})
+    expected = generate_project(temp_workspace, spec)
+
+    assert len(expected) == 24
+    assert {os.path.splitext(path)[1] for path in expected} == {'.py', '.java', '.c', '.cpp'}
+    assert all(extract_metadata(path) == metadata for path, metadata in expected.items())
+    assert any(name in deps for metadata in expected.values() for name, deps in metadata.items())
+
+def test_compare_flags_slowdowns_and_unmeasured_benchmarks():
+    """Test that the gate ignores noise and speedups but not missing or skipped timings."""
+    baseline = {'results': {'extract': {'seconds': 1.0}, 'cache_warm': {'seconds': 1.0},
+                            'render_static': {'skipped': 'no dot'}, 'removed': {'seconds': 1.0},
+                            'render_animation': {'seconds': 1.0}, 'parallel_1': {'seconds': 2.0}}}
+    current = {'results': {'extract': {'seconds': 1.2}, 'cache_warm': {'seconds': 1.5},
+                           'render_static': {'seconds': 9.0}, 'render_animation': {'skipped': 'no dot'},
+                           'parallel_1': {'seconds': 1.0}}}
+    regressions = sorted(compare(current, baseline, threshold=0.25))
+    assert [line.split(':')[0] for line in regressions] == ['cache_warm', 'removed', 'render_animation']
+    assert 'missing' in regressions[1] and 'skipped (no dot)' in regressions[2]
@@ -0,0 +1,256 @@
+"""Tests for the metadata cache."""
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from cache_manager import CacheManager, MemoryCache
+from cache_store import CacheStore, JsonFileStore, SQLiteCacheStore, WriteBehindStore
+
+@pytest.fixture
+def cache_config(temp_workspace):
+    """Create a minimal configuration for the cache manager."""
+    return type('Config', (), {
+        'cache_enabled': True,
+        'cache_directory': os.path.join(temp_workspace, '.cache'),
+        'cache_backend': 'sqlite',
+        'cache_max_size_mb': 0,
+        'cache_max_entries': 0,
+        'memory_cache_max_mb': 1,
+        'memory_cache_ttl': 300
+    })
+
+def _write(path: str, content: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+def test_cache_key_is_content_addressed(cache_config, temp_workspace):
+    """Test that keys follow file contents rather than paths or timestamps."""
+    cache = CacheManager(cache_config)
+    first = _write(os.path.join(temp_workspace, "a.py"), "def f(): pass\n")
+    copy = _write(os.path.join(temp_workspace, "b.py"), "def f(): pass\n")
+    other = _write(os.path.join(temp_workspace, "c.py"), "def g(): pass\n")
+
+    key = cache._get_cache_key(first)
+    assert cache._get_cache_key(copy) == key
+    assert cache._get_cache_key(other) != key
+
+    # Same bytes, different scanner
+    native = _write(os.path.join(temp_workspace, "a.c"), "def f(): pass\n")
+    java = _write(os.path.join(temp_workspace, "A.java"), "def f(): pass\n")
+    assert cache._get_cache_key(native) != key
+    assert cache._get_cache_key(java) == cache._get_cache_key(native)
+
+    os.utime(first, ns=(0, 0))
+    assert CacheManager(cache_config)._get_cache_key(first) == key
+
+def test_cached_metadata_survives_new_manager(cache_config, temp_workspace):
+    """Test that a fresh manager finds entries written for identical content."""
+    source = _write(os.path.join(temp_workspace, "a.py"), "def f(): pass\n")
+    CacheManager(cache_config).cache_metadata(source, {"f": []})
+
+    clone = _write(os.path.join(temp_workspace, "clone.py"), "def f(): pass\n")
+    assert CacheManager(cache_config).get_cached_metadata(clone) == {"f": []}
+
+def test_sqlite_store_batches_and_evicts_lru(temp_workspace):
+    """Test batched access and least-recently-used eviction."""
+    store = SQLiteCacheStore(os.path.join(temp_workspace, "cache.sqlite3"), max_entries=3)
+    store.put_many([("a", {"f": []}), ("b", {"g": ["f"]}), ("c", {})])
+    store.get("a")
+    store.put_many([("d", {"h": []})])
+
+    assert store.get_many(["a", "b", "c", "d"]) == {"a": {"f": []}, "c": {}, "d": {"h": []}}
+    assert store.stats()["entries"] == 3
+    store.close()
+
+def test_sqlite_store_reads_do_not_write(temp_workspace):
+    """Test that access times are buffered by reads and stored by the next write."""
+    store = SQLiteCacheStore(os.path.join(temp_workspace, "cache.sqlite3"))
+    store.put_many([("a", 1)])
+    accessed = lambda: store._connection().execute("SELECT accessed_at FROM entries WHERE key = 'a'").fetchone()[0]
+    with store._connection() as conn:
+        conn.execute("UPDATE entries SET accessed_at = 0")
+    store.get("a")
+    assert store._connection().in_transaction is False
+    assert accessed() == 0
+
+    store.put_many([("b", 2)])
+    assert accessed() > 0
+    store.close()
+
+def test_sqlite_store_prunes_by_age(temp_workspace):
+    """Test age-based pruning and clearing."""
+    store = SQLiteCacheStore(os.path.join(temp_workspace, "cache.sqlite3"))
+    store.put_many([("old", 1), ("new", 2)])
+    store._connection().execute("UPDATE entries SET created_at = 0 WHERE key = 'old'")
+
+    assert store.prune(older_than=1.0) == 1
+    assert store.get_many(["old", "new"]) == {"new": 2}
+    store.clear()
+    assert store.stats() == {"entries": 0, "bytes": 0}
+    store.close()
+
+def test_memory_cache_is_byte_bounded_and_counts():
+    """Test byte-based LRU eviction, TTL expiry and hit/miss accounting."""
+    cache = MemoryCache(max_bytes=250, ttl=300)
+    cache.put("a", {"f": []}, size=100)
+    cache.put("b", {"g": []}, size=100)
+    assert cache.get("a") == {"f": []}
+    cache.put("c", {"h": []}, size=100)
+
+    assert cache.get("b") is None
+    assert cache.size_bytes == 200
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    expired = MemoryCache(max_bytes=250, ttl=-1)
+    expired.put("a", {"f": []}, size=10)
+    assert expired.get("a") is None
+    assert expired.expirations == 1
+
+def test_cache_manager_reports_hits_and_misses(cache_config, temp_workspace):
+    """Test that lookups are recorded as deltas in a metrics collector."""
+    recorded = []
+    collector = type('Collector', (), {'record_metric': lambda self, name, value: recorded.append((name, value))})()
+    source = _write(os.path.join(temp_workspace, "a.py"), "def f(): pass\n")
+    cache = CacheManager(cache_config)
+
+    assert cache.get_cached_metadata(source) is None
+    cache.cache_metadata(source, {"f": []})
+    assert cache.get_cached_metadata(source) == {"f": []}
+    cache.report_metrics(collector)
+    cache.report_metrics(collector)
+
+    assert recorded == [("cache_hits", 1), ("cache_misses", 1)]
+
+class SlowStore(CacheStore):
+    """In-memory store whose writes take a while, recording each batch."""
+    def __init__(self, delay=0.0):
+        self.entries = {}
+        self.batches = []
+        self.delay = delay
+        self.closed = False
+
+    def get_many(self, keys):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+
+    def put_many(self, items):
+        items = list(items)
+        time.sleep(self.delay)
+        self.batches.append(len(items))
+        self.entries.update(items)
+
+    def prune(self, older_than):
+        return 0
+
+    def clear(self):
+        self.entries.clear()
+
+    def close(self):
+        self.closed = True
+
+def test_write_behind_batches_without_blocking_writers():
+    """Test that puts return immediately, are readable at once and are batched."""
+    inner = SlowStore(delay=0.2)
+    store = WriteBehindStore(inner, flush_interval=0.05)
+    start = time.perf_counter()
+    for i in range(100):
+        store.put(f"k{i}", {"f": [i]})
+    assert time.perf_counter() - start < 0.1
+    assert store.get("k42") == {"f": [42]}
+    assert store.flush(timeout=5)
+    assert inner.entries["k99"] == {"f": [99]}
+    assert sum(inner.batches) <= 100 and len(inner.batches) < 10
+    store.close()
+    assert inner.closed
+
+def test_write_behind_close_respects_deadline():
+    """Test that shutdown gives up on a stuck store after the deadline."""
+    store = WriteBehindStore(SlowStore(delay=2.0), flush_interval=0.0)
+    store.put("a", {})
+    time.sleep(0.05)
+    store.put("b", {})
+    start = time.perf_counter()
+    store.close(timeout=0.2)
+    assert time.perf_counter() - start < 1.0
+    with pytest.raises(RuntimeError):
+        store.put("c", {})
+
+class BlockingStore(SlowStore):
+    """Store whose writes wait until the test releases them."""
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def put_many(self, items):
+        self.writing.set()
+        self.release.wait(5)
+        super().put_many(items)
+
+def test_write_behind_reads_see_the_batch_being_committed():
+    """Test that entries stay readable while the writer thread is storing them."""
+    inner = BlockingStore()
+    store = WriteBehindStore(inner, flush_interval=0.0)
+    store.put("a", {"f": []})
+    assert inner.writing.wait(5)
+    assert "a" not in inner.entries
+    assert store.get("a") == {"f": []}
+    inner.release.set()
+    store.close()
+
+def test_write_behind_closes_the_writer_thread_connection(temp_workspace):
+    """Test that closing a SQLite-backed store closes the writer thread's connection too."""
+    opened = set()
+    closed = set()
+
+    class TrackingStore(SQLiteCacheStore):
+        def _connection(self):
+            opened.add(threading.current_thread().name)
+            return super()._connection()
+
+        def close(self):
+            if getattr(self._local, 'conn', None) is not None:
+                closed.add(threading.current_thread().name)
+            super().close()
+
+    store = WriteBehindStore(TrackingStore(os.path.join(temp_workspace, "cache.db")), flush_interval=0.0)
+    store.put("a", {"f": []})
+    assert store.flush(timeout=5)
+    assert store.get("a") == {"f": []}
+    store.close()
+
+    assert opened == {"cache-write-behind", threading.current_thread().name}
+    assert closed == opened
+
+def test_json_store_writes_are_atomic(temp_workspace):
+    """Test that concurrent writers never leave a torn or temporary file behind."""
+    store = JsonFileStore(temp_workspace)
+    values = [{"f": [str(i) * 2000]} for i in range(4)]
+    torn = []
+
+    def write(value):
+        for _ in range(50):
+            store.put("shared", value)
+
+    def read():
+        for _ in range(200):
+            with open(os.path.join(temp_workspace, "shared.json")) as f:
+                content = f.read()
+            if content and not content.endswith("]}"):
+                torn.append(content)
+
+    store.put("shared", values[0])
+    threads = [threading.Thread(target=write, args=(value,)) for value in values]
+    threads.append(threading.Thread(target=read))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not torn
+    assert store.get("shared") in values
+    assert not [name for name in os.listdir(temp_workspace) if name.endswith('.tmp')]
@@ -0,0 +1,89 @@
+"""Tests for pruning, .gitignore-aware streaming file discovery."""
+import os
+import sys
+import types
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from file_discovery import parse_gitignore, iter_source_files, discover_files, IgnoreStack
+
+def touch(root, rel_path, content='x = 1\n'):
+    path = os.path.join(root, *rel_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+def relative(root, paths):
+    return sorted(os.path.relpath(path, root).replace(os.sep, '/') for path in paths)
+
+@pytest.fixture
+def tree(temp_workspace):
+    for rel_path in ['main.py', 'lib/util.py', 'lib/util.pyc', 'lib/logo.png', 'native/core.c',
+                     'build/gen.py', 'docs/conf.py', 'docs/keep.py', '.git/hooks/hook.py',
+                     'venv/lib/site.py', 'lib/tmp_scratch.py']:
+        touch(temp_workspace, rel_path)
+    touch(temp_workspace, '.gitignore', '# generated\nbuild/\ntmp_*.py\n/docs/*\n!/docs/keep.py\n')
+    return temp_workspace
+
+def test_gitignore_rules():
+    """Test anchoring, directory-only patterns, ** and negation."""
+    stack = IgnoreStack((('', parse_gitignore(['*.log', 'out/', '/top.py', 'a/**/z.py', '!keep.log'])),))
+    assert stack.ignored('x/debug.log', False)
+    assert not stack.ignored('x/keep.log', False)
+    assert stack.ignored('src/out', True) and not stack.ignored('src/out', False)
+    assert stack.ignored('top.py', False) and not stack.ignored('sub/top.py', False)
+    assert stack.ignored('a/z.py', False) and stack.ignored('a/b/c/z.py', False)
+    assert parse_gitignore(['', '# comment', '   ']) == []
+
+def test_discovery_prunes_and_filters(tree):
+    """Test that excluded, ignored and unsupported paths are never yielded."""
+    files = iter_source_files(tree, {'.py', '.c'}, excluded={'.git', 'venv'})
+    assert isinstance(files, types.GeneratorType)
+    assert relative(tree, files) == ['docs/keep.py', 'lib/util.py', 'main.py', 'native/core.c']
+    assert relative(tree, iter_source_files(tree, {'.py'}, respect_gitignore=False)) == [
+        '.git/hooks/hook.py', 'build/gen.py', 'docs/conf.py', 'docs/keep.py',
+        'lib/tmp_scratch.py', 'lib/util.py', 'main.py', 'venv/lib/site.py']
+
+def test_nested_gitignore_applies_below_its_directory(tree):
+    """Test that a nested .gitignore adds rules relative to its directory."""
+    touch(tree, 'lib/.gitignore', 'util.py\n')
+    touch(tree, 'lib/sub/util.py')
+    files = relative(tree, iter_source_files(tree, {'.py'}, excluded={'.git', 'venv'}))
+    assert files == ['docs/keep.py', 'main.py']
+
+def test_discover_files_uses_config(tree):
+    """Test that languages, excluded directories and the size limit come from config."""
+    touch(tree, 'big.py', 'x' * (2 * 1024 * 1024))
+    config = types.SimpleNamespace(supported_languages=['python'], excluded_directories=['.git', 'venv'],
+                                   max_file_size_mb=1, respect_gitignore=True)
+    assert relative(tree, discover_files(tree, config)) == ['docs/keep.py', 'lib/util.py', 'main.py']
+
+def test_entries_are_yielded_while_the_directory_is_read(temp_workspace, monkeypatch):
+    """Test that a file is handed out before the rest of its directory is listed."""
+    for i in range(5):
+        touch(temp_workspace, f"m{i}.py")
+    listed = []
+    scandir = os.scandir
+
+    class RecordingScandir:
+        def __init__(self, path):
+            self.entries = scandir(path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.entries.close()
+
+        def __iter__(self):
+            for entry in self.entries:
+                listed.append(entry.name)
+                yield entry
+
+    monkeypatch.setattr(os, 'scandir', RecordingScandir)
+    stream = iter_source_files(temp_workspace, {'.py'}, respect_gitignore=False)
+    next(stream)
+    assert len(listed) == 1
+    stream.close()
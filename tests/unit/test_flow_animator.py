@@ -0,0 +1,62 @@
+"""Tests for the layout-once flow animator."""
+import os
+import sys
+from PIL import Image, ImageSequence
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from flow_animator import FlowAnimator, GraphLayout, NodeBox, pack_layouts, parse_plain_layout
+
+PLAIN_LAYOUT = '''graph 1 4.5 1.5
+node "a.py#main" 0.75 0.75 1.5 0.5 "a.py#main\\n(1 deps)" filled box black "#f5a623"
+node helper 3.5 1.1 1.2 0.5 "helper
+(0 deps)" filled box black "#7ed321"
+edge helper "a.py#main" 4 2.9 1.1 2.5 1.1 2.0 0.9 1.5 0.8 solid black
+stop
+'''
+
+COLORS = {'background': '#ffffff', 'edge': '#2d3436', 'text': '#2c3e50'}
+
+def test_parse_plain_layout():
+    """Test quoted names, multi-line labels and edge control points."""
+    layout = parse_plain_layout(PLAIN_LAYOUT)
+    assert (layout.width, layout.height) == (4.5, 1.5)
+    assert layout.nodes["a.py#main"].label == "a.py#main\n(1 deps)"
+    assert layout.nodes["helper"].label == "helper\n(0 deps)"
+    assert layout.nodes["helper"].fillcolor == "#7ed321"
+    assert layout.edges[("helper", "a.py#main")] == [[(2.9, 1.1), (2.5, 1.1), (2.0, 0.9), (1.5, 0.8)]]
+
+def test_render_streams_one_frame_per_step(tmp_path):
+    """Test the frame sequence: nodes only, highlighted edge, complete graph."""
+    layout = parse_plain_layout(PLAIN_LAYOUT)
+    output = str(tmp_path / "flow.gif")
+    frame_count = FlowAnimator(COLORS).render(layout, [[("helper", "a.py#main")]], output)
+    assert frame_count == 3
+
+    with Image.open(output) as gif:
+        assert gif.info["duration"] == 1000
+        frames = [frame.convert('RGB').copy() for frame in ImageSequence.Iterator(gif)]
+    assert len(frames) == 3
+    assert all(frame.size == (800, 500) for frame in frames)
+
+    def count(frame, color):
+        return sum(1 for pixel in frame.getdata() if pixel == color)
+    assert count(frames[0], (255, 0, 0)) == 0
+    assert count(frames[1], (255, 0, 0)) > 0
+    assert count(frames[2], (255, 0, 0)) == 0
+    assert count(frames[2], (128, 128, 128)) > 0
+
+def test_pack_layouts_keeps_components_apart():
+    """Test that packed layouts keep their shape and do not overlap."""
+    first = GraphLayout(2.0, 1.0, {'a': NodeBox(1.0, 0.5, 1.0, 0.5, 'a', 'white')},
+                        {('a', 'a'): [[(0.0, 0.0), (2.0, 1.0)]]})
+    second = GraphLayout(1.0, 1.0, {'b': NodeBox(0.5, 0.5, 1.0, 0.5, 'b', 'white')})
+    packed = pack_layouts([first, second], padding=0.5)
+
+    assert set(packed.nodes) == {'a', 'b'}
+    a, b = packed.nodes['a'], packed.nodes['b']
+    assert (a.width, a.height, a.label) == (1.0, 0.5, 'a')
+    assert abs(a.x - b.x) >= 1.5 or abs(a.y - b.y) >= 1.0
+    spline = packed.edges[('a', 'a')][0]
+    assert spline[1][0] - spline[0][0] == 2.0 and spline[1][1] - spline[0][1] == 1.0
+    assert all(0 <= box.x <= packed.width and 0 <= box.y <= packed.height for box in packed.nodes.values())
@@ -0,0 +1,79 @@
+"""Tests for the trigram/prefix function index and headless selection."""
+import os
+import sys
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from function_index import FunctionIndex, _glob_literals, _regex_literals
+import cli
+
+NAMES = [
+    'pkg/util.py#parse_args',
+    'pkg/util.py#parse_config',
+    'pkg/io/reader.py#read_file',
+    'pkg/io/reader.py#ReadBuffer',
+    'app.py#main',
+    'app.py#parse',
+]
+
+@pytest.fixture
+def index():
+    importance = {'app.py#main': 0.5, 'pkg/util.py#parse_config': 0.3, 'pkg/io/reader.py#read_file': 0.2}
+    return FunctionIndex(NAMES, importance)
+
+def test_literal_extraction():
+    """Test that only literals every match must contain are used for lookup."""
+    assert _glob_literals('pkg/*#parse_?rgs') == ['pkg/', '#parse_', 'rgs']
+    assert _regex_literals(r'parse_\w+$') == ['parse_']
+    assert _regex_literals('reads?_file') == ['read', '_file']
+    assert _regex_literals('parse|read') == []
+
+def test_glob_regex_and_search(index):
+    """Test pattern matching against qualified names."""
+    assert sorted(index.match_glob('*#parse_*')) == ['pkg/util.py#parse_args', 'pkg/util.py#parse_config']
+    assert index.match_glob('*#Read*') == ['pkg/io/reader.py#ReadBuffer']
+    assert sorted(index.match_regex(r'#parse(_args)?$')) == ['app.py#parse', 'pkg/util.py#parse_args']
+    assert sorted(index.search('READ')) == ['pkg/io/reader.py#ReadBuffer', 'pkg/io/reader.py#read_file']
+    assert index.search('nothing_like_this') == []
+
+def test_match_file_and_module(index):
+    """Test selection by file, directory and dotted module."""
+    assert index.match_file('app.py') == ['app.py#main', 'app.py#parse']
+    assert index.match_file('pkg/io') == ['pkg/io/reader.py#ReadBuffer', 'pkg/io/reader.py#read_file']
+    assert index.match_file('pkg.util') == ['pkg/util.py#parse_args', 'pkg/util.py#parse_config']
+    assert index.match_file('pkg/ut') == []
+
+def test_select_combines_selectors(index):
+    """Test that selectors are unioned and top-K ranks within them."""
+    assert index.select(top_k=2) == ['app.py#main', 'pkg/util.py#parse_config']
+    assert index.select(files=['pkg.util'], globs=['app.py#m*'], top_k=2) == [
+        'app.py#main', 'pkg/util.py#parse_config']
+    assert index.select(regexes=['ReadBuffer'], files=['app.py']) == [
+        'app.py#main', 'app.py#parse', 'pkg/io/reader.py#ReadBuffer']
+    assert index.select() == []
+
+def test_index_from_metadata_ranks_by_pagerank():
+    """Test that the most called function ranks first."""
+    metadata = {'a': ['hub'], 'b': ['hub'], 'c': ['hub'], 'hub': []}
+    assert FunctionIndex.from_metadata(metadata, with_importance=True).top_k(1) == ['hub']
+
+def test_large_index_queries_check_only_trigram_candidates():
+    """Test that lookups on 200k names narrow to a handful of trigram candidates."""
+    names = [f"pkg/mod{i % 500}.py#func_{i}" for i in range(200000)]
+    index = FunctionIndex(names)
+    candidates = index._candidates(_glob_literals('*#func_12345'))
+    # func_12345 and func_123450 .. func_123459
+    assert len(candidates) == 11
+    assert index.match_glob('*#func_12345') == ['pkg/mod345.py#func_12345']
+    assert len(index.match_file('pkg/mod7.py')) == 400
+
+def test_interactive_menu_filters(monkeypatch, capsys):
+    """Test that typed text narrows the menu before numbers pick from it."""
+    functions = sorted(f"m.py#f{i}" for i in range(200)) + ['m.py#special']
+    answers = iter(['spec', '1', 'y'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    assert cli.select_functions(functions) == ['m.py#special']
+    out = capsys.readouterr().out
+    assert f"... and {len(functions) - cli.MENU_PAGE_SIZE} more" in out
+    assert "Matching functions (1 of 201)" in out
@@ -0,0 +1,56 @@
+"""Tests for graph traversal helpers."""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from graph_algorithms import (weakly_connected_components, strongly_connected_components,
+                              call_levels, group_edges_by_level)
+
+def test_components_follow_edges_in_both_directions():
+    """Test grouping through callers and callees, ignoring unknown dependencies."""
+    metadata = {
+        "main": ["helper"],
+        "other": ["helper"],
+        "helper": ["missing"],
+        "isolated": []
+    }
+    assert weakly_connected_components(metadata) == [{"main", "other", "helper"}, {"isolated"}]
+
+def test_long_call_chain_does_not_recurse():
+    """Test a chain far deeper than Python's recursion limit."""
+    depth = sys.getrecursionlimit() * 5
+    metadata = {f"f{i}": [f"f{i + 1}"] for i in range(depth)}
+    metadata[f"f{depth}"] = []
+
+    components = weakly_connected_components(metadata)
+    assert len(components) == 1
+    assert len(components[0]) == depth + 1
+
+def test_cycles_collapse_into_one_level():
+    """Test that mutually recursive functions share a level below their caller."""
+    metadata = {
+        "main": ["ping", "log"],
+        "ping": ["pong"],
+        "pong": ["ping", "log"],
+        "log": ["log"]
+    }
+    components = strongly_connected_components(metadata)
+    assert sorted(sorted(c) for c in components) == [["log"], ["main"], ["ping", "pong"]]
+    # Callees come before their callers
+    assert components.index(["main"]) == len(components) - 1
+
+    assert call_levels(metadata) == {"main": 0, "ping": 1, "pong": 1, "log": 2}
+    assert group_edges_by_level(metadata) == [
+        [("ping", "main"), ("log", "main")],
+        [("pong", "ping"), ("ping", "pong"), ("log", "pong")],
+        [("log", "log")]
+    ]
+
+def test_levels_merge_to_fit_budget():
+    """Test that a deep chain is squeezed into at most max_groups groups."""
+    metadata = {f"f{i}": [f"f{i + 1}"] for i in range(10)}
+    metadata["f10"] = []
+    groups = group_edges_by_level(metadata, max_groups=3)
+    assert len(groups) == 3
+    assert [edge for group in groups for edge in group] == [(f"f{i + 1}", f"f{i}") for i in range(10)]
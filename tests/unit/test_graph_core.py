@@ -0,0 +1,78 @@
+"""Tests for the compact CSR graph core and its mapping adapter."""
+import os
+import sys
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from graph_core import CompactGraph, CompactGraphBuilder, GraphMapping
+
+METADATA = {
+    "main": ["helper", "print", "helper"],
+    "helper": ["util"],
+    "util": ["util"],
+    "orphan": []
+}
+
+def test_mapping_adapter_matches_metadata():
+    """Test that the adapter behaves like the original dict, duplicates included."""
+    mapping = GraphMapping.from_metadata(METADATA)
+    assert mapping == METADATA
+    assert list(mapping) == list(METADATA)
+    assert "print" not in mapping
+    with pytest.raises(KeyError):
+        mapping["print"]
+
+def test_adjacency_and_degree_views():
+    """Test forward and reverse CSR views and edge extraction."""
+    graph = CompactGraph.from_metadata(METADATA)
+    names = graph.names
+    main, helper, util = (graph.index[name] for name in ("main", "helper", "util"))
+
+    assert [names[i] for i in graph.successors(main)] == ["helper", "print", "helper"]
+    assert sorted(names[i] for i in graph.predecessors(helper)) == ["main", "main"]
+    assert graph.out_degree.tolist() == [3, 1, 1, 0]
+    assert graph.in_degree[graph.index["print"]] == 1
+
+    src, dst = graph.internal_edges()
+    assert sorted(zip(src.tolist(), dst.tolist())) == [(main, helper), (helper, util), (util, util)]
+
+def test_builder_enforces_definition_order():
+    """Test that rows must follow the declared function order."""
+    builder = CompactGraphBuilder(["a", "b"])
+    with pytest.raises(ValueError):
+        builder.add("b", [])
+    builder.add("a", ["b"])
+    with pytest.raises(ValueError):
+        builder.build()
+
+def test_memory_per_edge_is_small():
+    """Test that adjacency storage stays in the tens of bytes per edge."""
+    n = 20000
+    metadata = {f"f{i}": [f"f{(i * 7 + j) % n}" for j in range(10)] for i in range(n)}
+    graph = CompactGraph.from_metadata(metadata)
+    assert graph.num_edges == 10 * n
+    assert graph.nbytes() / graph.num_edges < 20
+
+def test_neighborhood_follows_depth_and_direction():
+    """Test transitive selection over callees, callers or both."""
+    graph = CompactGraph.from_metadata({
+        "main": ["a", "print"],
+        "a": ["b"],
+        "b": ["c", "a"],
+        "c": [],
+        "other": ["b"]
+    })
+    assert graph.neighborhood(["a"], depth=1) == ["a", "b"]
+    assert graph.neighborhood(["a"], depth=None) == ["a", "b", "c"]
+    assert graph.neighborhood(["b"], depth=1, direction="callers") == ["b", "a", "other"]
+    assert graph.neighborhood(["c"], depth=None, direction="both") == ["c", "b", "a", "other", "main"]
+    assert graph.neighborhood(["a", "print"], depth=0) == ["a"]
+
+def test_neighborhood_in_large_graph():
+    """Test a small neighborhood selected from a 100k-function graph."""
+    n = 100000
+    metadata = {f"f{i}": [f"f{i + 1}"] if i + 1 < n else [] for i in range(n)}
+    graph = GraphMapping.from_metadata(metadata).graph
+    selected = graph.neighborhood(["f5000"], depth=25, direction="both")
+    assert sorted(selected, key=lambda name: int(name[1:])) == [f"f{i}" for i in range(4975, 5026)]
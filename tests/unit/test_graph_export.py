@@ -0,0 +1,56 @@
+"""Tests for the columnar node and edge export."""
+import json
+import os
+import sys
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+import graph_export
+from graph_export import export_graph
+from graph_metrics import GraphMetrics
+
+METADATA = {
+    "a.py#main": ["a.py#helper", "print"],
+    "a.py#helper": ["b.py#util"],
+    "b.py#util": ["b.py#util"]
+}
+
+def test_npz_export_round_trip(tmp_path):
+    """Test that the archive holds the full node table and edge list."""
+    metrics = GraphMetrics(METADATA)
+    [path] = export_graph(metrics, str(tmp_path / "graph"), "npz")
+
+    with np.load(path) as data:
+        names = data["node_name"].tolist()
+        assert names == list(METADATA)
+        assert data["node_file"].tolist() == ["a.py", "a.py", "b.py"]
+        assert data["node_out_degree"].tolist() == [2, 1, 1]
+        assert data["node_is_recursive"].tolist() == [False, False, True]
+        np.testing.assert_allclose(data["node_pagerank"], metrics.pagerank)
+        edges = {(names[s], names[d]) for s, d in zip(data["edge_src"], data["edge_dst"])}
+    assert edges == {("a.py#main", "a.py#helper"), ("a.py#helper", "b.py#util"), ("b.py#util", "b.py#util")}
+
+def test_ndjson_export_streams_rows(tmp_path):
+    """Test one JSON record per node and per edge, written in small chunks."""
+    metrics = GraphMetrics(METADATA)
+    nodes_path, edges_path = graph_export.export_ndjson(metrics, str(tmp_path / "graph"), chunk_size=2)
+
+    with open(nodes_path) as f:
+        nodes = [json.loads(line) for line in f]
+    assert [node["name"] for node in nodes] == list(METADATA)
+    assert nodes[2]["is_recursive"] is True
+    assert nodes[1]["in_degree"] == 1
+    with open(edges_path) as f:
+        assert len(f.readlines()) == 3
+
+def test_arrow_export(tmp_path):
+    """Test Arrow IPC output when pyarrow is installed."""
+    pa = pytest.importorskip("pyarrow")
+    metrics = GraphMetrics(METADATA)
+    nodes_path, edges_path = export_graph(metrics, str(tmp_path / "graph"), "arrow")
+    with pa.memory_map(nodes_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.column("name").to_pylist() == list(METADATA)
+    assert table.num_columns == 9
@@ -0,0 +1,68 @@
+"""Tests for the graph metrics engine."""
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from graph_metrics import GraphMetrics
+
+@pytest.fixture
+def metadata():
+    """Create a small graph with a recursive node and a dangling dependency."""
+    return {
+        "main": ["helper", "utility", "missing"],
+        "helper": ["utility", "utility"],
+        "utility": [],
+        "recursive": ["recursive", "utility"]
+    }
+
+def test_degrees_match_direct_counts(metadata):
+    """Test that degrees agree with per-node scans of the metadata."""
+    metrics = GraphMetrics(metadata).as_dict()
+
+    for func, deps in metadata.items():
+        assert metrics[func]["out_degree"] == len(deps)
+        assert metrics[func]["in_degree"] == len([f for f, d in metadata.items() if func in d])
+        assert metrics[func]["is_recursive"] == (func in deps)
+    assert metrics["helper"]["fan_out"] == 1
+    assert metrics["main"]["fan_out"] == 2
+
+def test_centrality(metadata):
+    """Test PageRank normalisation and betweenness on a call chain."""
+    metrics = GraphMetrics(metadata)
+
+    assert metrics.pagerank.sum() == pytest.approx(1.0)
+    assert metrics.importance("utility") == metrics.max_importance
+    assert metrics.node_metrics("helper")["betweenness"] == pytest.approx(0.0)
+
+    chain = GraphMetrics({"a": ["b"], "b": ["c"], "c": []})
+    assert chain.node_metrics("b")["betweenness"] == pytest.approx(1.0)
+
+def test_empty_graph():
+    """Test that an empty graph produces empty metrics."""
+    metrics = GraphMetrics({})
+    assert metrics.as_dict() == {}
+    assert metrics.max_importance == 0.0
+
+def test_per_component_metrics_match_global(metadata):
+    """Test that component-wise centralities equal the whole-graph ones."""
+    graph = dict(metadata, a=["b"], b=["c"], c=[], lone=[])
+    whole = GraphMetrics(graph)
+    split = GraphMetrics(graph, by_component=True)
+
+    assert split.pagerank == pytest.approx(whole.pagerank, abs=1e-9)
+    assert split.betweenness == pytest.approx(whole.betweenness)
+
+def test_incremental_update_reuses_untouched_components(metadata):
+    """Test that only components with changed functions are recomputed."""
+    graph = dict(metadata, a=["b"], b=["c"], c=[])
+    previous = GraphMetrics(graph, by_component=True)
+    updated = dict(graph, c=["d"], d=[])
+    metrics = GraphMetrics(updated, previous=previous, changed={"c", "d"})
+
+    assert metrics.reused == len(metadata)
+    whole = GraphMetrics(updated)
+    assert metrics.pagerank == pytest.approx(whole.pagerank, abs=1e-9)
+    assert metrics.betweenness == pytest.approx(whole.betweenness)
@@ -0,0 +1,52 @@
+"""Tests for the precomputed interactive graph layout."""
+import os
+import sys
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from layout_engine import compute_layout, extend_layout, force_directed_layout, _repulsion_exact, _repulsion_grid
+
+def test_grid_repulsion_approximates_exact():
+    """Test that the grid approximation stays close to exact pairwise repulsion."""
+    pos = np.random.default_rng(0).normal(size=(400, 2)) * 10
+    exact = _repulsion_exact(pos, 1.0, 1 << 16)
+    approx = _repulsion_grid(pos, 1.0, 32, 1 << 16)
+    error = np.linalg.norm(approx - exact, axis=1).mean()
+    assert error < 0.2 * np.linalg.norm(exact, axis=1).mean()
+
+def test_connected_nodes_end_up_close():
+    """Test that edges pull nodes together relative to unrelated nodes."""
+    # Two 20-node rings with no edges between them
+    ring = np.arange(20)
+    src = np.concatenate([ring, ring + 20])
+    dst = np.concatenate([(ring + 1) % 20, (ring + 1) % 20 + 20])
+    for exact_limit in (1000, 0):
+        pos = force_directed_layout(40, src, dst, exact_limit=exact_limit)
+        assert np.isfinite(pos).all()
+        edge_length = np.linalg.norm(pos[src] - pos[dst], axis=1).mean()
+        across = np.linalg.norm(pos[:20, None] - pos[None, 20:], axis=2).mean()
+        assert edge_length < across / 2
+
+def test_compute_layout_returns_pixel_positions():
+    """Test that every node gets a deterministic coordinate pair."""
+    nodes = ["main", "helper", "util"]
+    src = np.array([0, 1])
+    dst = np.array([1, 2])
+    first = compute_layout(nodes, src, dst, method='numpy')
+    assert first == compute_layout(nodes, src, dst, method='numpy')
+    assert set(first) == set(nodes)
+    assert all(isinstance(v, float) for xy in first.values() for v in xy)
+
+def test_extend_layout_keeps_known_positions():
+    """Test that only new nodes move, next to their placed neighbours."""
+    previous = {"main": (0.0, 0.0), "helper": (100.0, 0.0)}
+    nodes = ["main", "helper", "new", "newer", "alone"]
+    src = np.array([0, 2])
+    dst = np.array([2, 3])
+    pos = extend_layout(previous, nodes, src, dst, spacing=10.0)
+    assert pos["main"] == (0.0, 0.0) and pos["helper"] == (100.0, 0.0)
+    assert np.hypot(*pos["new"]) == pytest.approx(10.0)
+    assert np.hypot(pos["newer"][0] - pos["new"][0], pos["newer"][1] - pos["new"][1]) == pytest.approx(10.0)
+    assert pos["alone"][0] > 100.0
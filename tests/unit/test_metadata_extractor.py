@@ -0,0 +1,97 @@
+"""Tests for the fast-path metadata extractor."""
+import os
+import sys
+from typing import Dict, List
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from metadata_extractor import (
+    extract_metadata,
+    extract_metadata_full,
+    extract_python_metadata,
+    has_metadata_marker,
+    scan_native_functions,
+)
+
+def test_fast_path_matches_full_parse(sample_python_file: str, expected_metadata: Dict[str, List[str]]):
+    """Test that the fast path extracts the same metadata as a full parse."""
+    assert extract_python_metadata(sample_python_file) == expected_metadata
+    assert extract_metadata_full(sample_python_file) == expected_metadata
+
+def test_unmarked_file_is_skipped(temp_workspace: str):
+    """Test that files without a marker are rejected before parsing."""
+    file_path = os.path.join(temp_workspace, "plain.py")
+    with open(file_path, "w", encoding="utf-8") as f:
+        # Invalid syntax proves the file is never handed to the parser
+        f.write("def broken(:\n    return 1\n")
+
+    assert not has_metadata_marker(file_path)
+    assert extract_python_metadata(file_path) == {}
+
+def test_empty_file_handling(temp_workspace: str):
+    """Test that empty files produce empty metadata."""
+    file_path = os.path.join(temp_workspace, "empty.py")
+    open(file_path, "w").close()
+    assert extract_python_metadata(file_path) == {}
+
+def test_methods_and_multiline_signatures(temp_workspace: str):
+    """Test indented methods and signatures spanning several lines."""
+    file_path = os.path.join(temp_workspace, "methods.py")
+    content = '''
+class Service:
+    def run(
+        self,
+        value,
+    ):
+        """
+        Metadata:
+        dependencies: [load, 'save']
+        """
+        return value
+
+    def load(self):
+        """Not annotated."""
+        return "Metadata: only a string literal"
+'''
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    assert extract_python_metadata(file_path) == {"run": ["load", "save"]}
+    assert extract_python_metadata(file_path) == extract_metadata_full(file_path)
+
+def test_java_sample_extraction():
+    """Test that Javadoc metadata blocks are extracted from the Java sample."""
+    metadata = extract_metadata(os.path.join(project_root, "sample_code.java"))
+    assert metadata == {
+        "factorial": ["factorial"],
+        "add": ["validate"],
+        "validate": []
+    }
+
+def test_line_comment_blocks_and_signatures(temp_workspace: str):
+    """Test // metadata blocks, annotations and multi-line C++ signatures."""
+    file_path = os.path.join(temp_workspace, "service.cpp")
+    content = """
+// Metadata:
+// dependencies: [parse, validate]
+@Deprecated
+std::vector<int> Service::load(
+    const std::string& path) {
+    return parse(path);
+}
+
+/** Metadata: dependencies: [] */
+int parse(const char* text);
+
+int untracked(int x) { return x; }
+"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    functions = list(scan_native_functions(file_path))
+    assert [(f.name, f.dependencies) for f in functions] == [
+        ("load", ["parse", "validate"]),
+        ("parse", [])
+    ]
+    assert functions[0].signature == "std::vector<int> Service::load( const std::string& path)"
+    assert functions[1].line == 11
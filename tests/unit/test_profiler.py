@@ -0,0 +1,99 @@
+"""Tests for the opt-in stage profiler."""
+import os
+import sys
+import json
+import threading
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+import profiler as profiler_module
+from profiler import Profiler, PARSE_STAGE
+from analysis_pipeline import AnalysisPipeline
+from file_discovery import iter_source_files
+
+@pytest.fixture
+def active_profiler():
+    """Install an enabled process-wide profiler for the test."""
+    previous = profiler_module._profiler
+    active = profiler_module.configure_profiler(enabled=True)
+    yield active
+    profiler_module._profiler = previous
+
+def analyze(path):
+    return {f"{os.path.basename(path)}_func": []}
+
+class NoCache:
+    def get_cached_metadata_many(self, paths):
+        return {}
+
+    def cache_metadata_many(self, items):
+        pass
+
+def test_percentiles_slowest_files_and_stage():
+    """Test the per-stage latency summary and the slowest-file ranking."""
+    profiler = Profiler(enabled=True, top=2)
+    for ms in range(1, 101):
+        profiler.record(PARSE_STAGE, ms * 1_000_000, f"file{ms}.py")
+    profiler.record('render_static', 6_000_000_000)
+
+    report = profiler.report()
+    parse = report['stages'][PARSE_STAGE]
+    assert parse['count'] == 100
+    assert parse['p50_ms'] == pytest.approx(50.5)
+    assert parse['p99_ms'] == pytest.approx(99.01)
+    assert report['slowest_stage'] == 'render_static'
+    assert report['slowest_files'] == [{'file': 'file100.py', 'ms': 100.0}, {'file': 'file99.py', 'ms': 99.0}]
+    assert 'Slowest stage: render_static' in profiler.summary()
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    """Test that spans are free no-ops unless profiling was requested."""
+    profiler = Profiler()
+    with profiler.span('discover'):
+        pass
+    assert profiler.report()['stages'] == {}
+    assert profiler.dump(str(tmp_path)) == []
+
+def test_dump_writes_report_cpu_and_allocation_profiles(tmp_path):
+    """Test that cProfile and tracemalloc snapshots land beside the report."""
+    profiler = Profiler(cpu=True, memory=True)
+    profiler.start()
+    with profiler.span('work'):
+        sorted(str(i) for i in range(10000))
+    profiler.stop()
+
+    paths = profiler.dump(str(tmp_path))
+    names = sorted(os.path.basename(path).split('_2')[0] for path in paths)
+    assert names == ['allocations', 'cpu_profile', 'cpu_profile', 'profile']
+    report = json.loads(next(open(path) for path in paths if path.endswith('.json')).read())
+    assert report['stages']['work']['count'] == 1
+    assert report['wall_time_ms'] > 0
+
+def _thread_only_work():
+    return sorted(str(i) for i in range(10000))
+
+def test_cpu_profile_includes_worker_threads(tmp_path):
+    """Test that functions run only in a worker thread reach the CPU profile."""
+    profiler = Profiler(cpu=True)
+    profiler.start()
+    worker = threading.Thread(target=_thread_only_work)
+    worker.start()
+    worker.join()
+    profiler.stop()
+
+    text_path = next(path for path in profiler.dump(str(tmp_path)) if path.endswith('.txt'))
+    assert '_thread_only_work' in open(text_path).read()
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_pipeline_records_discovery_and_per_file_parse_spans(tmp_path, active_profiler, backend):
+    """Test that both parse backends report a span per file to the parent's profiler."""
+    for i in range(5):
+        (tmp_path / f"m{i}.py").write_text("pass\n")
+    files = iter_source_files(str(tmp_path), {'.py'})
+    results = list(AnalysisPipeline(NoCache(), analyze, parsers=2, backend=backend).run(files))
+
+    assert len(results) == 5
+    stages = active_profiler.report()['stages']
+    assert stages[PARSE_STAGE]['count'] == 5
+    assert stages['discover']['count'] == 1
+    assert {label for label, _ in active_profiler.slowest(count=10)} == {path for path, _ in results}
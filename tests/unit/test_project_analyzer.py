@@ -0,0 +1,58 @@
+"""Tests for merging per-file metadata into a project graph."""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from config import load_config
+from project_analyzer import analyze_project, merge_project_metadata, split_qualified_name
+
+def test_same_named_functions_do_not_collide(temp_workspace: str):
+    """Test that functions are qualified by file and resolved locally first."""
+    results = [
+        (os.path.join(temp_workspace, "a.py"), {"main": ["helper"], "helper": []}),
+        (os.path.join(temp_workspace, "pkg", "b.py"), {"main": ["helper", "shared"], "helper": []}),
+        (os.path.join(temp_workspace, "c.py"), {"shared": []}),
+    ]
+
+    merged = merge_project_metadata(results, temp_workspace)
+
+    assert merged["a.py#main"] == ["a.py#helper"]
+    assert merged["pkg/b.py#main"] == ["pkg/b.py#helper", "c.py#shared"]
+    assert len(merged) == 5
+
+def test_ambiguous_dependency_stays_unqualified(temp_workspace: str):
+    """Test that a dependency defined in several other files is not guessed."""
+    results = [
+        (os.path.join(temp_workspace, "a.py"), {"helper": []}),
+        (os.path.join(temp_workspace, "b.py"), {"helper": []}),
+        (os.path.join(temp_workspace, "c.py"), {"main": ["helper"]}),
+    ]
+
+    merged = merge_project_metadata(results, temp_workspace)
+
+    assert merged["c.py#main"] == ["helper"]
+    assert split_qualified_name("c.py#main") == ("c.py", "main")
+    assert split_qualified_name("main") == ("", "main")
+
+class RecordingCollector:
+    """Keeps every recorded metric value."""
+    def __init__(self):
+        self.metrics = {}
+
+    def record_metric(self, name, value):
+        self.metrics.setdefault(name, []).append(value)
+
+def test_files_processed_counts_files_without_functions(temp_workspace: str):
+    """Test that empty files and files without metadata count as processed."""
+    with open(os.path.join(temp_workspace, "a.py"), "w") as f:
+        f.write('def main():\n    """\n    Metadata:\n    dependencies: []\n    """\n')
+    open(os.path.join(temp_workspace, "empty.py"), "w").close()
+    with open(os.path.join(temp_workspace, "plain.py"), "w") as f:
+        f.write("x = 1\n")
+    config = load_config(os.path.join(temp_workspace, "missing.yaml"))
+    config.cache_directory = os.path.join(temp_workspace, ".cache")
+    collector = RecordingCollector()
+
+    assert list(analyze_project(temp_workspace, config, collector)) == ["a.py#main"]
+    assert collector.metrics["files_processed"] == [3]
@@ -0,0 +1,75 @@
+"""Tests for the piped, batching Graphviz render service."""
+import io
+import os
+import sys
+import subprocess
+import pytest
+import graphviz
+from PIL import Image
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from render_service import RenderService, SPLITTERS
+
+# Stand-in for `dot -Tplain`: one document per graph in stdin, one line per call
+FAKE_ENGINE = '''
+import sys
+source = sys.stdin.read()
+with open(sys.argv[0] + '.calls', 'a') as f:
+    f.write(str(source.count('digraph')) + '\\n')
+if 'syntax error' in source:
+    sys.stderr.write('syntax error in line 1')
+    sys.exit(1)
+for _ in range(source.count('digraph')):
+    sys.stdout.write('graph 1 1 1\\nnode stop 0.5 0.5 1 1 stop solid box black white\\nstop\\n')
+'''
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    """Create an executable that behaves like dot for the plain format."""
+    path = tmp_path / "fake_dot"
+    path.write_text(f"#!{sys.executable}\n{FAKE_ENGINE}")
+    path.chmod(0o755)
+    return str(path)
+
+def calls(engine):
+    with open(engine + '.calls') as f:
+        return [int(line) for line in f]
+
+def test_split_concatenated_png():
+    """Test that concatenated PNG streams split back into valid images."""
+    streams = []
+    for color in ('red', 'blue', 'green'):
+        buf = io.BytesIO()
+        Image.new('RGB', (4, 3), color).save(buf, format='PNG')
+        streams.append(buf.getvalue())
+    parts = SPLITTERS['png'](b''.join(streams))
+    assert parts == streams
+    assert Image.open(io.BytesIO(parts[1])).getpixel((0, 0)) == (0, 0, 255)
+
+def test_render_many_batches_graphs(fake_engine):
+    """Test that graphs share Graphviz processes and keep their order."""
+    service = RenderService(max_processes=2, batch_size=16)
+    sources = [f'digraph g{i} {{ n{i} }}' for i in range(8)]
+    outputs = service.render_many(sources, 'plain', engine=fake_engine)
+    service.close()
+
+    assert len(outputs) == 8
+    assert all(output.endswith(b'stop\n') and output.startswith(b'graph') for output in outputs)
+    assert sorted(calls(fake_engine)) == [4, 4]
+
+def test_failed_batch_falls_back_to_single_renders(fake_engine):
+    """Test that one bad graph is isolated and reported with its exit status."""
+    service = RenderService(max_processes=1)
+    sources = ['digraph a { x }', 'digraph b { syntax error }', 'digraph c { y }']
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        service.render_many(sources, 'plain', engine=fake_engine)
+    service.close()
+    assert b'syntax error' in excinfo.value.stderr
+    assert calls(fake_engine) == [3, 1, 1]
+
+def test_missing_executable(tmp_path):
+    """Test that a missing engine raises graphviz.ExecutableNotFound."""
+    service = RenderService()
+    with pytest.raises(graphviz.ExecutableNotFound):
+        service.render('digraph { a }', 'png', engine=str(tmp_path / 'no_such_dot'))
@@ -0,0 +1,108 @@
+"""Tests for error classification, retries and the circuit breaker."""
+import os
+import sys
+import pytest
+import graphviz
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+import retry_policy
+from retry_policy import (CircuitBreaker, CircuitOpenError, classify_error,
+                          configure_retry_policies, TRANSIENT, UNAVAILABLE, INVALID)
+from error_handler import VisualizationError, with_error_handling
+
+@pytest.fixture(autouse=True)
+def fast_policies():
+    """Use zero backoff and a fresh breaker registry for every test."""
+    config = type('Config', (), {
+        'retry_policies': {'default': {'max_attempts': 3, 'initial_delay': 0, 'jitter': 0}},
+        'circuit_breaker_threshold': 2,
+        'circuit_breaker_reset_seconds': 60
+    })
+    configure_retry_policies(config)
+    yield
+    configure_retry_policies(type('Config', (), {}))
+
+def test_classify_errors_through_wrapping():
+    """Test classification by the original error behind a wrapper."""
+    try:
+        try:
+            raise graphviz.ExecutableNotFound(('dot',))
+        except Exception as e:
+            raise VisualizationError(f"Failed: {e}")
+    except VisualizationError as wrapped:
+        assert classify_error(wrapped) == UNAVAILABLE
+
+    assert classify_error(ValueError("bad format")) == INVALID
+    assert classify_error(FileNotFoundError(2, "missing")) == INVALID
+    assert classify_error(TimeoutError()) == TRANSIENT
+    assert classify_error(RuntimeError("flaky")) == TRANSIENT
+
+def test_only_transient_errors_are_retried():
+    """Test that deterministic errors fail on the first attempt."""
+    calls = {"invalid": 0, "flaky": 0}
+
+    @with_error_handling((Exception,), operation="invalid_op")
+    def invalid():
+        calls["invalid"] += 1
+        raise ValueError("malformed graph")
+
+    @with_error_handling((Exception,), operation="flaky_op")
+    def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise TimeoutError("slow backend")
+        return "done"
+
+    with pytest.raises(ValueError):
+        invalid()
+    assert calls["invalid"] == 1
+    assert flaky() == "done"
+    assert calls["flaky"] == 3
+
+def test_circuit_breaker_stops_calling_dead_backend():
+    """Test that an unavailable backend is not called again until reset."""
+    calls = []
+
+    @with_error_handling((Exception,), operation="render")
+    def render():
+        calls.append(1)
+        raise graphviz.ExecutableNotFound(('dot',))
+
+    with pytest.raises(graphviz.ExecutableNotFound):
+        render()
+    for _ in range(5):
+        with pytest.raises(CircuitOpenError):
+            render()
+    assert len(calls) == 1
+
+def test_circuit_breaker_half_open_trial():
+    """Test opening after repeated failures and closing after a successful trial."""
+    breaker = CircuitBreaker("backend", failure_threshold=2, reset_timeout=0)
+    breaker.record_failure(ValueError("bad input"))
+    assert breaker.state == "closed"
+    breaker.record_failure(TimeoutError())
+    breaker.record_failure(TimeoutError())
+    assert breaker.opened_at is not None
+
+    breaker.before_call()  # reset_timeout elapsed: one trial call allowed
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_static_graph_renders_go_through_their_policy(tmp_path):
+    """Test that only create_static_graph is guarded by the static_graph breaker."""
+    from visualizer import DependencyVisualizer
+    config = type('Config', (), {'viz_directory': str(tmp_path), 'graph_format': 'png'})
+    visualizer = DependencyVisualizer(config)
+    metadata = {"a": ["b"], "b": []}
+    breaker = retry_policy.get_circuit_breaker("static_graph")
+    breaker.record_failure(TimeoutError())
+    breaker.record_failure(TimeoutError())
+
+    with pytest.raises(CircuitOpenError):
+        visualizer.create_static_graph(metadata, str(tmp_path / "graph"))
+    graph_metrics = visualizer._get_graph_metrics(metadata)
+    assert len(visualizer._interactive_nodes(metadata, ["a", "b"], graph_metrics, {})) == 2
+    visualizer.close()
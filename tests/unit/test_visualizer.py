@@ -18,6 +18,7 @@ logger = logging.getLogger(__name__)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 from visualizer import DependencyVisualizer
+from error_handler import VisualizationError
 
 @pytest.fixture(scope="module")
 def test_output_dir():
@@ -61,11 +62,14 @@ def test_visualization_creation(sample_metadata, test_config, caplog):
         visualizer.visualize_dependencies(sample_metadata, "test_graph")
         
         # Check if files were created
+        # Metrics are exported as Arrow when pyarrow is installed, else as .npz
+        metrics_file = next((f"{output_base}{suffix}" for suffix in ("_nodes.arrow", "_graph.npz")
+                             if os.path.exists(f"{output_base}{suffix}")), f"{output_base}_graph.npz")
         files_to_check = [
             (f"{output_base}.{test_config.graph_format}", "Static graph"),
             (f"{output_base}.html", "Interactive graph"),
             (f"{output_base}_flow.gif", "Animated flow"),
-            (f"{output_base}_metrics.json", "Metrics file")
+            (metrics_file, "Metrics file")
         ]
         
         for file_path, file_desc in files_to_check:
@@ -90,6 +94,8 @@ def test_empty_metadata_handling(test_config):
     assert not os.path.exists(f"{output_base}.html")
     assert not os.path.exists(f"{output_base}_flow.gif")
     assert not os.path.exists(f"{output_base}_metrics.json")
+    assert not os.path.exists(f"{output_base}_nodes.arrow")
+    assert not os.path.exists(f"{output_base}_graph.npz")
 
 def test_metrics_generation(sample_metadata, test_config):
     """Test that metrics are generated correctly."""
@@ -144,4 +150,80 @@ def test_error_handling(test_config):
     
     logger.debug("Checking that graph was created despite invalid references")
     output_base = os.path.join(test_config.viz_directory, "error_test")
-    assert os.path.exists(f"{output_base}.{test_config.graph_format}"), "Graph should be created even with invalid references"
\ No newline at end of file
+    assert os.path.exists(f"{output_base}.{test_config.graph_format}"), "Graph should be created even with invalid references"
+
+class RecordingCollector:
+    """Minimal stand-in for MetricsCollector.record_metric."""
+    def __init__(self):
+        self.metrics = {}
+
+    def record_metric(self, name, value):
+        self.metrics.setdefault(name, []).append(value)
+
+def test_format_selection_skips_other_artifacts(sample_metadata, test_config):
+    """Test that only the selected artifacts are produced and timed."""
+    visualizer = DependencyVisualizer(test_config)
+    collector = RecordingCollector()
+    visualizer.visualize_dependencies(sample_metadata, "formats_test",
+                                      formats=["interactive", "metrics"],
+                                      metrics_collector=collector)
+
+    output_base = os.path.join(test_config.viz_directory, "formats_test")
+    assert os.path.exists(f"{output_base}.html")
+    assert any(os.path.exists(f"{output_base}{suffix}") for suffix in ("_nodes.arrow", "_graph.npz"))
+    assert not os.path.exists(f"{output_base}.{test_config.graph_format}")
+    assert not os.path.exists(f"{output_base}_flow.gif")
+    assert set(collector.metrics) == {"visualization_interactive_time", "visualization_metrics_time"}
+
+def test_failing_artifact_does_not_block_others(sample_metadata, test_output_dir):
+    """Test that a failed artifact is reported after the others complete."""
+    config = type('Config', (), {
+        'viz_directory': test_output_dir,
+        'graph_format': 'not-a-format'
+    })
+    visualizer = DependencyVisualizer(config)
+    collector = RecordingCollector()
+    with pytest.raises(VisualizationError, match="static"):
+        visualizer.visualize_dependencies(sample_metadata, "isolation_test",
+                                          formats=["static", "interactive"],
+                                          metrics_collector=collector)
+
+    assert os.path.exists(os.path.join(test_output_dir, "isolation_test.html"))
+    # The failed render must not leave an empty or partial image behind
+    assert not os.path.exists(os.path.join(test_output_dir, "isolation_test.not-a-format"))
+    assert not [name for name in os.listdir(test_output_dir) if name.endswith('.tmp')]
+    assert collector.metrics["visualization_static_errors"] == [1]
+    assert "visualization_interactive_time" in collector.metrics
+
+def test_component_graph_contains_only_its_members(test_config):
+    """Test that a component's DOT source is built from its own functions."""
+    metadata = {"a": ["b"], "b": [], "c": ["d"], "d": [], "e": []}
+    visualizer = DependencyVisualizer(test_config)
+    source = visualizer._build_static_graph(metadata, ["c", "d"]).source
+
+    assert "d -> c" in source
+    assert all(f"\t{func} [" not in source for func in ("a", "b", "e"))
+    assert "\tc [" in source and "\td [" in source
+
+def test_incremental_interactive_graph_reuses_untouched_components(test_config):
+    """Test that an incremental update rebuilds only the changed component's entries."""
+    metadata = {"a": ["b"], "b": [], "c": ["d"], "d": []}
+    updated = dict(metadata, d=["e"], e=[])
+    output_base = os.path.join(test_config.viz_directory, "incremental")
+    visualizer = DependencyVisualizer(test_config)
+    visualizer.incremental = True
+    visualizer.create_interactive_graph(metadata, output_base)
+    before = visualizer._interactive_parts[frozenset({"a", "b"})]
+
+    visualizer.create_interactive_graph(updated, output_base, changed={"d", "e"})
+    after = visualizer._interactive_parts[frozenset({"a", "b"})]
+    assert after[2] is before[2]
+    assert frozenset({"c", "d", "e"}) in visualizer._interactive_parts
+
+    fresh = DependencyVisualizer(test_config)
+    functions = list(updated)
+    expected = fresh._interactive_nodes(updated, functions, fresh._get_graph_metrics(updated), {})
+    nodes = [node for part in visualizer._interactive_parts.values() for node in part[1]]
+    assert sorted(node["id"] for node in nodes) == sorted(node["id"] for node in expected)
+    sizes = {node["id"]: node["size"] for node in expected}
+    assert all(node["size"] == pytest.approx(sizes[node["id"]]) for node in nodes)
@@ -0,0 +1,109 @@
+"""Tests for watch mode: tree scans, graph diffs and incremental updates."""
+import os
+import sys
+import itertools
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+from config import load_config
+from watcher import ProjectWatcher, scan_tree, diff_stamps, diff_graphs
+
+def function_source(name, deps):
+    return f'''
+def {name}():
+    """
+    Metadata:
+    dependencies: [{", ".join(deps)}]
+    """
+'''
+
+def write(path, functions):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(function_source(name, deps) for name, deps in functions.items()))
+    # Make sure the edit is visible even on coarse mtime clocks
+    stamp = os.stat(path).st_mtime_ns + 1_000_000_000 * next(_ticks)
+    os.utime(path, ns=(stamp, stamp))
+
+_ticks = itertools.count(1)
+
+class RecordingVisualizer:
+    """Stands in for DependencyVisualizer and records every render."""
+    def __init__(self):
+        self.incremental = False
+        self.renders = []
+        self.changes = []
+
+    def visualize_dependencies(self, metadata, base_name, metrics_collector=None, changed=None):
+        self.renders.append(dict(metadata))
+        self.changes.append(changed)
+
+@pytest.fixture
+def project(temp_workspace):
+    write(os.path.join(temp_workspace, 'a.py'), {'main': ['helper'], 'helper': []})
+    write(os.path.join(temp_workspace, 'pkg', 'b.py'), {'other': []})
+    write(os.path.join(temp_workspace, '.venv', 'skip.py'), {'ignored': []})
+    return temp_workspace
+
+@pytest.fixture
+def watcher(project, temp_workspace):
+    config = load_config(os.path.join(temp_workspace, 'missing.yaml'))
+    config.cache_directory = os.path.join(temp_workspace, '.cache')
+    config.excluded_directories = ['.venv', '.cache']
+    return ProjectWatcher(project, config, RecordingVisualizer(), 'project')
+
+def test_scan_prunes_excluded_directories(project):
+    """Test that only supported files outside excluded directories are stamped."""
+    stamps = scan_tree(project, {'.py'}, {'.venv'})
+    assert sorted(os.path.relpath(path, project) for path in stamps) == ['a.py', os.path.join('pkg', 'b.py')]
+
+def test_diffs():
+    """Test file and graph diffs."""
+    assert diff_stamps({'a': (1, 1), 'b': (1, 1)}, {'a': (2, 1), 'c': (1, 1)}) == (['a', 'c'], ['b'])
+    old = {'f': ['g'], 'g': [], 'h': []}
+    new = {'f': ['g', 'h'], 'h': [], 'k': []}
+    assert diff_graphs(old, new) == {'f', 'g', 'k'}
+    assert diff_graphs(new, new) == set()
+
+def test_refresh_reanalyzes_only_changed_files(watcher, project):
+    """Test that an edit re-reads one file and triggers one re-render."""
+    watcher.start()
+    assert watcher.visualizer.incremental
+    assert set(watcher.visualizer.renders[-1]) == {'a.py#main', 'a.py#helper', 'pkg/b.py#other'}
+    assert watcher.refresh() is None
+
+    analyzed = []
+    analyze = watcher.analyzer.analyze_files_parallel
+    watcher.analyzer.analyze_files_parallel = lambda files, func: analyzed.extend(files) or analyze(files, func)
+
+    write(os.path.join(project, 'pkg', 'b.py'), {'other': ['helper']})
+    assert watcher.refresh() == {'pkg/b.py#other'}
+    assert analyzed == [os.path.join(project, 'pkg', 'b.py')]
+    assert watcher.visualizer.renders[-1]['pkg/b.py#other'] == ['a.py#helper']
+    assert watcher.visualizer.changes == [None, {'pkg/b.py#other'}]
+
+    os.remove(os.path.join(project, 'pkg', 'b.py'))
+    assert watcher.refresh() == {'pkg/b.py#other', 'a.py#helper'}
+    assert set(watcher.visualizer.renders[-1]) == {'a.py#main', 'a.py#helper'}
+
+def test_edit_without_graph_change_skips_render(watcher, project):
+    """Test that a change that leaves the graph intact does not re-render."""
+    watcher.start()
+    with open(os.path.join(project, 'a.py'), 'a', encoding='utf-8') as f:
+        f.write('\n# comment\n')
+    assert watcher.refresh() == set()
+    assert len(watcher.visualizer.renders) == 1
+
+def test_selection_is_diffed_against_the_last_render(watcher, project):
+    """Test that edits outside the selection skip the render and others pass their diff."""
+    watcher.select = lambda metadata: {func: deps for func, deps in metadata.items() if func.startswith('a.py')}
+    watcher.start()
+
+    write(os.path.join(project, 'pkg', 'b.py'), {'other': ['helper']})
+    assert watcher.refresh() == {'pkg/b.py#other'}
+    assert len(watcher.visualizer.renders) == 1
+
+    write(os.path.join(project, 'a.py'), {'main': [], 'helper': []})
+    assert watcher.refresh() == {'a.py#main'}
+    assert watcher.visualizer.changes[-1] == {'a.py#main'}
@@ -1,26 +1,79 @@
 from pyvis.network import Network
+from pyvis.node import Node
+from pyvis.edge import Edge
 import networkx as nx
 from graphviz import Digraph
 import os
-from typing import Dict, List, Optional, Set
-import json
+import io
+import time
+import tempfile
+import concurrent.futures
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 import colorsys
 import logging
 import traceback
 from debug_logger import debug
-import imageio
-import tempfile
-import shutil
 from PIL import Image
-import numpy as np
 from error_handler import VisualizationError, with_error_handling
+from graph_metrics import GraphMetrics
+from graph_algorithms import weakly_connected_components, group_edges_by_level
+from flow_animator import FlowAnimator, GraphLayout, pack_layouts, parse_plain_layout
+from render_service import RenderService
+from layout_engine import compute_layout, extend_layout
+from graph_export import export_graph
+from profiler import get_profiler
+
+# Output formats the component packer can compose with PIL
+RASTER_FORMATS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+
+# Artifacts visualize_dependencies can produce, selected with --formats
+ARTIFACTS = ('static', 'interactive', 'animation', 'metrics')
 
 logger = logging.getLogger(__name__)
 
+def write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to a temp file next to ``path`` and rename it into place.
+
+    A failure before the rename leaves any earlier ``path`` untouched and
+    no partial file behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 class DependencyVisualizer:
     def __init__(self, config):
         self.config = config
-        self.metrics_cache = {}
+        self._metrics_dict: Optional[Dict[str, Dict[str, Any]]] = None
+        self._graph_metrics = None
+        self._graph_metrics_source = None
+        # Components (largest first) and their DOT sources for the last graph
+        self._components_source = None
+        self._components: List[Set[str]] = []
+        self._sources_source = None
+        self._sources: List[str] = []
+        # Incremental mode (watch): keep node positions, centralities and
+        # per-component sources, renders, layouts and vis.js entries from the
+        # previous run and redo only the components that changed
+        self.incremental = False
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._component_sources: Dict[FrozenSet[str], str] = {}
+        self._component_renders: Dict[str, bytes] = {}
+        self._component_layouts: Dict[str, GraphLayout] = {}
+        self._interactive_parts: Dict[FrozenSet[str], Tuple[Tuple[float, float], List[dict], List[dict]]] = {}
+        # Shared Graphviz pipe renderer for every graph this visualizer draws
+        self.render_service = RenderService(
+            max_processes=getattr(config, 'render_processes', None),
+            batch_size=getattr(config, 'render_batch_size', 16)
+        )
         # Enhanced color scheme using color theory
         self.colors = {
             'no_deps': '#4a90e2',      # Professional blue
@@ -32,11 +85,81 @@ class DependencyVisualizer:
             'text': '#2c3e50'          # Dark blue-gray
         }
         
+    def close(self) -> None:
+        """Stop the Graphviz worker pool."""
+        self.render_service.close()
+
+    def _get_graph_metrics(self, metadata: Dict[str, List[str]],
+                           changed: Optional[Set[str]] = None) -> GraphMetrics:
+        """Return metrics for ``metadata``, computing them once per graph.
+
+        In incremental mode centralities are kept per component, and those
+        of components without ``changed`` functions are reused.
+        """
+        if self._graph_metrics is None or self._graph_metrics_source is not metadata:
+            if self.incremental:
+                self._graph_metrics = GraphMetrics(metadata, by_component=True,
+                                                   previous=self._graph_metrics, changed=changed)
+            else:
+                self._graph_metrics = GraphMetrics(metadata)
+            self._graph_metrics_source = metadata
+            self._metrics_dict = None
+        return self._graph_metrics
+
+    @property
+    def metrics_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics of every function of the last graph, built on first access."""
+        if self._metrics_dict is None:
+            self._metrics_dict = self._graph_metrics.as_dict() if self._graph_metrics is not None else {}
+        return self._metrics_dict
+
+    def _get_components(self, metadata: Dict[str, List[str]]) -> List[Set[str]]:
+        """Weakly connected components of ``metadata``, largest first."""
+        if self._components_source is not metadata:
+            self._components = sorted(self._group_related_functions(metadata), key=len, reverse=True)
+            self._components_source = metadata
+        return self._components
+
+    def _reusable(self, component: Set[str], changed: Optional[Set[str]]) -> bool:
+        """Whether an incremental update left ``component`` exactly as it was.
+
+        Cached entries are keyed by the component's members, so together with
+        containing no changed function this means the same nodes and edges.
+        """
+        return self.incremental and changed is not None and component.isdisjoint(changed)
+
+    def _get_component_sources(self, metadata: Dict[str, List[str]],
+                               changed: Optional[Set[str]] = None) -> List[str]:
+        """DOT source of each component, in the order of _get_components.
+
+        In incremental mode untouched components keep their previous source
+        without being rebuilt.
+        """
+        if self._sources_source is metadata:
+            return self._sources
+        previous = self._component_sources
+        position = None
+        sources = {}
+        ordered = []
+        for component in self._get_components(metadata):
+            key = frozenset(component)
+            source = previous.get(key) if self._reusable(component, changed) else None
+            if source is None:
+                if position is None:
+                    # Members in metadata order, so an unchanged component has unchanged DOT source
+                    position = {func: i for i, func in enumerate(metadata)}
+                source = self._build_static_graph(metadata, sorted(component, key=position.__getitem__)).source
+            sources[key] = source
+            ordered.append(source)
+        if self.incremental:
+            self._component_sources = sources
+        self._sources = ordered
+        self._sources_source = metadata
+        return ordered
+    
     def _calculate_node_importance(self, func: str, metadata: Dict[str, List[str]]) -> float:
-        """Calculate node importance based on connections."""
-        incoming = len([f for f, deps in metadata.items() if func in deps])
-        outgoing = len(metadata.get(func, []))
-        return incoming + outgoing
+        """Calculate node importance as its PageRank centrality."""
+        return self._get_graph_metrics(metadata).importance(func)
     
     def _generate_gradient_color(self, importance: float, max_importance: float) -> str:
         """Generate a color gradient based on node importance."""
@@ -51,41 +174,51 @@ class DependencyVisualizer:
         rgb = colorsys.hsv_to_rgb(hue, saturation, value)
         return f"#{int(rgb[0]*255):02x}{int(rgb[1]*255):02x}{int(rgb[2]*255):02x}"
     
-    @with_error_handling((Exception,), max_retries=2)
-    def create_interactive_graph(self, metadata: Dict[str, List[str]], output_path: str):
-        """Create an interactive HTML visualization using pyvis."""
+    @with_error_handling((Exception,), operation='interactive_graph')
+    def create_interactive_graph(self, metadata: Dict[str, List[str]], output_path: str,
+                                 changed: Optional[Set[str]] = None):
+        """Create an interactive HTML visualization using pyvis.
+
+        Node and edge entries are assembled directly rather than through
+        ``Network.add_node``/``add_edge``, whose duplicate checks scan every
+        node and edge added so far. In incremental mode the entries of
+        components without ``changed`` functions are reused.
+        """
         try:
             # Ensure output path is absolute
             output_path = os.path.abspath(output_path)
             html_path = f"{output_path}.html"
             
-            # Initialize network
-            net = Network(height="900px", width="100%", bgcolor=self.colors['background'])
-            net.force_atlas_2based(gravity=-50, central_gravity=0.01, spring_length=100)
-            
             # Calculate node importance
-            importance_values = {func: self._calculate_node_importance(func, metadata) for func in metadata}
-            max_importance = max(importance_values.values()) if importance_values else 1
-            
-            # Add nodes
-            for func in metadata:
-                importance = importance_values[func]
-                size = 25 + (importance * 5)
-                color = self._generate_gradient_color(importance, max_importance)
-                
-                net.add_node(
-                    func,
-                    label=func,
-                    title=self._create_node_tooltip(func, metadata),
-                    size=size,
-                    color=color
-                )
+            graph_metrics = self._get_graph_metrics(metadata)
             
-            # Add edges
-            for func, deps in metadata.items():
-                for dep in deps:
-                    if dep in metadata:
-                        net.add_edge(dep, func)
+            # Initialize network; unless the browser should run the physics
+            # simulation, place nodes at precomputed coordinates
+            net = Network(height="900px", width="100%", bgcolor=self.colors['background'])
+            layout_method = getattr(self.config, 'interactive_layout', 'auto')
+            positions = {}
+            if layout_method == 'browser':
+                net.force_atlas_2based(gravity=-50, central_gravity=0.01, spring_length=100)
+            else:
+                if self.incremental and self._positions:
+                    positions = extend_layout(self._positions, graph_metrics.nodes,
+                                              graph_metrics.src, graph_metrics.dst)
+                else:
+                    positions = compute_layout(graph_metrics.nodes, graph_metrics.src, graph_metrics.dst,
+                                               method=layout_method, render_service=self.render_service)
+                self._positions = positions
+                net.toggle_physics(False)
+            
+            if self.incremental:
+                nodes, edges = self._incremental_elements(metadata, graph_metrics, positions, changed)
+            else:
+                functions = list(metadata)
+                nodes = self._interactive_nodes(metadata, functions, graph_metrics, positions)
+                edges = self._interactive_edges(metadata, functions)
+            net.nodes = nodes
+            net.edges = edges
+            net.node_ids = [node['id'] for node in nodes]
+            net.node_map = {node['id']: node for node in nodes}
             
             # Save the network
             net.save_graph(html_path)
@@ -95,79 +228,191 @@ class DependencyVisualizer:
             logger.error(f"Error in interactive graph creation: {str(e)}", exc_info=True)
             raise VisualizationError(f"Failed to create interactive graph: {str(e)}")
     
-    @with_error_handling((Exception,), max_retries=2)
+    def _interactive_nodes(self, metadata: Dict[str, List[str]], functions: List[str],
+                           graph_metrics: GraphMetrics,
+                           positions: Dict[str, Tuple[float, float]]) -> List[dict]:
+        """vis.js node entries for ``functions``, as ``Network.add_node`` builds them."""
+        max_importance = graph_metrics.max_importance
+        nodes = []
+        for func in functions:
+            importance = graph_metrics.importance(func)
+            size = 25 + (50 * importance / max_importance if max_importance else 0)
+            color = self._generate_gradient_color(importance, max_importance)
+            placement = {}
+            if func in positions:
+                placement = {'x': positions[func][0], 'y': positions[func][1], 'physics': False}
+            nodes.append(Node(func, 'dot', label=func, color=color,
+                              title=self._create_node_tooltip(func, metadata),
+                              size=size, **placement).options)
+        return nodes
+
+    def _interactive_edges(self, metadata: Dict[str, List[str]], functions: List[str]) -> List[dict]:
+        """vis.js edge entries for the dependencies of ``functions``.
+
+        The network is undirected, so like ``Network.add_edge`` this keeps
+        one edge per node pair.
+        """
+        edges = []
+        seen = set()
+        for func in functions:
+            for dep in metadata[func]:
+                if dep in metadata:
+                    pair = (dep, func) if dep <= func else (func, dep)
+                    if pair not in seen:
+                        seen.add(pair)
+                        edges.append(Edge(dep, func).options)
+        return edges
+
+    def _incremental_elements(self, metadata: Dict[str, List[str]], graph_metrics: GraphMetrics,
+                              positions: Dict[str, Tuple[float, float]],
+                              changed: Optional[Set[str]]) -> Tuple[List[dict], List[dict]]:
+        """vis.js entries per component, reusing those of untouched components.
+
+        Edges of an untouched component are always reused. Its nodes show
+        absolute PageRank and are sized against the largest one, so they
+        are rebuilt from the reused metrics when the global rank scale (see
+        GraphMetrics) or the maximum moved.
+        """
+        previous = self._interactive_parts
+        scale = (graph_metrics.rank_scale, graph_metrics.max_importance)
+        parts = {}
+        nodes: List[dict] = []
+        edges: List[dict] = []
+        reused = 0
+        for component in self._get_components(metadata):
+            key = frozenset(component)
+            part = previous.get(key) if self._reusable(component, changed) else None
+            if part is None:
+                members = sorted(component)
+                part = (scale, self._interactive_nodes(metadata, members, graph_metrics, positions),
+                        self._interactive_edges(metadata, members))
+            else:
+                reused += 1
+                if part[0] != scale:
+                    part = (scale, self._interactive_nodes(metadata, sorted(component), graph_metrics, positions),
+                            part[2])
+            parts[key] = part
+            nodes.extend(part[1])
+            edges.extend(part[2])
+        self._interactive_parts = parts
+        logger.debug(f"Reused interactive entries of {reused} of {len(parts)} components")
+        return nodes, edges
+
+    @with_error_handling((Exception,), operation='static_graph')
     def create_static_graph(self, metadata: Dict[str, List[str]], output_path: str):
-        """Create a static visualization using Graphviz."""
+        """Create a static visualization using Graphviz.
+
+        Returns the Graphviz graph when it is rendered in one piece, and None
+        when the components are laid out separately.
+        """
         if not metadata:
             logger.warning("No metadata to visualize")
             return None
             
         try:
-            # Create graph
-            dot = Digraph(comment='Function Dependencies')
-            dot.attr(rankdir='LR', splines='ortho')
-            
-            # Add nodes
-            for func in metadata:
-                self._add_node_to_graph(dot, func, metadata)
-            
-            # Add edges
-            for func, deps in metadata.items():
-                for dep in deps:
-                    if dep in metadata:
-                        dot.edge(dep, func)
-            
             # Set output path
             output_path = os.path.abspath(output_path)
-            dot.render(output_path, format=self.config.graph_format, cleanup=True)
-            logger.info(f"Static visualization saved to {output_path}.{self.config.graph_format}")
+            graph_format = self.config.graph_format
+            layout_mode = getattr(self.config, 'graph_layout_mode', 'single')
+            dot = None
+            if (layout_mode == 'components' or self.incremental) and graph_format in RASTER_FORMATS:
+                self._render_components(metadata, output_path)
+            else:
+                dot = self._build_static_graph(metadata)
+                # Render fully before touching the output file
+                data = self.render_service.render(dot.source, graph_format, engine=dot.engine)
+                write_atomic(f"{output_path}.{graph_format}", data)
+            logger.info(f"Static visualization saved to {output_path}.{graph_format}")
             return dot
             
         except Exception as e:
             logger.error(f"Error in static graph creation: {str(e)}", exc_info=True)
             raise VisualizationError(f"Failed to create static graph: {str(e)}")
 
+    def _build_static_graph(self, metadata: Dict[str, List[str]],
+                            functions: Optional[List[str]] = None) -> Digraph:
+        """Build the Graphviz graph for all functions, or only ``functions``.
+
+        Only the members of ``functions`` are visited, so building one graph
+        per component costs the size of the component, not of ``metadata``.
+        """
+        dot = Digraph(comment='Function Dependencies')
+        dot.attr(rankdir='LR', splines='ortho')
+        members = list(metadata) if functions is None else functions
+        
+        # Add nodes
+        for func in members:
+            self._add_node_to_graph(dot, func, metadata)
+        
+        # Add edges
+        for func in members:
+            for dep in metadata[func]:
+                if dep in metadata:
+                    dot.edge(dep, func)
+        return dot
+
+    def _render_components(self, metadata: Dict[str, List[str]], output_path: str) -> str:
+        """Lay out each connected component separately and pack them into one image.
+
+        Graphviz layout cost grows superlinearly with graph size, so several
+        small layouts run concurrently finish well ahead of one large layout.
+        In incremental mode a component whose DOT source is unchanged since
+        the previous run reuses its earlier rendering.
+        """
+        sources = self._get_component_sources(metadata)
+        
+        cache = self._component_renders if self.incremental else {}
+        stale = list(dict.fromkeys(source for source in sources if source not in cache))
+        rendered = dict(zip(stale, self.render_service.render_many(stale, 'png')))
+        rendered.update((source, cache[source]) for source in sources if source in cache)
+        if self.incremental:
+            # Keep only the current components so the cache cannot grow without bound
+            self._component_renders = rendered
+        
+        images = [Image.open(io.BytesIO(rendered[source])).convert('RGB') for source in sources]
+        packed = self._pack_images(images)
+        image_path = f"{output_path}.{self.config.graph_format}"
+        buffer = io.BytesIO()
+        packed.save(buffer, format=Image.registered_extensions()[f".{self.config.graph_format}"])
+        write_atomic(image_path, buffer.getvalue())
+        logger.info(f"Rendered {len(stale)} of {len(sources)} components into {image_path}")
+        return image_path
+
+    def _pack_images(self, images: List[Image.Image], padding: int = 20) -> Image.Image:
+        """Pack images onto one canvas using shelves of decreasing height."""
+        order = sorted(range(len(images)), key=lambda i: images[i].height, reverse=True)
+        total_area = sum((img.width + padding) * (img.height + padding) for img in images)
+        shelf_width = max(max(img.width for img in images) + padding, int(total_area ** 0.5 * 1.2))
+        
+        positions = {}
+        x = y = padding
+        shelf_height = 0
+        for i in order:
+            img = images[i]
+            if x > padding and x + img.width + padding > shelf_width:
+                x = padding
+                y += shelf_height + padding
+                shelf_height = 0
+            positions[i] = (x, y)
+            x += img.width + padding
+            shelf_height = max(shelf_height, img.height)
+        
+        width = max(positions[i][0] + images[i].width for i in order) + padding
+        height = y + shelf_height + padding
+        canvas = Image.new('RGB', (width, height), self.colors['background'])
+        for i, img in enumerate(images):
+            canvas.paste(img, positions[i])
+        return canvas
+
     def _group_related_functions(self, metadata: Dict[str, List[str]]) -> List[Set[str]]:
         """Group related functions based on their dependencies."""
-        groups: List[Set[str]] = []
-        processed = set()
-
-        def get_related_functions(func: str, related: Optional[Set[str]] = None) -> Set[str]:
-            if related is None:
-                related = set()
-            related.add(func)
-            
-            # Add dependencies
-            for dep in metadata.get(func, []):
-                if dep not in related and dep in metadata:
-                    get_related_functions(dep, related)
-            
-            # Add functions that depend on this one
-            for f, deps in metadata.items():
-                if func in deps and f not in related and f in metadata:
-                    get_related_functions(f, related)
-                    
-            return related
-
-        # Process all functions
-        for func in metadata:
-            if func not in processed:
-                related = get_related_functions(func)
-                groups.append(related)
-                processed.update(related)
-
-        return groups
+        return weakly_connected_components(metadata)
 
     def _add_node_to_graph(self, graph, func: str, metadata: Dict[str, List[str]]):
         """Add a node to the graph with appropriate styling."""
         try:
-            # Calculate metrics
-            metrics = {
-                'in_degree': len([f for f, d in metadata.items() if func in d]),
-                'out_degree': len(metadata.get(func, [])),
-                'is_recursive': func in metadata.get(func, [])
-            }
-            self.metrics_cache[func] = metrics
+            # Look up precomputed metrics
+            metrics = self._get_graph_metrics(metadata).node_metrics(func)
             
             # Set node attributes
             attrs = {
@@ -195,143 +440,160 @@ class DependencyVisualizer:
 
     def _create_node_tooltip(self, func: str, metadata: Dict[str, List[str]]) -> str:
         """Create a detailed node tooltip."""
-        metrics = self.metrics_cache.get(func, {
-            'in_degree': len([f for f, d in metadata.items() if func in d]),
-            'out_degree': len(metadata.get(func, [])),
-            'is_recursive': func in metadata.get(func, [])
-        })
+        metrics = self._get_graph_metrics(metadata).node_metrics(func)
         
         return (
             f"Function: {func}\n"
             f"Dependencies: {metrics['out_degree']}\n"
             f"Used by: {metrics['in_degree']}\n"
+            f"PageRank: {metrics['pagerank']:.4f}\n"
+            f"Betweenness: {metrics['betweenness']:.1f}\n"
             f"Type: {'Recursive' if metrics['is_recursive'] else 'Normal'}"
         )
     
     def export_metrics(self, output_path: str):
-        """Export node metrics as JSON."""
+        """Export the node table and edge list for the current graph."""
         try:
-            metrics_file = f"{output_path}_metrics.json"
-            
-            if not self.metrics_cache:
+            if self._graph_metrics is None:
                 logger.warning("No metrics to export")
                 return
-                
-            with open(metrics_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metrics_cache, f, indent=2)
-            logger.info(f"Metrics exported to {metrics_file}")
+            
+            export_format = getattr(self.config, 'metrics_export_format', 'auto')
+            paths = export_graph(self._graph_metrics, output_path, export_format)
+            logger.info(f"Metrics exported to {', '.join(paths)}")
             
         except Exception as e:
             logger.error(f"Error exporting metrics: {str(e)}", exc_info=True)
 
-    def visualize_dependencies(self, metadata: Dict[str, List[str]], base_name: str):
-        """Create static, interactive, and animated flow visualizations."""
+    def visualize_dependencies(self, metadata: Dict[str, List[str]], base_name: str,
+                               formats: Optional[List[str]] = None, metrics_collector=None,
+                               changed: Optional[Set[str]] = None):
+        """Create the selected visualizations concurrently.
+
+        ``formats`` defaults to ``config.output_formats`` and then to every
+        artifact. Each artifact is timed into ``metrics_collector``; a failing
+        artifact does not stop the others, and the failures are reported
+        together once all of them have finished. In incremental mode,
+        ``changed`` names the functions that differ from the previous call;
+        metrics, layouts and renders of components without them are reused.
+        """
         if not metadata:
             logger.warning("No metadata to visualize")
             return
+        
+        if formats is None:
+            formats = getattr(self.config, 'output_formats', None) or list(ARTIFACTS)
+        unknown = [name for name in formats if name not in ARTIFACTS]
+        if unknown:
+            raise VisualizationError(f"Unknown output formats: {', '.join(unknown)}")
+        selected = [name for name in ARTIFACTS if name in formats]
             
         # Ensure we have absolute paths
         output_base = os.path.abspath(os.path.join(self.config.viz_directory, base_name))
         os.makedirs(os.path.dirname(output_base), exist_ok=True)
         
-        logger.info(f"Creating visualizations in: {output_base}")
+        logger.info(f"Creating visualizations in: {output_base} ({', '.join(selected)})")
         
+        profiler = get_profiler()
         try:
-            # Create static visualization
-            static_graph = self.create_static_graph(metadata, output_base)
-            if not static_graph:
-                logger.error("Failed to create static visualization")
-            
-            # Create interactive visualization
-            self.create_interactive_graph(metadata, output_base)
-            
-            # Create animated flow visualization
-            self.create_animated_flow(metadata, output_base)
-            
-            # Export metrics
-            self.export_metrics(output_base)
-            
+            # Compute graph metrics once for every renderer and the export
+            with profiler.span('graph_metrics'):
+                graph_metrics = self._get_graph_metrics(metadata, changed)
+            if self.incremental:
+                logger.info(f"Reused metrics of {graph_metrics.reused} of {len(graph_metrics.nodes)} functions")
+                # Shared by the static, interactive and animation renderers;
+                # built here so the renderer threads do not race to build them
+                self._get_component_sources(metadata, changed)
         except Exception as e:
             logger.error(f"Error in visualization process: {str(e)}", exc_info=True)
             raise VisualizationError(f"Failed to create visualizations: {str(e)}")
+        
+        renderers = {
+            'static': lambda: self.create_static_graph(metadata, output_base),
+            'interactive': lambda: self.create_interactive_graph(metadata, output_base, changed),
+            'animation': lambda: self.create_animated_flow(metadata, output_base),
+            'metrics': lambda: self.export_metrics(output_base)
+        }
+        
+        def run(name: str) -> float:
+            start = time.perf_counter_ns()
+            try:
+                renderers[name]()
+            finally:
+                elapsed_ns = time.perf_counter_ns() - start
+                if profiler.enabled:
+                    profiler.record(f"render_{name}", elapsed_ns)
+                elapsed = elapsed_ns / 1e9
+                if metrics_collector is not None:
+                    metrics_collector.record_metric(f"visualization_{name}_time", elapsed)
+            return elapsed
+        
+        failures = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(selected)) as executor:
+            futures = {executor.submit(run, name): name for name in selected}
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                try:
+                    logger.info(f"Created {name} visualization in {future.result():.2f}s")
+                except Exception as e:
+                    logger.error(f"Error creating {name} visualization: {str(e)}", exc_info=True)
+                    if metrics_collector is not None:
+                        metrics_collector.record_metric(f"visualization_{name}_errors", 1)
+                    failures[name] = e
+        
+        if failures:
+            details = '; '.join(f"{name}: {error}" for name, error in failures.items())
+            raise VisualizationError(f"Failed to create visualizations: {details}")
+
+    def _component_layout(self, metadata: Dict[str, List[str]]) -> GraphLayout:
+        """Lay out each component on its own and pack them into one layout.
+
+        Layouts are kept per DOT source, so only components that changed
+        since the last run go through Graphviz again.
+        """
+        sources = self._get_component_sources(metadata)
+        cache = self._component_layouts
+        stale = list(dict.fromkeys(source for source in sources if source not in cache))
+        plains = self.render_service.render_many(stale, 'plain')
+        layouts = {source: parse_plain_layout(plain.decode('utf-8')) for source, plain in zip(stale, plains)}
+        layouts.update((source, cache[source]) for source in sources if source in cache)
+        # Keep only the current components so the cache cannot grow without bound
+        self._component_layouts = layouts
+        logger.debug(f"Laid out {len(stale)} of {len(sources)} components for the animation")
+        return pack_layouts([layouts[source] for source in sources])
 
     def create_animated_flow(self, metadata: Dict[str, List[str]], output_path: str):
         """Create an animated GIF showing the flow of function calls."""
         try:
-            frames_dir = tempfile.mkdtemp()
-            frames = []
-            target_size = (800, 500)  # Fixed size for all frames
-            
-            # Create a base graph with all nodes but no edges
-            dot = Digraph(comment='Function Flow Animation')
-            dot.attr(rankdir='LR', splines='ortho')
-            
-            # Add all nodes first
-            for func in metadata:
-                self._add_node_to_graph(dot, func, metadata)
-            
-            # Generate frames by progressively adding edges
-            processed_edges = set()
-            frame_count = 0
-            
-            def add_frame(graph, frame_path):
-                # Render the graph
-                graph.render(frame_path, format='png', cleanup=True)
-                
-                # Open with PIL and resize to target size
-                with Image.open(f"{frame_path}.png") as img:
-                    img = img.resize(target_size, Image.Resampling.LANCZOS)
-                    # Convert to RGB to ensure consistent format
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    # Convert to numpy array for imageio
-                    frame_array = np.array(img)
-                    frames.append(frame_array)
-            
-            # Add initial frame with just nodes
-            base_frame = os.path.join(frames_dir, f"frame_{frame_count:03d}")
-            add_frame(dot, base_frame)
-            frame_count += 1
-            
-            # Create frames for each edge addition
-            for func, deps in metadata.items():
-                for dep in deps:
-                    if dep in metadata and (dep, func) not in processed_edges:
-                        # Create new graph with current edge highlighted
-                        flow_dot = dot.copy()
-                        
-                        # Add all previously processed edges in normal style
-                        for processed_edge in processed_edges:
-                            flow_dot.edge(processed_edge[0], processed_edge[1], color='gray')
-                        
-                        # Add new edge with highlight
-                        flow_dot.edge(dep, func, color='red', penwidth='2.0')
-                        
-                        # Save frame
-                        frame_path = os.path.join(frames_dir, f"frame_{frame_count:03d}")
-                        add_frame(flow_dot, frame_path)
-                        
-                        frame_count += 1
-                        processed_edges.add((dep, func))
-            
-            # Generate final frame showing complete graph
-            final_dot = dot.copy()
-            for edge in processed_edges:
-                final_dot.edge(edge[0], edge[1], color='gray')
-            final_frame = os.path.join(frames_dir, f"frame_{frame_count:03d}")
-            add_frame(final_dot, final_frame)
+            animator = FlowAnimator(self.colors, target_size=(800, 500), render_service=self.render_service)
+            if self.incremental:
+                layout = self._component_layout(metadata)
+            else:
+                # Lay out the complete graph once; every frame reuses these coordinates
+                layout = animator.compute_layout(self._build_static_graph(metadata))
+            
+            animation_mode = getattr(self.config, 'animation_mode', 'level')
+            if animation_mode == 'level':
+                # One frame per call level from the root functions, merged to
+                # fit the frame budget (the first and last frames are fixed)
+                max_frames = getattr(self.config, 'animation_max_frames', 60)
+                steps = group_edges_by_level(metadata, max(1, max_frames - 2) if max_frames else None)
+            else:
+                # One frame per edge, in dependency order
+                edges = []
+                seen = set()
+                for func, deps in metadata.items():
+                    for dep in deps:
+                        if dep in metadata and (dep, func) not in seen:
+                            seen.add((dep, func))
+                            edges.append((dep, func))
+                steps = [[edge] for edge in edges]
             
             # Save the animation
             output_path = f"{output_path}_flow.gif"
-            imageio.mimsave(output_path, frames, duration=1.0)  # 1 second per frame
-            logger.info(f"Animated flow visualization saved to {output_path}")
+            frame_count = animator.render(layout, steps, output_path, duration=1.0)  # 1 second per frame
+            logger.info(f"Animated flow visualization saved to {output_path} ({frame_count} frames)")
             
         except Exception as e:
             logger.error(f"Error creating animation: {str(e)}", exc_info=True)
-            raise VisualizationError(f"Failed to create animation: {str(e)}")
-        finally:
-            # Cleanup temporary files
-            try:
-                shutil.rmtree(frames_dir)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temporary directory {frames_dir}: {str(e)}")
\ No newline at end of file
+            raise VisualizationError(f"Failed to create animation: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import time
+import logging
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+from cache_manager import CacheManager
+from parallel_analyzer import ParallelAnalyzer
+from metadata_extractor import extract_metadata, supported_extensions
+from file_discovery import iter_source_entries
+from project_analyzer import merge_project_metadata
+
+logger = logging.getLogger(__name__)
+
+# (mtime_ns, size) of a file; any difference means the file must be re-read
+FileStamp = Tuple[int, int]
+
+def scan_tree(root: str, extensions: Set[str], excluded: Set[str],
+              max_size: Optional[int] = None, respect_gitignore: bool = True) -> Dict[str, FileStamp]:
+    """Stamp every source file under ``root`` in one pruned ``os.scandir`` walk."""
+    return {path: (st.st_mtime_ns, st.st_size)
+            for path, st in iter_source_entries(root, extensions, excluded, max_size, respect_gitignore)}
+
+def diff_stamps(old: Dict[str, FileStamp], new: Dict[str, FileStamp]) -> Tuple[List[str], List[str]]:
+    """Return (added or modified, removed) files between two scans."""
+    changed = [path for path, stamp in new.items() if old.get(path) != stamp]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+def diff_graphs(old: Mapping[str, List[str]], new: Mapping[str, List[str]]) -> Set[str]:
+    """Functions that were added, removed, or whose dependency list changed.
+
+    The neighbours of a removed function are included as well, since the
+    component they belong to has changed shape even if their own dependency
+    list has not.
+    """
+    changed = set()
+    for func, deps in new.items():
+        if func not in old or old[func] != deps:
+            changed.add(func)
+    for func, deps in old.items():
+        if func not in new:
+            changed.add(func)
+            changed.update(dep for dep in deps if dep in new)
+    return changed
+
+class ProjectWatcher:
+    """Keep the visualizations of a project directory up to date.
+
+    Each poll compares a fresh ``scan_tree`` with the previous one and sends
+    only the added or modified files through the ParallelAnalyzer (and its
+    CacheManager). The project graph is merged again from the per-file
+    results, diffed against the previous graph, and rendered only when it
+    changed, with the visualizer in incremental mode so unchanged
+    components keep their earlier renders and node positions.
+    """
+
+    def __init__(self, directory: str, config, visualizer, base_name: str,
+                 select: Optional[Callable[[Mapping[str, List[str]]], Mapping[str, List[str]]]] = None,
+                 metrics_collector=None):
+        self.root = os.path.abspath(directory)
+        self.config = config
+        self.visualizer = visualizer
+        self.visualizer.incremental = True
+        self.base_name = base_name
+        self.select = select
+        self.metrics_collector = metrics_collector
+        self.cache_manager = CacheManager(config)
+        self.analyzer = ParallelAnalyzer(config, self.cache_manager)
+
+        self.extensions = supported_extensions(config.supported_languages)
+        self.excluded = set(config.excluded_directories)
+        self.max_size = config.max_file_size_mb * 1024 * 1024
+        self.respect_gitignore = getattr(config, 'respect_gitignore', True)
+
+        self.stamps: Dict[str, FileStamp] = {}
+        self.results: Dict[str, Dict[str, List[str]]] = {}
+        self.metadata: Mapping[str, List[str]] = {}
+        self.rendered: Mapping[str, List[str]] = {}
+
+    def scan(self) -> Dict[str, FileStamp]:
+        return scan_tree(self.root, self.extensions, self.excluded, self.max_size, self.respect_gitignore)
+
+    def _analyze(self, files: List[str]) -> None:
+        for path in files:
+            self.results.pop(path, None)
+        for path, metadata in self.analyzer.analyze_files_parallel(files, extract_metadata):
+            self.results[path] = metadata
+
+    def _render(self, metadata: Mapping[str, List[str]], changed: Optional[Set[str]] = None) -> None:
+        """Render ``metadata``, or its selection, given the ``changed`` functions.
+
+        The visualizer reuses everything it made for components without
+        changed functions. A selection is diffed against the previously
+        rendered one, since the change may fall outside it entirely.
+        """
+        selected = self.select(metadata) if self.select is not None else metadata
+        if not selected:
+            logger.warning("No functions selected for the watched project")
+            return
+        if self.select is not None and self.rendered:
+            changed = diff_graphs(self.rendered, selected)
+            if not changed:
+                logger.info("Changes do not affect the selected functions; keeping the current visualizations")
+                return
+        self.visualizer.visualize_dependencies(selected, self.base_name,
+                                               metrics_collector=self.metrics_collector,
+                                               changed=changed)
+        self.rendered = selected
+
+    def start(self) -> Mapping[str, List[str]]:
+        """Analyze and render the whole project once."""
+        self.stamps = self.scan()
+        self._analyze(list(self.stamps))
+        self.metadata = merge_project_metadata(list(self.results.items()), self.root)
+        self._render(self.metadata)
+        return self.metadata
+
+    def refresh(self) -> Optional[Set[str]]:
+        """Poll once; re-analyze and re-render if anything changed.
+
+        Returns the changed functions, or None when no source file changed.
+        """
+        start = time.perf_counter()
+        stamps = self.scan()
+        changed_files, removed_files = diff_stamps(self.stamps, stamps)
+        self.stamps = stamps
+        if not changed_files and not removed_files:
+            return None
+
+        for path in removed_files:
+            self.results.pop(path, None)
+        self._analyze(changed_files)
+        metadata = merge_project_metadata(list(self.results.items()), self.root)
+        changed = diff_graphs(self.metadata, metadata)
+        self.metadata = metadata
+
+        if changed:
+            logger.info(f"{len(changed_files) + len(removed_files)} files changed; "
+                        f"updating {len(changed)} functions")
+            self._render(metadata, changed)
+        else:
+            logger.info(f"{len(changed_files) + len(removed_files)} files changed without affecting the graph")
+
+        elapsed = time.perf_counter() - start
+        if self.metrics_collector is not None:
+            self.metrics_collector.record_metric('watch_update_time', elapsed)
+        logger.info(f"Watch update finished in {elapsed:.2f}s")
+        return changed
+
+    def close(self) -> None:
+        """Flush pending cache writes, release the cache and stop the renderer."""
+        self.cache_manager.close()
+        self.visualizer.close()
+
+    def run(self, interval: Optional[float] = None, max_updates: Optional[int] = None) -> None:
+        """Poll every ``interval`` seconds until interrupted (or ``max_updates`` updates)."""
+        interval = interval if interval is not None else getattr(self.config, 'watch_interval', 1.0)
+        if not self.stamps:
+            self.start()
+        updates = 0
+        while max_updates is None or updates < max_updates:
+            time.sleep(interval)
+            try:
+                if self.refresh() is not None:
+                    updates += 1
+            except Exception as e:
+                # Keep watching; the next save usually fixes the error
+                logger.error(f"Watch update failed: {str(e)}", exc_info=True)